@@ -10,10 +10,19 @@ async def main(
     setup_master_port: int,
     ca_cert_path: str,
     ca_key_path: str,
+    threshold: int,
+    num_of_shares: int,
+    pregenerated_queue_size: int,
 ):
     name = docker_utils.get_container_name(docker_utils.get_self_container_id())
     bootstrap_server = Bootstrap(
-        name=name, port=port, ca_cert_path=ca_cert_path, ca_key_path=ca_key_path
+        name=name,
+        port=port,
+        ca_cert_path=ca_cert_path,
+        ca_key_path=ca_key_path,
+        threshold=threshold,
+        num_of_shares=num_of_shares,
+        pregenerated_queue_size=pregenerated_queue_size,
     )
     setup_unit = SetupUnit(
         port=setup_unit_port,
@@ -1,12 +1,19 @@
+import asyncio
+import contextlib
 import logging
+from typing import Optional
 
 import grpc
 
-from vault.common.generated.vault_pb2 import GenerateSharesResponse
+from vault.common.generated.vault_pb2 import (
+    GenerateSharesBatchResponse,
+    GenerateSharesResponse,
+)
 from vault.common.generated.vault_pb2_grpc import (
     BootstrapServicer,
     add_BootstrapServicer_to_server,
 )
+from vault.common import types
 from vault.crypto.asymmetric import encrypt
 from vault.crypto.certs import generate_component_cert_and_key, load_ca_cert
 from vault.crypto.threshold import generate_key_and_shares
@@ -25,6 +32,9 @@ class Bootstrap(BootstrapServicer):
         port: int,
         ca_cert_path: str = "certs/ca.crt",
         ca_key_path: str = "certs/ca.key",
+        threshold: int = 0,
+        num_of_shares: int = 0,
+        pregenerated_queue_size: int = 1,
     ):
         self._logger = logging.getLogger(__class__.__name__)
         self._port = port
@@ -48,6 +58,19 @@ class Bootstrap(BootstrapServicer):
             f"[::]:{self._port}", self._server_creds
         )
 
+        # Key material for the expected (threshold, num_of_shares) is generated
+        # ahead of requests by a background worker
+        self._threshold = threshold
+        self._num_of_shares = num_of_shares
+        self._pregenerated: Optional[
+            asyncio.Queue[tuple[types.Key, list[types.Key]]]
+        ] = (
+            asyncio.Queue(maxsize=pregenerated_queue_size)
+            if threshold > 0 and num_of_shares > 0 and pregenerated_queue_size > 0
+            else None
+        )
+        self._pregenerate_task: Optional[asyncio.Task] = None
+
     async def start(self):
         """
         Starts the Bootstrap gRPC server.
@@ -56,6 +79,8 @@ class Bootstrap(BootstrapServicer):
             None
         """
         await self._server.start()
+        if self._pregenerated is not None:
+            self._pregenerate_task = asyncio.create_task(self._pregenerate_loop())
         self._logger.info(f"Bootstrap server started on port {self._port}")
 
     async def close(self):
@@ -67,6 +92,11 @@ class Bootstrap(BootstrapServicer):
         """
         if self._server:
             await self._server.stop(grace=5.0)
+        if self._pregenerate_task:
+            self._pregenerate_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._pregenerate_task
+            self._pregenerate_task = None
         self._logger.info("Bootstrap server stopped")
 
     async def GenerateShares(self, request, context):
@@ -85,7 +115,13 @@ class Bootstrap(BootstrapServicer):
             GenerateSharesResponse: Contains the encrypted shares and encrypted key.
         """
         self._logger.info("Bootstrap generating shares!")
-        encryption_key, shares = generate_key_and_shares(
+        if not 1 <= request.threshold <= request.num_of_shares:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(
+                "Threshold must be between 1 and the number of shares requested"
+            )
+            return GenerateSharesResponse()
+        encryption_key, shares = await self._get_key_and_shares(
             request.threshold, request.num_of_shares
         )
         if len(shares) != len(request.public_keys):
@@ -95,13 +131,87 @@ class Bootstrap(BootstrapServicer):
             )
             return GenerateSharesResponse()
 
+        return self._seal(encryption_key, shares, list(request.public_keys))
+
+    async def GenerateSharesBatch(self, request, context):
+        """
+        Handles the GenerateSharesBatch gRPC request, generating a key set per user.
+
+        Every user gets its own encryption key and shares. The shares are
+        encrypted with the share servers' public keys and the user's public key,
+        and the encryption key with the user's public key.
+
+        Args:
+            request: The gRPC request containing threshold, num_of_shares, the
+                share servers' public keys and the users' public keys.
+            context: The gRPC context for error handling and status reporting.
+
+        Returns:
+            GenerateSharesBatchResponse: A GenerateSharesResponse per user, in order.
+        """
+        self._logger.info(
+            f"Bootstrap generating shares for {len(request.user_public_keys)} users!"
+        )
+        if not 1 <= request.threshold <= request.num_of_shares:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(
+                "Threshold must be between 1 and the number of shares requested"
+            )
+            return GenerateSharesBatchResponse()
+        if len(request.server_public_keys) + 1 != request.num_of_shares:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(
+                "Number of public keys must match number of shares requested"
+            )
+            return GenerateSharesBatchResponse()
+
+        users = []
+        for user_public_key in request.user_public_keys:
+            encryption_key, shares = await self._get_key_and_shares(
+                request.threshold, request.num_of_shares
+            )
+            users.append(
+                self._seal(
+                    encryption_key,
+                    shares,
+                    [*request.server_public_keys, user_public_key],
+                )
+            )
+        return GenerateSharesBatchResponse(users=users)
+
+    # Private methods
+    def _seal(
+        self,
+        encryption_key: types.Key,
+        shares: list[types.Key],
+        public_keys: list[bytes],
+    ) -> GenerateSharesResponse:
         encrypted_shares = [
             encrypt(share.model_dump_json().encode(), pub_key)
-            for share, pub_key in zip(shares, request.public_keys)
+            for share, pub_key in zip(shares, public_keys)
         ]
         encrypted_key = encrypt(
-            encryption_key.model_dump_json().encode(), request.public_keys.pop()
+            encryption_key.model_dump_json().encode(), public_keys[-1]
         )  # The last key is the user's key
         return GenerateSharesResponse(
             encrypted_shares=encrypted_shares, encrypted_key=encrypted_key
         )
+
+    async def _get_key_and_shares(
+        self, threshold: int, num_of_shares: int
+    ) -> tuple[types.Key, list[types.Key]]:
+        if self._pregenerated is not None and (threshold, num_of_shares) == (
+            self._threshold,
+            self._num_of_shares,
+        ):
+            return await self._pregenerated.get()
+        return await asyncio.to_thread(
+            generate_key_and_shares, threshold, num_of_shares
+        )
+
+    async def _pregenerate_loop(self):
+        while True:
+            key_and_shares = await asyncio.to_thread(
+                generate_key_and_shares, self._threshold, self._num_of_shares
+            )
+            await self._pregenerated.put(key_and_shares)
@@ -1,5 +1,5 @@
 import asyncio
-from typing import Annotated
+from typing import Annotated, Optional
 
 import typer
 
@@ -25,6 +25,66 @@ def manager(
     share_server_command: Annotated[str, typer.Option(envvar="SHARE_SERVER_COMMAND")],
     ca_cert_path: Annotated[str, typer.Option(envvar="CA_CERT_PATH")],
     ca_key_path: Annotated[str, typer.Option(envvar="CA_KEY_PATH")],
+    share_server_timeout: Annotated[
+        float, typer.Option(envvar="SHARE_SERVER_TIMEOUT")
+    ] = 5.0,
+    max_concurrent_share_server_requests: Annotated[
+        int, typer.Option(envvar="MAX_CONCURRENT_SHARE_SERVER_REQUESTS")
+    ] = 64,
+    channel_idle_timeout: Annotated[
+        float, typer.Option(envvar="CHANNEL_IDLE_TIMEOUT")
+    ] = 300.0,
+    max_concurrent_session_requests: Annotated[
+        int, typer.Option(envvar="MAX_CONCURRENT_SESSION_REQUESTS")
+    ] = 32,
+    resumption_ticket_lifetime: Annotated[
+        float, typer.Option(envvar="RESUMPTION_TICKET_LIFETIME")
+    ] = 60.0,
+    max_batch_size: Annotated[int, typer.Option(envvar="MAX_BATCH_SIZE")] = 1000,
+    share_server_decrypt_workers: Annotated[
+        int, typer.Option(envvar="SHARE_SERVER_DECRYPT_WORKERS")
+    ] = 0,
+    threshold: Annotated[Optional[int], typer.Option(envvar="THRESHOLD")] = None,
+    hedge_percentile: Annotated[float, typer.Option(envvar="HEDGE_PERCENTILE")] = 0.95,
+    max_parallel_container_ops: Annotated[
+        int, typer.Option(envvar="MAX_PARALLEL_CONTAINER_OPS")
+    ] = 8,
+    bootstrap_pool_size: Annotated[int, typer.Option(envvar="BOOTSTRAP_POOL_SIZE")] = 2,
+    bootstrap_max_uses: Annotated[int, typer.Option(envvar="BOOTSTRAP_MAX_USES")] = 1,
+    bootstrap_ttl: Annotated[float, typer.Option(envvar="BOOTSTRAP_TTL")] = 300.0,
+    db_pool_min_size: Annotated[int, typer.Option(envvar="DB_POOL_MIN_SIZE")] = 5,
+    db_pool_max_size: Annotated[int, typer.Option(envvar="DB_POOL_MAX_SIZE")] = 20,
+    db_pool_pre_ping: Annotated[bool, typer.Option(envvar="DB_POOL_PRE_PING")] = True,
+    db_pool_recycle: Annotated[float, typer.Option(envvar="DB_POOL_RECYCLE")] = 1800.0,
+    db_fast_path: Annotated[bool, typer.Option(envvar="DB_FAST_PATH")] = True,
+    db_group_commit_window: Annotated[
+        float, typer.Option(envvar="DB_GROUP_COMMIT_WINDOW")
+    ] = 0.002,
+    db_group_commit_max_size: Annotated[
+        int, typer.Option(envvar="DB_GROUP_COMMIT_MAX_SIZE")
+    ] = 100,
+    srp_record_cache_ttl: Annotated[
+        float, typer.Option(envvar="SRP_RECORD_CACHE_TTL")
+    ] = 0.0,
+    srp_record_cache_size: Annotated[
+        int, typer.Option(envvar="SRP_RECORD_CACHE_SIZE")
+    ] = 10_000,
+    leader_election_interval: Annotated[
+        float, typer.Option(envvar="LEADER_ELECTION_INTERVAL")
+    ] = 5.0,
+    terminate_share_servers_on_stop: Annotated[
+        bool, typer.Option(envvar="TERMINATE_SHARE_SERVERS_ON_STOP")
+    ] = True,
+    workers: Annotated[int, typer.Option(envvar="WORKERS")] = 1,
+    srp_workers: Annotated[int, typer.Option(envvar="SRP_WORKERS")] = 0,
+    srp_worker_processes: Annotated[
+        bool, typer.Option(envvar="SRP_WORKER_PROCESSES")
+    ] = True,
+    srp_max_queued: Annotated[int, typer.Option(envvar="SRP_MAX_QUEUED")] = 256,
+    metrics_interval: Annotated[float, typer.Option(envvar="METRICS_INTERVAL")] = 60.0,
+    setup_master_address: Annotated[
+        Optional[str], typer.Option(envvar="SETUP_MASTER_ADDRESS")
+    ] = None,
 ):
     from vault.manager.__main__ import main
 
@@ -47,6 +107,36 @@ def manager(
             share_server_command=share_server_command,
             ca_cert_path=ca_cert_path,
             ca_key_path=ca_key_path,
+            share_server_timeout=share_server_timeout,
+            max_concurrent_share_server_requests=max_concurrent_share_server_requests,
+            channel_idle_timeout=channel_idle_timeout,
+            max_concurrent_session_requests=max_concurrent_session_requests,
+            resumption_ticket_lifetime=resumption_ticket_lifetime,
+            max_batch_size=max_batch_size,
+            share_server_decrypt_workers=share_server_decrypt_workers,
+            threshold=threshold,
+            hedge_percentile=hedge_percentile,
+            max_parallel_container_ops=max_parallel_container_ops,
+            bootstrap_pool_size=bootstrap_pool_size,
+            bootstrap_max_uses=bootstrap_max_uses,
+            bootstrap_ttl=bootstrap_ttl,
+            db_pool_min_size=db_pool_min_size,
+            db_pool_max_size=db_pool_max_size,
+            db_pool_pre_ping=db_pool_pre_ping,
+            db_pool_recycle=db_pool_recycle,
+            db_fast_path=db_fast_path,
+            db_group_commit_window=db_group_commit_window,
+            db_group_commit_max_size=db_group_commit_max_size,
+            srp_record_cache_ttl=srp_record_cache_ttl,
+            srp_record_cache_size=srp_record_cache_size,
+            leader_election_interval=leader_election_interval,
+            terminate_share_servers_on_stop=terminate_share_servers_on_stop,
+            workers=workers,
+            srp_workers=srp_workers,
+            srp_worker_processes=srp_worker_processes,
+            srp_max_queued=srp_max_queued,
+            metrics_interval=metrics_interval,
+            setup_master_address=setup_master_address,
         )
     )
 
@@ -59,6 +149,11 @@ def bootstrap(
     setup_master_port: Annotated[int, typer.Option(envvar="SETUP_MASTER_PORT")],
     ca_cert_path: Annotated[str, typer.Option(envvar="CA_CERT_PATH")],
     ca_key_path: Annotated[str, typer.Option(envvar="CA_KEY_PATH")],
+    threshold: Annotated[int, typer.Option(envvar="THRESHOLD")] = 0,
+    num_of_shares: Annotated[int, typer.Option(envvar="NUM_OF_SHARES")] = 0,
+    pregenerated_queue_size: Annotated[
+        int, typer.Option(envvar="PREGENERATED_QUEUE_SIZE")
+    ] = 1,
 ):
     from vault.bootstrap.__main__ import main
 
@@ -70,6 +165,9 @@ def bootstrap(
             setup_master_port=setup_master_port,
             ca_cert_path=ca_cert_path,
             ca_key_path=ca_key_path,
+            threshold=threshold,
+            num_of_shares=num_of_shares,
+            pregenerated_queue_size=pregenerated_queue_size,
         )
     )
 
@@ -82,6 +180,7 @@ def share_server(
     setup_master_port: Annotated[int, typer.Option(envvar="SETUP_MASTER_PORT")],
     ca_cert_path: Annotated[str, typer.Option(envvar="CA_CERT_PATH")],
     ca_key_path: Annotated[str, typer.Option(envvar="CA_KEY_PATH")],
+    decrypt_workers: Annotated[int, typer.Option(envvar="DECRYPT_WORKERS")] = 0,
 ):
     from vault.share_server.__main__ import main
 
@@ -93,6 +192,7 @@ def share_server(
             setup_master_port=setup_master_port,
             ca_cert_path=ca_cert_path,
             ca_key_path=ca_key_path,
+            decrypt_workers=decrypt_workers,
         )
     )
 
@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import grpc
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+@dataclass
+class _PooledChannel:
+    channel: grpc.aio.Channel
+    last_used: float
+    in_use: int = 0
+    removed: bool = False
+
+
+class ChannelPool:
+    """
+    Pool of long-lived secure gRPC channels keyed by target address.
+
+    Channels are created lazily on first use and reused by later requests, so
+    the TCP connect, TLS handshake and HTTP/2 setup are paid once per target.
+    Channels that were not used for `idle_timeout_s` are closed by a background
+    task, and all channels of a host can be dropped once it goes away.
+    """
+
+    def __init__(self, creds: grpc.ChannelCredentials, idle_timeout_s: float = 300.0):
+        self._logger = logging.getLogger(__class__.__name__)
+        self._creds = creds
+        self._idle_timeout_s = idle_timeout_s
+        self._channels: dict[str, _PooledChannel] = {}
+        self._eviction_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """
+        Starts the background eviction of idle channels.
+
+        Returns:
+            None
+        """
+        self._eviction_task = asyncio.create_task(self._evict_idle_channels_loop())
+
+    async def close(self):
+        """
+        Stops the background eviction and closes all pooled channels.
+
+        Returns:
+            None
+        """
+        if self._eviction_task:
+            self._eviction_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._eviction_task
+            self._eviction_task = None
+        entries = list(self._channels.values())
+        self._channels.clear()
+        await asyncio.gather(*[entry.channel.close() for entry in entries])
+
+    @contextlib.asynccontextmanager
+    async def channel(self, address: str) -> AsyncIterator[grpc.aio.Channel]:
+        """
+        Borrows the channel to `address`, creating it if needed.
+
+        A borrowed channel is never evicted or closed while in use.
+
+        Args:
+            address (str): Target address in the form "host:port".
+
+        Yields:
+            grpc.aio.Channel: The pooled channel.
+        """
+        entry = self._channels.get(address)
+        if entry is None:
+            self._logger.info(f"Opening channel to {address}")
+            entry = _PooledChannel(
+                channel=grpc.aio.secure_channel(address, self._creds),
+                last_used=time.monotonic(),
+            )
+            self._channels[address] = entry
+        entry.in_use += 1
+        try:
+            yield entry.channel
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+            if entry.removed and entry.in_use == 0:
+                await entry.channel.close()
+
+    async def remove_host(self, host: str):
+        """
+        Drops all channels to `host`, regardless of port.
+
+        Channels that are currently borrowed are closed once released.
+
+        Args:
+            host (str): The host name, without port.
+
+        Returns:
+            None
+        """
+        for address in [a for a in self._channels if a.rpartition(":")[0] == host]:
+            entry = self._channels.pop(address, None)
+            if entry is None:
+                continue
+            self._logger.info(f"Dropping channel to {address}")
+            entry.removed = True
+            if entry.in_use == 0:
+                await entry.channel.close()
+
+    async def evict_idle(self):
+        """
+        Closes channels that were not used for the idle timeout.
+
+        Returns:
+            None
+        """
+        now = time.monotonic()
+        for address, entry in list(self._channels.items()):
+            if entry.in_use or now - entry.last_used < self._idle_timeout_s:
+                continue
+            if self._channels.get(address) is entry:
+                del self._channels[address]
+                self._logger.info(f"Evicting idle channel to {address}")
+                await entry.channel.close()
+
+    # Private methods
+    async def _evict_idle_channels_loop(self):
+        while True:
+            await asyncio.sleep(self._idle_timeout_s / 2)
+            await self.evict_idle()
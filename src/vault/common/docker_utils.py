@@ -136,16 +136,37 @@ async def wait_for_container_to_stop(container_id: str, timeout: float | None =
         return None
 
 
-def remove_container(container_id: str):
+def remove_container(container_id: str, force: bool = False):
     """
     Remove a Docker container by its ID.
 
     Args:
         container_id (str): The container ID.
+        force (bool, optional): Kill the container if it is running. Defaults to False.
 
     Returns:
         None
     """
     client = docker.from_env()
     container = client.containers.get(container_id)
-    container.remove(force=False)
+    container.remove(force=force)
+
+
+def list_container_ids(name_prefix: str) -> list[str]:
+    """
+    List the IDs of all the Docker containers whose name starts with a prefix.
+
+    Args:
+        name_prefix (str): The prefix of the container names.
+
+    Returns:
+        list[str]: The short IDs of the containers, running or not.
+    """
+    client = docker.from_env()
+    # The name filter of docker matches anywhere in the name
+    containers = client.containers.list(all=True, filters={"name": name_prefix})
+    return [
+        container.short_id
+        for container in containers
+        if container.name.startswith(name_prefix)
+    ]
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0bvault.proto\x12\x05vault\"[\n\x0fRegisterRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08verifier\x18\x02 \x01(\t\x12\x0c\n\x04salt\x18\x03 \x01(\t\x12\x17\n\x0fuser_public_key\x18\x04 \x01(\x0c\"B\n\x10RegisterResponse\x12\x17\n\x0f\x65ncrypted_share\x18\x01 \x01(\x0c\x12\x15\n\rencrypted_key\x18\x02 \x01(\x0c\" \n\x0cSRPFirstStep\x12\x10\n\x08username\x18\x01 \x01(\t\"8\n\rSRPSecondStep\x12\x19\n\x11server_public_key\x18\x01 \x01(\t\x12\x0c\n\x04salt\x18\x02 \x01(\t\"K\n\x0cSRPThirdStep\x12\x19\n\x11\x63lient_public_key\x18\x01 \x01(\t\x12 \n\x18\x63lient_session_key_proof\x18\x02 \x01(\t\"*\n\x0fSRPThirdStepAck\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x0b\n\x03\x65rr\x18\x02 \x01(\t\"t\n\x0cInnerRequest\x12*\n\x05store\x18\x01 \x01(\x0b\x32\x19.vault.StoreSecretRequestH\x00\x12\x30\n\x08retrieve\x18\x02 \x01(\x0b\x32\x1c.vault.RetrieveSecretRequestH\x00\x42\x06\n\x04\x62ody\"w\n\rInnerResponse\x12+\n\x05store\x18\x01 \x01(\x0b\x32\x1a.vault.StoreSecretResponseH\x00\x12\x31\n\x08retrieve\x18\x02 \x01(\x0b\x32\x1d.vault.RetrieveSecretResponseH\x00\x42\x06\n\x04\x62ody\"\x9d\x01\n\x13SecureReqMsgWrapper\x12*\n\x0b\x61uth_step_1\x18\x01 \x01(\x0b\x32\x13.vault.SRPFirstStepH\x00\x12*\n\x0b\x61uth_step_3\x18\x02 \x01(\x0b\x32\x13.vault.SRPThirdStepH\x00\x12&\n\x07\x61pp_req\x18\x03 \x01(\x0b\x32\x13.vault.InnerRequestH\x00\x42\x06\n\x04\x62ody\"\xa8\x01\n\x14SecureRespMsgWrapper\x12+\n\x0b\x61uth_step_2\x18\x01 \x01(\x0b\x32\x14.vault.SRPSecondStepH\x00\x12\x31\n\x0f\x61uth_step_3_ack\x18\x02 \x01(\x0b\x32\x16.vault.SRPThirdStepAckH\x00\x12(\n\x08\x61pp_resp\x18\x03 \x01(\x0b\x32\x14.vault.InnerResponseH\x00\x42\x06\n\x04\x62ody\"\x1b\n\x03Key\x12\t\n\x01x\x18\x01 \x01(\t\x12\t\n\x01y\x18\x02 \x01(\t\"L\n\x06Secret\x12\x16\n\x02\x63\x31\x18\x01 \x01(\x0b\x32\n.vault.Key\x12\x16\n\x02\x63\x32\x18\x02 \x01(\x0b\x32\n.vault.Key\x12\x12\n\nciphertext\x18\x03 \x01(\x0c\"6\n\x10PartialDecrypted\x12\t\n\x01x\x18\x01 \x01(\t\x12\x17\n\x03yc1\x18\x02 \x01(\x0b\x32\n.vault.Key\"W\n\x12StoreSecretRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x11\n\tsecret_id\x18\x02 \x01(\t\x12\x1d\n\x06secret\x18\x03 \x01(\x0b\x32\r.vault.Secret\"&\n\x13StoreSecretResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\";\n\x15RetrieveSecretRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x11\n\tsecret_id\x18\x02 \x01(\t\"^\n\x16RetrieveSecretResponse\x12%\n\x1d\x65ncrypted_partial_decryptions\x18\x01 \x03(\x0c\x12\x1d\n\x06secret\x18\x02 \x01(\x0b\x32\r.vault.Secret\"V\n\x15GenerateSharesRequest\x12\x11\n\tthreshold\x18\x01 \x01(\x05\x12\x15\n\rnum_of_shares\x18\x02 \x01(\x05\x12\x13\n\x0bpublic_keys\x18\x03 \x03(\x0c\"I\n\x16GenerateSharesResponse\x12\x18\n\x10\x65ncrypted_shares\x18\x01 \x03(\x0c\x12\x15\n\rencrypted_key\x18\x02 \x01(\x0c\"=\n\x11StoreShareRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x17\n\x0f\x65ncrypted_share\x18\x02 \x01(\x0c\"%\n\x12StoreShareResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"%\n\x12\x44\x65leteShareRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\"&\n\x13\x44\x65leteShareResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"Y\n\x0e\x44\x65\x63ryptRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x1d\n\x06secret\x18\x02 \x01(\x0b\x32\r.vault.Secret\x12\x17\n\x0fuser_public_key\x18\x03 \x01(\x0c\"7\n\x0f\x44\x65\x63ryptResponse\x12$\n\x1c\x65ncrypted_partial_decryption\x18\x01 \x01(\x0c\x32\x91\x01\n\x07Manager\x12;\n\x08Register\x12\x16.vault.RegisterRequest\x1a\x17.vault.RegisterResponse\x12I\n\nSecureCall\x12\x1a.vault.SecureReqMsgWrapper\x1a\x1b.vault.SecureRespMsgWrapper(\x01\x30\x01\x32Z\n\tBootstrap\x12M\n\x0eGenerateShares\x12\x1c.vault.GenerateSharesRequest\x1a\x1d.vault.GenerateSharesResponse2\xd0\x01\n\x0bShareServer\x12\x41\n\nStoreShare\x12\x18.vault.StoreShareRequest\x1a\x19.vault.StoreShareResponse\x12\x44\n\x0b\x44\x65leteShare\x12\x19.vault.DeleteShareRequest\x1a\x1a.vault.DeleteShareResponse\x12\x38\n\x07\x44\x65\x63rypt\x12\x15.vault.DecryptRequest\x1a\x16.vault.DecryptResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0bvault.proto\x12\x05vault\"[\n\x0fRegisterRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08verifier\x18\x02 \x01(\t\x12\x0c\n\x04salt\x18\x03 \x01(\t\x12\x17\n\x0fuser_public_key\x18\x04 \x01(\x0c\"{\n\x10RegisterResponse\x12\x17\n\x0f\x65ncrypted_share\x18\x01 \x01(\x0c\x12\x15\n\rencrypted_key\x18\x02 \x01(\x0c\x12\x11\n\tthreshold\x18\x03 \x01(\x05\x12\x15\n\rnum_of_shares\x18\x04 \x01(\x05\x12\r\n\x05\x65rror\x18\x05 \x01(\t\"=\n\x14RegisterBatchRequest\x12%\n\x05users\x18\x01 \x03(\x0b\x32\x16.vault.RegisterRequest\"?\n\x15RegisterBatchResponse\x12&\n\x05users\x18\x01 \x03(\x0b\x32\x17.vault.RegisterResponse\"1\n\x0cSRPFirstStep\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x0f\n\x07session\x18\x02 \x01(\x08\"8\n\rSRPSecondStep\x12\x19\n\x11server_public_key\x18\x01 \x01(\t\x12\x0c\n\x04salt\x18\x02 \x01(\t\"K\n\x0cSRPThirdStep\x12\x19\n\x11\x63lient_public_key\x18\x01 \x01(\t\x12 \n\x18\x63lient_session_key_proof\x18\x02 \x01(\t\"k\n\x0fSRPThirdStepAck\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x0b\n\x03\x65rr\x18\x02 \x01(\t\x12\x19\n\x11resumption_ticket\x18\x03 \x01(\x0c\x12$\n\x1cresumption_ticket_lifetime_s\x18\x04 \x01(\r\"O\n\rSRPResumeStep\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x0e\n\x06ticket\x18\x02 \x01(\x0c\x12\r\n\x05nonce\x18\x03 \x01(\x0c\x12\r\n\x05proof\x18\x04 \x01(\x0c\"\xf4\x01\n\x0cInnerRequest\x12*\n\x05store\x18\x01 \x01(\x0b\x32\x19.vault.StoreSecretRequestH\x00\x12\x30\n\x08retrieve\x18\x02 \x01(\x0b\x32\x1c.vault.RetrieveSecretRequestH\x00\x12\x31\n\x0bstore_batch\x18\x05 \x01(\x0b\x32\x1a.vault.StoreSecretsRequestH\x00\x12\x37\n\x0eretrieve_batch\x18\x06 \x01(\x0b\x32\x1d.vault.RetrieveSecretsRequestH\x00\x12\x12\n\nrequest_id\x18\x03 \x01(\x04\x42\x06\n\x04\x62ody\"\x88\x02\n\rInnerResponse\x12+\n\x05store\x18\x01 \x01(\x0b\x32\x1a.vault.StoreSecretResponseH\x00\x12\x31\n\x08retrieve\x18\x02 \x01(\x0b\x32\x1d.vault.RetrieveSecretResponseH\x00\x12\x32\n\x0bstore_batch\x18\x05 \x01(\x0b\x32\x1b.vault.StoreSecretsResponseH\x00\x12\x38\n\x0eretrieve_batch\x18\x06 \x01(\x0b\x32\x1e.vault.RetrieveSecretsResponseH\x00\x12\x12\n\nrequest_id\x18\x03 \x01(\x04\x12\r\n\x05\x65rror\x18\x04 \x01(\tB\x06\n\x04\x62ody\"\xca\x01\n\x13SecureReqMsgWrapper\x12*\n\x0b\x61uth_step_1\x18\x01 \x01(\x0b\x32\x13.vault.SRPFirstStepH\x00\x12*\n\x0b\x61uth_step_3\x18\x02 \x01(\x0b\x32\x13.vault.SRPThirdStepH\x00\x12&\n\x07\x61pp_req\x18\x03 \x01(\x0b\x32\x13.vault.InnerRequestH\x00\x12+\n\x0b\x61uth_resume\x18\x04 \x01(\x0b\x32\x14.vault.SRPResumeStepH\x00\x42\x06\n\x04\x62ody\"\xa8\x01\n\x14SecureRespMsgWrapper\x12+\n\x0b\x61uth_step_2\x18\x01 \x01(\x0b\x32\x14.vault.SRPSecondStepH\x00\x12\x31\n\x0f\x61uth_step_3_ack\x18\x02 \x01(\x0b\x32\x16.vault.SRPThirdStepAckH\x00\x12(\n\x08\x61pp_resp\x18\x03 \x01(\x0b\x32\x14.vault.InnerResponseH\x00\x42\x06\n\x04\x62ody\"\x1b\n\x03Key\x12\t\n\x01x\x18\x01 \x01(\t\x12\t\n\x01y\x18\x02 \x01(\t\"L\n\x06Secret\x12\x16\n\x02\x63\x31\x18\x01 \x01(\x0b\x32\n.vault.Key\x12\x16\n\x02\x63\x32\x18\x02 \x01(\x0b\x32\n.vault.Key\x12\x12\n\nciphertext\x18\x03 \x01(\x0c\"6\n\x10PartialDecrypted\x12\t\n\x01x\x18\x01 \x01(\t\x12\x17\n\x03yc1\x18\x02 \x01(\x0b\x32\n.vault.Key\"W\n\x12StoreSecretRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x11\n\tsecret_id\x18\x02 \x01(\t\x12\x1d\n\x06secret\x18\x03 \x01(\x0b\x32\r.vault.Secret\"&\n\x13StoreSecretResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\";\n\x15RetrieveSecretRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x11\n\tsecret_id\x18\x02 \x01(\t\"^\n\x16RetrieveSecretResponse\x12%\n\x1d\x65ncrypted_partial_decryptions\x18\x01 \x03(\x0c\x12\x1d\n\x06secret\x18\x02 \x01(\x0b\x32\r.vault.Secret\"?\n\x0bSecretEntry\x12\x11\n\tsecret_id\x18\x01 \x01(\t\x12\x1d\n\x06secret\x18\x02 \x01(\x0b\x32\r.vault.Secret\"K\n\x13StoreSecretsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12#\n\x07secrets\x18\x02 \x03(\x0b\x32\x12.vault.SecretEntry\"\'\n\x14StoreSecretsResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"=\n\x16RetrieveSecretsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x12\n\nsecret_ids\x18\x02 \x03(\t\"I\n\x17RetrieveSecretsResponse\x12.\n\x07secrets\x18\x01 \x03(\x0b\x32\x1d.vault.RetrieveSecretResponse\"V\n\x15GenerateSharesRequest\x12\x11\n\tthreshold\x18\x01 \x01(\x05\x12\x15\n\rnum_of_shares\x18\x02 \x01(\x05\x12\x13\n\x0bpublic_keys\x18\x03 \x03(\x0c\"I\n\x16GenerateSharesResponse\x12\x18\n\x10\x65ncrypted_shares\x18\x01 \x03(\x0c\x12\x15\n\rencrypted_key\x18\x02 \x01(\x0c\"|\n\x1aGenerateSharesBatchRequest\x12\x11\n\tthreshold\x18\x01 \x01(\x05\x12\x15\n\rnum_of_shares\x18\x02 \x01(\x05\x12\x1a\n\x12server_public_keys\x18\x03 \x03(\x0c\x12\x18\n\x10user_public_keys\x18\x04 \x03(\x0c\"K\n\x1bGenerateSharesBatchResponse\x12,\n\x05users\x18\x01 \x03(\x0b\x32\x1d.vault.GenerateSharesResponse\"=\n\x11StoreShareRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x17\n\x0f\x65ncrypted_share\x18\x02 \x01(\x0c\"%\n\x12StoreShareResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"B\n\x16StoreShareBatchRequest\x12(\n\x06shares\x18\x01 \x03(\x0b\x32\x18.vault.StoreShareRequest\"*\n\x17StoreShareBatchResponse\x12\x0f\n\x07success\x18\x01 \x03(\x08\"%\n\x12\x44\x65leteShareRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\"&\n\x13\x44\x65leteShareResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"Y\n\x0e\x44\x65\x63ryptRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x1d\n\x06secret\x18\x02 \x01(\x0b\x32\r.vault.Secret\x12\x17\n\x0fuser_public_key\x18\x03 \x01(\x0c\"7\n\x0f\x44\x65\x63ryptResponse\x12$\n\x1c\x65ncrypted_partial_decryption\x18\x01 \x01(\x0c\"_\n\x13\x44\x65\x63ryptBatchRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x1e\n\x07secrets\x18\x02 \x03(\x0b\x32\r.vault.Secret\x12\x17\n\x0fuser_public_key\x18\x03 \x01(\x0c\"=\n\x14\x44\x65\x63ryptBatchResponse\x12%\n\x1d\x65ncrypted_partial_decryptions\x18\x01 \x03(\x0c\x32\xdd\x01\n\x07Manager\x12;\n\x08Register\x12\x16.vault.RegisterRequest\x1a\x17.vault.RegisterResponse\x12J\n\rRegisterBatch\x12\x1b.vault.RegisterBatchRequest\x1a\x1c.vault.RegisterBatchResponse\x12I\n\nSecureCall\x12\x1a.vault.SecureReqMsgWrapper\x1a\x1b.vault.SecureRespMsgWrapper(\x01\x30\x01\x32\xb8\x01\n\tBootstrap\x12M\n\x0eGenerateShares\x12\x1c.vault.GenerateSharesRequest\x1a\x1d.vault.GenerateSharesResponse\x12\\\n\x13GenerateSharesBatch\x12!.vault.GenerateSharesBatchRequest\x1a\".vault.GenerateSharesBatchResponse2\xeb\x02\n\x0bShareServer\x12\x41\n\nStoreShare\x12\x18.vault.StoreShareRequest\x1a\x19.vault.StoreShareResponse\x12\x44\n\x0b\x44\x65leteShare\x12\x19.vault.DeleteShareRequest\x1a\x1a.vault.DeleteShareResponse\x12\x38\n\x07\x44\x65\x63rypt\x12\x15.vault.DecryptRequest\x1a\x16.vault.DecryptResponse\x12G\n\x0c\x44\x65\x63ryptBatch\x12\x1a.vault.DecryptBatchRequest\x1a\x1b.vault.DecryptBatchResponse\x12P\n\x0fStoreShareBatch\x12\x1d.vault.StoreShareBatchRequest\x1a\x1e.vault.StoreShareBatchResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,57 +34,85 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_REGISTERREQUEST']._serialized_start=22
   _globals['_REGISTERREQUEST']._serialized_end=113
   _globals['_REGISTERRESPONSE']._serialized_start=115
-  _globals['_REGISTERRESPONSE']._serialized_end=181
-  _globals['_SRPFIRSTSTEP']._serialized_start=183
-  _globals['_SRPFIRSTSTEP']._serialized_end=215
-  _globals['_SRPSECONDSTEP']._serialized_start=217
-  _globals['_SRPSECONDSTEP']._serialized_end=273
-  _globals['_SRPTHIRDSTEP']._serialized_start=275
-  _globals['_SRPTHIRDSTEP']._serialized_end=350
-  _globals['_SRPTHIRDSTEPACK']._serialized_start=352
-  _globals['_SRPTHIRDSTEPACK']._serialized_end=394
-  _globals['_INNERREQUEST']._serialized_start=396
-  _globals['_INNERREQUEST']._serialized_end=512
-  _globals['_INNERRESPONSE']._serialized_start=514
-  _globals['_INNERRESPONSE']._serialized_end=633
-  _globals['_SECUREREQMSGWRAPPER']._serialized_start=636
-  _globals['_SECUREREQMSGWRAPPER']._serialized_end=793
-  _globals['_SECURERESPMSGWRAPPER']._serialized_start=796
-  _globals['_SECURERESPMSGWRAPPER']._serialized_end=964
-  _globals['_KEY']._serialized_start=966
-  _globals['_KEY']._serialized_end=993
-  _globals['_SECRET']._serialized_start=995
-  _globals['_SECRET']._serialized_end=1071
-  _globals['_PARTIALDECRYPTED']._serialized_start=1073
-  _globals['_PARTIALDECRYPTED']._serialized_end=1127
-  _globals['_STORESECRETREQUEST']._serialized_start=1129
-  _globals['_STORESECRETREQUEST']._serialized_end=1216
-  _globals['_STORESECRETRESPONSE']._serialized_start=1218
-  _globals['_STORESECRETRESPONSE']._serialized_end=1256
-  _globals['_RETRIEVESECRETREQUEST']._serialized_start=1258
-  _globals['_RETRIEVESECRETREQUEST']._serialized_end=1317
-  _globals['_RETRIEVESECRETRESPONSE']._serialized_start=1319
-  _globals['_RETRIEVESECRETRESPONSE']._serialized_end=1413
-  _globals['_GENERATESHARESREQUEST']._serialized_start=1415
-  _globals['_GENERATESHARESREQUEST']._serialized_end=1501
-  _globals['_GENERATESHARESRESPONSE']._serialized_start=1503
-  _globals['_GENERATESHARESRESPONSE']._serialized_end=1576
-  _globals['_STORESHAREREQUEST']._serialized_start=1578
-  _globals['_STORESHAREREQUEST']._serialized_end=1639
-  _globals['_STORESHARERESPONSE']._serialized_start=1641
-  _globals['_STORESHARERESPONSE']._serialized_end=1678
-  _globals['_DELETESHAREREQUEST']._serialized_start=1680
-  _globals['_DELETESHAREREQUEST']._serialized_end=1717
-  _globals['_DELETESHARERESPONSE']._serialized_start=1719
-  _globals['_DELETESHARERESPONSE']._serialized_end=1757
-  _globals['_DECRYPTREQUEST']._serialized_start=1759
-  _globals['_DECRYPTREQUEST']._serialized_end=1848
-  _globals['_DECRYPTRESPONSE']._serialized_start=1850
-  _globals['_DECRYPTRESPONSE']._serialized_end=1905
-  _globals['_MANAGER']._serialized_start=1908
-  _globals['_MANAGER']._serialized_end=2053
-  _globals['_BOOTSTRAP']._serialized_start=2055
-  _globals['_BOOTSTRAP']._serialized_end=2145
-  _globals['_SHARESERVER']._serialized_start=2148
-  _globals['_SHARESERVER']._serialized_end=2356
+  _globals['_REGISTERRESPONSE']._serialized_end=238
+  _globals['_REGISTERBATCHREQUEST']._serialized_start=240
+  _globals['_REGISTERBATCHREQUEST']._serialized_end=301
+  _globals['_REGISTERBATCHRESPONSE']._serialized_start=303
+  _globals['_REGISTERBATCHRESPONSE']._serialized_end=366
+  _globals['_SRPFIRSTSTEP']._serialized_start=368
+  _globals['_SRPFIRSTSTEP']._serialized_end=417
+  _globals['_SRPSECONDSTEP']._serialized_start=419
+  _globals['_SRPSECONDSTEP']._serialized_end=475
+  _globals['_SRPTHIRDSTEP']._serialized_start=477
+  _globals['_SRPTHIRDSTEP']._serialized_end=552
+  _globals['_SRPTHIRDSTEPACK']._serialized_start=554
+  _globals['_SRPTHIRDSTEPACK']._serialized_end=661
+  _globals['_SRPRESUMESTEP']._serialized_start=663
+  _globals['_SRPRESUMESTEP']._serialized_end=742
+  _globals['_INNERREQUEST']._serialized_start=745
+  _globals['_INNERREQUEST']._serialized_end=989
+  _globals['_INNERRESPONSE']._serialized_start=992
+  _globals['_INNERRESPONSE']._serialized_end=1256
+  _globals['_SECUREREQMSGWRAPPER']._serialized_start=1259
+  _globals['_SECUREREQMSGWRAPPER']._serialized_end=1461
+  _globals['_SECURERESPMSGWRAPPER']._serialized_start=1464
+  _globals['_SECURERESPMSGWRAPPER']._serialized_end=1632
+  _globals['_KEY']._serialized_start=1634
+  _globals['_KEY']._serialized_end=1661
+  _globals['_SECRET']._serialized_start=1663
+  _globals['_SECRET']._serialized_end=1739
+  _globals['_PARTIALDECRYPTED']._serialized_start=1741
+  _globals['_PARTIALDECRYPTED']._serialized_end=1795
+  _globals['_STORESECRETREQUEST']._serialized_start=1797
+  _globals['_STORESECRETREQUEST']._serialized_end=1884
+  _globals['_STORESECRETRESPONSE']._serialized_start=1886
+  _globals['_STORESECRETRESPONSE']._serialized_end=1924
+  _globals['_RETRIEVESECRETREQUEST']._serialized_start=1926
+  _globals['_RETRIEVESECRETREQUEST']._serialized_end=1985
+  _globals['_RETRIEVESECRETRESPONSE']._serialized_start=1987
+  _globals['_RETRIEVESECRETRESPONSE']._serialized_end=2081
+  _globals['_SECRETENTRY']._serialized_start=2083
+  _globals['_SECRETENTRY']._serialized_end=2146
+  _globals['_STORESECRETSREQUEST']._serialized_start=2148
+  _globals['_STORESECRETSREQUEST']._serialized_end=2223
+  _globals['_STORESECRETSRESPONSE']._serialized_start=2225
+  _globals['_STORESECRETSRESPONSE']._serialized_end=2264
+  _globals['_RETRIEVESECRETSREQUEST']._serialized_start=2266
+  _globals['_RETRIEVESECRETSREQUEST']._serialized_end=2327
+  _globals['_RETRIEVESECRETSRESPONSE']._serialized_start=2329
+  _globals['_RETRIEVESECRETSRESPONSE']._serialized_end=2402
+  _globals['_GENERATESHARESREQUEST']._serialized_start=2404
+  _globals['_GENERATESHARESREQUEST']._serialized_end=2490
+  _globals['_GENERATESHARESRESPONSE']._serialized_start=2492
+  _globals['_GENERATESHARESRESPONSE']._serialized_end=2565
+  _globals['_GENERATESHARESBATCHREQUEST']._serialized_start=2567
+  _globals['_GENERATESHARESBATCHREQUEST']._serialized_end=2691
+  _globals['_GENERATESHARESBATCHRESPONSE']._serialized_start=2693
+  _globals['_GENERATESHARESBATCHRESPONSE']._serialized_end=2768
+  _globals['_STORESHAREREQUEST']._serialized_start=2770
+  _globals['_STORESHAREREQUEST']._serialized_end=2831
+  _globals['_STORESHARERESPONSE']._serialized_start=2833
+  _globals['_STORESHARERESPONSE']._serialized_end=2870
+  _globals['_STORESHAREBATCHREQUEST']._serialized_start=2872
+  _globals['_STORESHAREBATCHREQUEST']._serialized_end=2938
+  _globals['_STORESHAREBATCHRESPONSE']._serialized_start=2940
+  _globals['_STORESHAREBATCHRESPONSE']._serialized_end=2982
+  _globals['_DELETESHAREREQUEST']._serialized_start=2984
+  _globals['_DELETESHAREREQUEST']._serialized_end=3021
+  _globals['_DELETESHARERESPONSE']._serialized_start=3023
+  _globals['_DELETESHARERESPONSE']._serialized_end=3061
+  _globals['_DECRYPTREQUEST']._serialized_start=3063
+  _globals['_DECRYPTREQUEST']._serialized_end=3152
+  _globals['_DECRYPTRESPONSE']._serialized_start=3154
+  _globals['_DECRYPTRESPONSE']._serialized_end=3209
+  _globals['_DECRYPTBATCHREQUEST']._serialized_start=3211
+  _globals['_DECRYPTBATCHREQUEST']._serialized_end=3306
+  _globals['_DECRYPTBATCHRESPONSE']._serialized_start=3308
+  _globals['_DECRYPTBATCHRESPONSE']._serialized_end=3369
+  _globals['_MANAGER']._serialized_start=3372
+  _globals['_MANAGER']._serialized_end=3593
+  _globals['_BOOTSTRAP']._serialized_start=3596
+  _globals['_BOOTSTRAP']._serialized_end=3780
+  _globals['_SHARESERVER']._serialized_start=3783
+  _globals['_SHARESERVER']._serialized_end=4146
 # @@protoc_insertion_point(module_scope)
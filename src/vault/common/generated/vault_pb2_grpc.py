@@ -39,6 +39,11 @@ class ManagerStub(object):
                 request_serializer=vault__pb2.RegisterRequest.SerializeToString,
                 response_deserializer=vault__pb2.RegisterResponse.FromString,
                 _registered_method=True)
+        self.RegisterBatch = channel.unary_unary(
+                '/vault.Manager/RegisterBatch',
+                request_serializer=vault__pb2.RegisterBatchRequest.SerializeToString,
+                response_deserializer=vault__pb2.RegisterBatchResponse.FromString,
+                _registered_method=True)
         self.SecureCall = channel.stream_stream(
                 '/vault.Manager/SecureCall',
                 request_serializer=vault__pb2.SecureReqMsgWrapper.SerializeToString,
@@ -56,6 +61,13 @@ class ManagerServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def RegisterBatch(self, request, context):
+        """Register many users with a single bootstrap round trip.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def SecureCall(self, request_iterator, context):
         """Single bidirectional stream: SRP login handshake + authenticated application request/response
         """
@@ -71,6 +83,11 @@ def add_ManagerServicer_to_server(servicer, server):
                     request_deserializer=vault__pb2.RegisterRequest.FromString,
                     response_serializer=vault__pb2.RegisterResponse.SerializeToString,
             ),
+            'RegisterBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.RegisterBatch,
+                    request_deserializer=vault__pb2.RegisterBatchRequest.FromString,
+                    response_serializer=vault__pb2.RegisterBatchResponse.SerializeToString,
+            ),
             'SecureCall': grpc.stream_stream_rpc_method_handler(
                     servicer.SecureCall,
                     request_deserializer=vault__pb2.SecureReqMsgWrapper.FromString,
@@ -114,6 +131,33 @@ class Manager(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def RegisterBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/vault.Manager/RegisterBatch',
+            vault__pb2.RegisterBatchRequest.SerializeToString,
+            vault__pb2.RegisterBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def SecureCall(request_iterator,
             target,
@@ -156,6 +200,11 @@ class BootstrapStub(object):
                 request_serializer=vault__pb2.GenerateSharesRequest.SerializeToString,
                 response_deserializer=vault__pb2.GenerateSharesResponse.FromString,
                 _registered_method=True)
+        self.GenerateSharesBatch = channel.unary_unary(
+                '/vault.Bootstrap/GenerateSharesBatch',
+                request_serializer=vault__pb2.GenerateSharesBatchRequest.SerializeToString,
+                response_deserializer=vault__pb2.GenerateSharesBatchResponse.FromString,
+                _registered_method=True)
 
 
 class BootstrapServicer(object):
@@ -167,6 +216,12 @@ class BootstrapServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GenerateSharesBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_BootstrapServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -175,6 +230,11 @@ def add_BootstrapServicer_to_server(servicer, server):
                     request_deserializer=vault__pb2.GenerateSharesRequest.FromString,
                     response_serializer=vault__pb2.GenerateSharesResponse.SerializeToString,
             ),
+            'GenerateSharesBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.GenerateSharesBatch,
+                    request_deserializer=vault__pb2.GenerateSharesBatchRequest.FromString,
+                    response_serializer=vault__pb2.GenerateSharesBatchResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'vault.Bootstrap', rpc_method_handlers)
@@ -213,6 +273,33 @@ class Bootstrap(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def GenerateSharesBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/vault.Bootstrap/GenerateSharesBatch',
+            vault__pb2.GenerateSharesBatchRequest.SerializeToString,
+            vault__pb2.GenerateSharesBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
 
 class ShareServerStub(object):
     """Missing associated documentation comment in .proto file."""
@@ -238,6 +325,16 @@ class ShareServerStub(object):
                 request_serializer=vault__pb2.DecryptRequest.SerializeToString,
                 response_deserializer=vault__pb2.DecryptResponse.FromString,
                 _registered_method=True)
+        self.DecryptBatch = channel.unary_unary(
+                '/vault.ShareServer/DecryptBatch',
+                request_serializer=vault__pb2.DecryptBatchRequest.SerializeToString,
+                response_deserializer=vault__pb2.DecryptBatchResponse.FromString,
+                _registered_method=True)
+        self.StoreShareBatch = channel.unary_unary(
+                '/vault.ShareServer/StoreShareBatch',
+                request_serializer=vault__pb2.StoreShareBatchRequest.SerializeToString,
+                response_deserializer=vault__pb2.StoreShareBatchResponse.FromString,
+                _registered_method=True)
 
 
 class ShareServerServicer(object):
@@ -261,6 +358,18 @@ class ShareServerServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def DecryptBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StoreShareBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ShareServerServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -279,6 +388,16 @@ def add_ShareServerServicer_to_server(servicer, server):
                     request_deserializer=vault__pb2.DecryptRequest.FromString,
                     response_serializer=vault__pb2.DecryptResponse.SerializeToString,
             ),
+            'DecryptBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.DecryptBatch,
+                    request_deserializer=vault__pb2.DecryptBatchRequest.FromString,
+                    response_serializer=vault__pb2.DecryptBatchResponse.SerializeToString,
+            ),
+            'StoreShareBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.StoreShareBatch,
+                    request_deserializer=vault__pb2.StoreShareBatchRequest.FromString,
+                    response_serializer=vault__pb2.StoreShareBatchResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'vault.ShareServer', rpc_method_handlers)
@@ -370,3 +489,57 @@ class ShareServer(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def DecryptBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/vault.ShareServer/DecryptBatch',
+            vault__pb2.DecryptBatchRequest.SerializeToString,
+            vault__pb2.DecryptBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StoreShareBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/vault.ShareServer/StoreShareBatch',
+            vault__pb2.StoreShareBatchRequest.SerializeToString,
+            vault__pb2.StoreShareBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -1,4 +1,8 @@
+import hashlib
+import hmac
+import secrets
 from typing import Tuple
+
 from srptools import SRPContext, SRPClientSession, SRPServerSession
 
 
@@ -59,3 +63,28 @@ def srp_authentication_server_step_three(
         raise RuntimeError(f"verify_proof failed for {username}")
     return server_session.key
     # server_session_key = server_session.key
+
+
+# Resumption, to be run in the client.
+# Proves possession of the session key a resumption ticket was issued for,
+# over a fresh nonce so that the proof cannot be replayed.
+# Returns the nonce and the proof.
+def srp_resumption_client_proof(
+    session_key: bytes, ticket: bytes
+) -> Tuple[bytes, bytes]:
+    nonce = secrets.token_bytes(16)
+    return nonce, _srp_resumption_proof(session_key, ticket, nonce)
+
+
+# Resumption, to be run in the server.
+# Verifies the client's proof against the session key stored with the ticket.
+def srp_resumption_server_verify(
+    session_key: bytes, ticket: bytes, nonce: bytes, proof: bytes
+) -> bool:
+    return hmac.compare_digest(_srp_resumption_proof(session_key, ticket, nonce), proof)
+
+
+def _srp_resumption_proof(session_key: bytes, ticket: bytes, nonce: bytes) -> bytes:
+    return hmac.new(
+        session_key, b"vault-resume" + ticket + nonce, hashlib.sha256
+    ).digest()
@@ -1,30 +1,46 @@
 import asyncio
+import functools
 import signal
+from typing import Optional
 
 from vault.common import docker_utils
 from vault.manager.manager import Manager
+from vault.manager.worker_supervisor import WorkerSupervisor
 
 
-async def wait_for_signal(signals=(signal.SIGINT, signal.SIGTERM)):
+def handle_signals(signals=(signal.SIGINT, signal.SIGTERM)) -> asyncio.Event:
+    """
+    Sets the returned event on the first of `signals`.
+
+    The handlers stay installed until the event loop closes, so a repeated
+    signal cannot interrupt the cleanup. Ctrl-C sends SIGINT to the whole
+    process group, and the supervisor then sends SIGTERM to workers that are
+    already stopping.
+
+    Returns:
+        asyncio.Event: Set once a signal is received.
+    """
     loop = asyncio.get_running_loop()
     stop_event = asyncio.Event()
 
     def handler(sig):
+        if stop_event.is_set():
+            print(f"Received signal: {sig!s} while cleaning up, ignoring", flush=True)
+            return
         print(f"Received signal: {sig!s}", flush=True)
         stop_event.set()
 
     # Register signal handlers
     for sig in signals:
         loop.add_signal_handler(sig, handler, sig)
+    return stop_event
 
+
+async def wait_for_signal(stop_event: asyncio.Event):
     print("Running until a signal is received", flush=True)
     await stop_event.wait()
     print("Got a termination signal, cleaning up and exiting gracefully", flush=True)
 
-    # Cleanup handlers
-    for sig in signals:
-        loop.remove_signal_handler(sig)
-
 
 async def main(
     port: int,
@@ -44,7 +60,48 @@ async def main(
     share_server_command: str,
     ca_cert_path: str,
     ca_key_path: str,
+    share_server_timeout: float,
+    max_concurrent_share_server_requests: int,
+    channel_idle_timeout: float,
+    max_concurrent_session_requests: int,
+    resumption_ticket_lifetime: float,
+    max_batch_size: int,
+    share_server_decrypt_workers: int,
+    threshold: Optional[int],
+    hedge_percentile: float,
+    max_parallel_container_ops: int,
+    bootstrap_pool_size: int,
+    bootstrap_max_uses: int,
+    bootstrap_ttl: float,
+    db_pool_min_size: int,
+    db_pool_max_size: int,
+    db_pool_pre_ping: bool,
+    db_pool_recycle: float,
+    db_fast_path: bool,
+    db_group_commit_window: float,
+    db_group_commit_max_size: int,
+    srp_record_cache_ttl: float,
+    srp_record_cache_size: int,
+    leader_election_interval: float,
+    terminate_share_servers_on_stop: bool,
+    srp_workers: int,
+    srp_worker_processes: bool,
+    srp_max_queued: int,
+    metrics_interval: float,
+    setup_master_address: Optional[str] = None,
+    workers: int = 1,
+    worker_id: Optional[int] = None,
 ):
+    if workers > 1:
+        # Every worker runs this function again, as a single worker
+        options = {
+            key: value
+            for key, value in locals().items()
+            if key not in ("workers", "worker_id")
+        }
+        await supervise(options, workers)
+        return
+
     name = docker_utils.get_container_name(docker_utils.get_self_container_id())
     manager_server = Manager(
         name=name,
@@ -65,7 +122,66 @@ async def main(
         share_server_command=share_server_command,
         ca_cert_path=ca_cert_path,
         ca_key_path=ca_key_path,
+        share_server_timeout_s=share_server_timeout,
+        max_concurrent_share_server_requests=max_concurrent_share_server_requests,
+        channel_idle_timeout_s=channel_idle_timeout,
+        max_concurrent_session_requests=max_concurrent_session_requests,
+        resumption_ticket_lifetime_s=resumption_ticket_lifetime,
+        max_batch_size=max_batch_size,
+        share_server_decrypt_workers=share_server_decrypt_workers,
+        threshold=threshold,
+        hedge_percentile=hedge_percentile,
+        max_parallel_container_ops=max_parallel_container_ops,
+        bootstrap_pool_size=bootstrap_pool_size,
+        bootstrap_max_uses=bootstrap_max_uses,
+        bootstrap_ttl_s=bootstrap_ttl,
+        db_pool_min_size=db_pool_min_size,
+        db_pool_max_size=db_pool_max_size,
+        db_pool_pre_ping=db_pool_pre_ping,
+        db_pool_recycle_s=db_pool_recycle,
+        db_fast_path=db_fast_path,
+        db_group_commit_window_s=db_group_commit_window,
+        db_group_commit_max_size=db_group_commit_max_size,
+        srp_record_cache_ttl_s=srp_record_cache_ttl,
+        srp_record_cache_size=srp_record_cache_size,
+        leader_election_interval_s=leader_election_interval,
+        terminate_share_servers_on_stop=terminate_share_servers_on_stop,
+        worker_id=worker_id,
+        srp_workers=srp_workers,
+        srp_worker_processes=srp_worker_processes,
+        srp_max_queued=srp_max_queued,
+        metrics_interval_s=metrics_interval,
+        setup_master_address=setup_master_address,
     )
+    stop_event = handle_signals()
     await manager_server.start()
-    await wait_for_signal()
+    await wait_for_signal(stop_event)
     await manager_server.stop()
+
+
+async def supervise(options: dict, workers: int):
+    """
+    Runs `workers` manager processes until a signal is received.
+
+    The workers share the listening ports with SO_REUSEPORT, so the kernel
+    spreads the connections between them. They share everything else through
+    the DB, as manager replicas do.
+
+    Args:
+        options (dict): The arguments of `main` for every worker.
+        workers (int): The number of worker processes.
+
+    Returns:
+        None
+    """
+    supervisor = WorkerSupervisor(
+        functools.partial(run_worker, options), num_workers=workers
+    )
+    stop_event = handle_signals()
+    await supervisor.start()
+    await wait_for_signal(stop_event)
+    await supervisor.stop()
+
+
+def run_worker(options: dict, worker_id: int):
+    asyncio.run(main(**options, worker_id=worker_id))
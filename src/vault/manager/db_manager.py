@@ -1,11 +1,20 @@
+import asyncio
+import contextlib
 import logging
-from typing import Optional
-
-from sqlalchemy import NullPool, select
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from sqlalchemy import NullPool, and_, delete, insert, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
-from vault.common.types import ServiceData
+from vault.common.types import ServiceData, ServiceType
+from vault.manager.write_coalescer import WriteCoalescer
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -44,13 +53,110 @@ class AuthClient(Base):
     salt: Mapped[str] = mapped_column()
 
 
+# Statements of the hot path, run on the raw asyncpg connection. asyncpg
+# prepares every statement once per connection and caches it.
+_ADD_SECRET = "INSERT INTO vault (user_id, secret_id, secret) VALUES ($1, $2, $3)"
+_ADD_SECRETS_IGNORING_CONFLICTS = (
+    "INSERT INTO vault (user_id, secret_id, secret) "
+    "SELECT * FROM unnest($1::varchar[], $2::varchar[], $3::bytea[]) "
+    "ON CONFLICT DO NOTHING RETURNING user_id, secret_id"
+)
+_GET_SECRET = "SELECT secret FROM vault WHERE user_id = $1 AND secret_id = $2"
+_GET_USER_AND_SECRETS = (
+    "SELECT users.public_key, vault.secret_id, vault.secret FROM users "
+    "LEFT OUTER JOIN vault ON vault.user_id = users.user_id "
+    "AND vault.secret_id = ANY($2::varchar[]) "
+    "WHERE users.user_id = $1"
+)
+_GET_USER_PUBLIC_KEY = "SELECT public_key FROM users WHERE user_id = $1"
+_USER_EXISTS = "SELECT EXISTS (SELECT 1 FROM users WHERE user_id = $1)"
+_GET_AUTH_CLIENT = "SELECT verifier, salt FROM auth_clients WHERE username = $1"
+
+
+@dataclass
+class DBPoolStats:
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+
+
 class DBManager:
-    def __init__(self, db_url: str):
+    def __init__(
+        self,
+        db_url: str,
+        pool_min_size: int = 5,
+        pool_max_size: int = 20,
+        pool_pre_ping: bool = True,
+        pool_recycle_s: float = 1800.0,
+        pool_timeout_s: float = 30.0,
+        fast_path: bool = True,
+        group_commit_window_s: float = 0.0,
+        group_commit_max_size: int = 100,
+        listen_check_interval_s: float = 5.0,
+    ):
+        """
+        Args:
+            db_url (str): The SQLAlchemy URL of the database.
+            pool_min_size (int): Connections kept open, opened on start.
+            pool_max_size (int): Maximum number of open connections. 0 opens a
+                new connection for every session.
+            pool_pre_ping (bool): Check a connection before handing it out, so
+                connections dropped by the database are replaced.
+            pool_recycle_s (float): Maximum lifetime of a connection.
+            pool_timeout_s (float): How long to wait for a free connection.
+            fast_path (bool): Run the hot queries as prepared statements on the
+                pooled asyncpg connections, bypassing the ORM.
+            group_commit_window_s (float): How long concurrent `add_secret`
+                calls are collected to be inserted in one transaction. 0
+                inserts every secret in its own transaction.
+            group_commit_max_size (int): Maximum number of secrets inserted in
+                one group commit.
+            listen_check_interval_s (float): How often the connection of LISTEN
+                is checked, and reconnected if it was lost.
+        """
         self._logger = logging.getLogger(__class__.__name__)
         self._logger.info(f"initializing with {db_url=}")
-        self._engine = create_async_engine(
-            db_url, poolclass=NullPool
-        )  # TODO: Using NullPool made the tests pass, need to investigate
+        if pool_max_size == 0:
+            self._engine = create_async_engine(db_url, poolclass=NullPool)
+        else:
+            if not 0 <= pool_min_size <= pool_max_size:
+                raise RuntimeError(
+                    f"Pool min size must be between 0 and {pool_max_size}, "
+                    f"got {pool_min_size}"
+                )
+            self._engine = create_async_engine(
+                db_url,
+                pool_size=pool_min_size,
+                max_overflow=pool_max_size - pool_min_size,
+                pool_pre_ping=pool_pre_ping,
+                pool_recycle=pool_recycle_s,
+                pool_timeout=pool_timeout_s,
+            )
+        self._pool_min_size = pool_min_size if pool_max_size else 0
+        self._fast_path = fast_path and self._engine.dialect.driver == "asyncpg"
+        self._secret_writes: Optional[WriteCoalescer[tuple[str, str, bytes], None]] = (
+            None
+        )
+        # A connection of its own receives the notifications of LISTEN, and is
+        # replaced by a watchdog if it is lost
+        self._listen_connection: Optional[AsyncConnection] = None
+        self._listen_driver_connection = None
+        self._listeners: dict[str, Callable] = {}
+        self._listen_reconnected_callbacks: dict[
+            str, Callable[[], Awaitable[None]]
+        ] = {}
+        self._listen_check_interval_s = listen_check_interval_s
+        self._listen_connection_lost = asyncio.Event()
+        self._listen_watchdog: Optional[asyncio.Task] = None
+        # Session advisory locks live as long as the connection that took them
+        self._lock_connections: dict[int, AsyncConnection] = {}
+        if group_commit_window_s > 0:
+            self._secret_writes = WriteCoalescer(
+                self._insert_secrets_ignoring_conflicts,
+                window_s=group_commit_window_s,
+                max_size=group_commit_max_size,
+            )
         self._session = async_sessionmaker(bind=self._engine, expire_on_commit=False)
 
     @classmethod
@@ -64,13 +170,220 @@ class DBManager:
         self._logger.info("Creating Tables")
         async with self._engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+        await self._warm_up_pool()
 
     async def close(self):
         self._logger.info("Stopping DBManager")
+        if self._secret_writes:
+            await self._secret_writes.close()
+        for channel in list(self._listeners):
+            await self.unlisten(channel)
+        for lock_id in list(self._lock_connections):
+            await self.advisory_unlock(lock_id)
         await self._engine.dispose()
 
+    async def notify(self, channel: str, payload: str):
+        """
+        Sends a notification to the listeners of a channel, in all processes.
+
+        Args:
+            channel (str): The channel.
+            payload (str): The payload, up to 8000 bytes.
+
+        Returns:
+            None
+        """
+        async with self._session() as session:
+            await session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": channel, "payload": payload},
+            )
+            await session.commit()
+
+    async def listen(
+        self,
+        channel: str,
+        callback: Callable[[str], None],
+        on_reconnected: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> bool:
+        """
+        Calls `callback` with the payload of every notification on a channel.
+
+        If the connection is lost it is replaced, and `on_reconnected` is
+        called, as the notifications sent in between are lost.
+
+        Args:
+            channel (str): The channel.
+            callback (Callable[[str], None]): Called on the event loop.
+            on_reconnected (Optional[Callable[[], Awaitable[None]]]): Called after
+                the connection was replaced, to catch up from the DB.
+
+        Returns:
+            bool: False if the driver cannot listen, so only notifications of
+            this process can be relied on.
+        """
+        if self._engine.dialect.driver != "asyncpg":
+            return False
+
+        def on_notification(connection, pid, channel, payload):
+            callback(payload)
+
+        self._listeners[channel] = on_notification
+        if on_reconnected:
+            self._listen_reconnected_callbacks[channel] = on_reconnected
+        if self._listen_connection is None:
+            await self._connect_listener()
+        else:
+            await self._listen_driver_connection.add_listener(channel, on_notification)
+        if self._listen_watchdog is None:
+            self._listen_watchdog = asyncio.create_task(self._watch_listen_connection())
+        return True
+
+    async def unlisten(self, channel: str):
+        """
+        Stops listening on a channel.
+
+        Args:
+            channel (str): The channel.
+
+        Returns:
+            None
+        """
+        on_notification = self._listeners.pop(channel, None)
+        self._listen_reconnected_callbacks.pop(channel, None)
+        if self._listeners:
+            if on_notification and self._listen_driver_connection:
+                with contextlib.suppress(Exception):
+                    await self._listen_driver_connection.remove_listener(
+                        channel, on_notification
+                    )
+            return
+        if self._listen_watchdog:
+            self._listen_watchdog.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listen_watchdog
+            self._listen_watchdog = None
+        if self._listen_connection:
+            if on_notification:
+                with contextlib.suppress(Exception):
+                    await self._listen_driver_connection.remove_listener(
+                        channel, on_notification
+                    )
+            connection = self._listen_connection
+            self._listen_connection = None
+            self._listen_driver_connection = None
+            try:
+                await connection.close()
+            except Exception:
+                with contextlib.suppress(Exception):
+                    await connection.invalidate()
+
+    async def try_advisory_lock(self, lock_id: int) -> bool:
+        """
+        Tries to take a session advisory lock without waiting.
+
+        The lock is held on a dedicated connection until `advisory_unlock`, or
+        until that connection is lost.
+
+        Args:
+            lock_id (int): The lock.
+
+        Returns:
+            bool: True if the lock is held by this DBManager.
+        """
+        if lock_id in self._lock_connections:
+            return await self.advisory_lock_held(lock_id)
+        connection = await self._engine.connect()
+        try:
+            result = await connection.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": lock_id}
+            )
+            locked = result.scalar()
+            await connection.commit()
+        except Exception:
+            await connection.invalidate()
+            raise
+        if not locked:
+            await connection.close()
+            return False
+        self._lock_connections[lock_id] = connection
+        return True
+
+    async def advisory_lock_held(self, lock_id: int) -> bool:
+        """
+        Checks that the connection holding an advisory lock is still alive.
+
+        Args:
+            lock_id (int): The lock.
+
+        Returns:
+            bool: False if the lock was not taken, or was lost with its connection.
+        """
+        connection = self._lock_connections.get(lock_id)
+        if connection is None:
+            return False
+        try:
+            await connection.execute(text("SELECT 1"))
+            await connection.commit()
+        except Exception as e:
+            self._logger.warning(f"Lost the connection of advisory lock {lock_id}: {e}")
+            del self._lock_connections[lock_id]
+            with contextlib.suppress(Exception):
+                await connection.invalidate()
+            return False
+        return True
+
+    async def advisory_unlock(self, lock_id: int):
+        """
+        Releases an advisory lock taken by `try_advisory_lock`.
+
+        Args:
+            lock_id (int): The lock.
+
+        Returns:
+            None
+        """
+        connection = self._lock_connections.pop(lock_id, None)
+        if connection is None:
+            return
+        try:
+            await connection.execute(
+                text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": lock_id}
+            )
+            await connection.commit()
+            await connection.close()
+        except Exception:
+            # The lock goes away with the connection
+            with contextlib.suppress(Exception):
+                await connection.invalidate()
+
+    def pool_stats(self) -> Optional[DBPoolStats]:
+        """
+        Returns the connection pool usage, for monitoring.
+
+        Returns:
+            Optional[DBPoolStats]: The pool usage, None if connections are not
+            pooled.
+        """
+        pool = self._engine.pool
+        if isinstance(pool, NullPool):
+            return None
+        return DBPoolStats(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+
     async def add_secret(self, user_id: str, secret_id: str, secret: bytes):
         self._logger.info(f"Adding secret for user_id={user_id}, secret_id={secret_id}")
+        if self._secret_writes:
+            await self._secret_writes.submit((user_id, secret_id, secret))
+            return
+        if self._fast_path:
+            async with self._raw_connection() as connection:
+                await connection.execute(_ADD_SECRET, user_id, secret_id, secret)
+            return
         async with self._session() as session:
             entry = Vault(user_id=user_id, secret_id=secret_id, secret=secret)
             session.add(entry)
@@ -80,12 +393,81 @@ class DBManager:
         self._logger.info(
             f"Retrieving secret for user_id={user_id}, secret_id={secret_id}"
         )
+        if self._fast_path:
+            async with self._raw_connection() as connection:
+                return await connection.fetchval(_GET_SECRET, user_id, secret_id)
         async with self._session() as session:
             result = await session.execute(
                 select(Vault.secret).filter_by(user_id=user_id, secret_id=secret_id)
             )
             return result.scalar()
 
+    async def add_secrets(self, user_id: str, secrets: list[tuple[str, bytes]]):
+        self._logger.info(f"Adding {len(secrets)} secrets for user_id={user_id}")
+        async with self._session() as session:
+            await session.execute(
+                insert(Vault),
+                [
+                    {"user_id": user_id, "secret_id": secret_id, "secret": secret}
+                    for secret_id, secret in secrets
+                ],
+            )
+            await session.commit()
+
+    async def get_secrets(
+        self, user_id: str, secret_ids: list[str]
+    ) -> dict[str, bytes]:
+        self._logger.info(f"Retrieving {len(secret_ids)} secrets for user_id={user_id}")
+        async with self._session() as session:
+            result = await session.execute(
+                select(Vault.secret_id, Vault.secret).where(
+                    Vault.user_id == user_id, Vault.secret_id.in_(secret_ids)
+                )
+            )
+            return {secret_id: secret for secret_id, secret in result.all()}
+
+    async def get_user_and_secrets(
+        self, user_id: str, secret_ids: list[str]
+    ) -> Optional[tuple[bytes, dict[str, bytes]]]:
+        """
+        Gets the public key of a user together with some of the user's secrets.
+
+        Args:
+            user_id (str): The user.
+            secret_ids (list[str]): The secrets to get, missing ones are skipped.
+
+        Returns:
+            Optional[tuple[bytes, dict[str, bytes]]]: The user's public key and the
+            found secrets by id, None if the user does not exist.
+        """
+        self._logger.info(
+            f"Retrieving public key and {len(secret_ids)} secrets for {user_id=}"
+        )
+        if self._fast_path:
+            async with self._raw_connection() as connection:
+                rows = await connection.fetch(
+                    _GET_USER_AND_SECRETS, user_id, secret_ids
+                )
+        else:
+            async with self._session() as session:
+                result = await session.execute(
+                    select(User.public_key, Vault.secret_id, Vault.secret)
+                    .outerjoin(
+                        Vault,
+                        and_(
+                            Vault.user_id == User.user_id,
+                            Vault.secret_id.in_(secret_ids),
+                        ),
+                    )
+                    .where(User.user_id == user_id)
+                )
+                rows = result.all()
+        if not rows:
+            return None
+        # Rows are (public_key, secret_id, secret)
+        secrets = {row[1]: row[2] for row in rows if row[1] is not None}
+        return rows[0][0], secrets
+
     async def add_user(self, user_id: str, public_key: bytes):
         self._logger.info(f"Adding public key for user_id={user_id}")
         async with self._session() as session:
@@ -93,8 +475,37 @@ class DBManager:
             session.add(entry)
             await session.commit()
 
+    async def add_users(self, users: list[tuple[str, bytes]]):
+        self._logger.info(f"Adding public keys for {len(users)} users")
+        async with self._session() as session:
+            await session.execute(
+                insert(User),
+                [
+                    {"user_id": user_id, "public_key": public_key}
+                    for user_id, public_key in users
+                ],
+            )
+            await session.commit()
+
+    async def remove_user(self, user_id: str):
+        self._logger.info(f"Removing user_id={user_id}")
+        async with self._session() as session:
+            row = await session.get(User, user_id)
+            if row:
+                await session.delete(row)
+                await session.commit()
+
+    async def remove_users(self, user_ids: list[str]):
+        self._logger.info(f"Removing {len(user_ids)} users")
+        async with self._session() as session:
+            await session.execute(delete(User).where(User.user_id.in_(user_ids)))
+            await session.commit()
+
     async def get_user_public_key(self, user_id: str):
         self._logger.info(f"Retrieving public key for user_id={user_id}")
+        if self._fast_path:
+            async with self._raw_connection() as connection:
+                return await connection.fetchval(_GET_USER_PUBLIC_KEY, user_id)
         async with self._session() as session:
             result = await session.execute(
                 select(User.public_key).filter_by(user_id=user_id)
@@ -103,10 +514,21 @@ class DBManager:
 
     async def user_exists(self, user_id: str) -> bool:
         self._logger.info(f"Checking if user exists: {user_id}")
+        if self._fast_path:
+            async with self._raw_connection() as connection:
+                return await connection.fetchval(_USER_EXISTS, user_id)
         async with self._session() as session:
             result = await session.execute(select(User).filter_by(user_id=user_id))
             return result.scalars().first() is not None
 
+    async def get_existing_users(self, user_ids: list[str]) -> set[str]:
+        self._logger.info(f"Checking which of {len(user_ids)} users exist")
+        async with self._session() as session:
+            result = await session.execute(
+                select(User.user_id).where(User.user_id.in_(user_ids))
+            )
+            return set(result.scalars().all())
+
     async def add_server(self, register_request: ServiceData):
         self._logger.info(
             f"Adding server with container_id={register_request.container_id}"
@@ -130,6 +552,24 @@ class DBManager:
             await session.delete(row)
             await session.commit()
 
+    async def remove_servers(self, container_ids: list[str]) -> int:
+        self._logger.info(f"Removing {len(container_ids)} servers")
+        async with self._session() as session:
+            result = await session.execute(
+                delete(Server).where(Server.container_id.in_(container_ids))
+            )
+            await session.commit()
+            return result.rowcount
+
+    async def remove_servers_by_name_prefix(self, name_prefix: str) -> int:
+        self._logger.info(f"Removing servers named {name_prefix}*")
+        async with self._session() as session:
+            result = await session.execute(
+                delete(Server).where(Server.ip_address.startswith(name_prefix))
+            )
+            await session.commit()
+            return result.rowcount
+
     async def get_server(self, container_id: str) -> Optional[ServiceData]:
         self._logger.info(f"Retrieving server data for container_id={container_id}")
         async with self._session() as session:
@@ -146,17 +586,51 @@ class DBManager:
 
             return retval
 
+    async def get_servers(self, container_ids: list[str]) -> dict[str, ServiceData]:
+        self._logger.info(f"Retrieving server data for {len(container_ids)} containers")
+        async with self._session() as session:
+            result = await session.execute(
+                select(Server).where(Server.container_id.in_(container_ids))
+            )
+            return {
+                server.container_id: ServiceData(
+                    container_id=server.container_id,
+                    type=server.type,
+                    container_name=server.ip_address,
+                    public_key=server.public_key,
+                )
+                for server in result.scalars().all()
+            }
+
+    async def get_servers_of_type(self, service_type: ServiceType) -> list[ServiceData]:
+        self._logger.info(f"Retrieving all servers of type {service_type.name}")
+        async with self._session() as session:
+            result = await session.execute(
+                select(Server)
+                .where(Server.type == service_type)
+                .order_by(Server.container_id)
+            )
+            return [
+                ServiceData(
+                    container_id=server.container_id,
+                    type=server.type,
+                    container_name=server.ip_address,
+                    public_key=server.public_key,
+                )
+                for server in result.scalars().all()
+            ]
+
     async def get_servers_keys(self) -> list[bytes]:
         self._logger.info("Retrieving all servers public keys")
         async with self._session() as session:
-            result = await session.execute(select(Server))
+            result = await session.execute(self._select_share_servers())
             servers = result.scalars().all()
             return [server.public_key for server in servers]
 
     async def get_servers_addresses(self) -> list[str]:
         self._logger.info("Retrieving all servers ip addresses")
         async with self._session() as session:
-            result = await session.execute(select(Server))
+            result = await session.execute(self._select_share_servers())
             servers = result.scalars().all()
             return [server.ip_address for server in servers]
 
@@ -171,6 +645,35 @@ class DBManager:
             session.add(entry)
             await session.commit()
 
+    async def add_auth_clients(self, auth_clients: list[tuple[str, str, str]]):
+        self._logger.info(f"Adding {len(auth_clients)} AuthClients")
+        async with self._session() as session:
+            await session.execute(
+                insert(AuthClient),
+                [
+                    {"username": username, "verifier": verifier, "salt": salt}
+                    for username, verifier, salt in auth_clients
+                ],
+            )
+            await session.commit()
+
+    async def get_auth_client(self, username: str) -> tuple[str, str]:
+        self._logger.info(f"Retrieving AuthClient verifier and salt for {username=}")
+        if self._fast_path:
+            async with self._raw_connection() as connection:
+                row = await connection.fetchrow(_GET_AUTH_CLIENT, username)
+        else:
+            async with self._session() as session:
+                result = await session.execute(
+                    select(AuthClient.verifier, AuthClient.salt).where(
+                        AuthClient.username == username
+                    )
+                )
+                row = result.first()
+        if not row:
+            raise RuntimeError(f"AuthClient with {username=} doesnt exist")
+        return row[0], row[1]
+
     async def get_auth_client_verifier(self, username: str) -> str:
         self._logger.info(f"Retrieving AuthClient auth_record for {username=}")
         async with self._session() as session:
@@ -188,10 +691,149 @@ class DBManager:
             return result.salt
 
     async def remove_auth_client(self, username: str):
-        self._logger.info(f"Retrieving AuthClient auth_record for {username=}")
+        self._logger.info(f"Removing AuthClient auth_record for {username=}")
         async with self._session() as session:
             row = await session.get(AuthClient, username)
             if not row:
                 raise RuntimeError(f"AuthClient with {username=} doesnt exist")
             await session.delete(row)
             await session.commit()
+
+    async def remove_auth_clients(self, usernames: list[str]):
+        self._logger.info(f"Removing {len(usernames)} AuthClients")
+        async with self._session() as session:
+            await session.execute(
+                delete(AuthClient).where(AuthClient.username.in_(usernames))
+            )
+            await session.commit()
+
+    # Private methods
+    async def _insert_secrets_ignoring_conflicts(
+        self, rows: list[tuple[str, str, bytes]]
+    ) -> list[Optional[RuntimeError]]:
+        # One multi-row INSERT, in one transaction. Rows that already exist are
+        # skipped instead of failing the whole batch, and fail only their caller.
+        self._logger.info(f"Group committing {len(rows)} secrets")
+        if self._fast_path:
+            async with self._raw_connection() as connection:
+                inserted = await connection.fetch(
+                    _ADD_SECRETS_IGNORING_CONFLICTS, *zip(*rows)
+                )
+        else:
+            async with self._session() as session:
+                result = await session.execute(
+                    postgresql.insert(Vault)
+                    .values(
+                        [
+                            {
+                                "user_id": user_id,
+                                "secret_id": secret_id,
+                                "secret": secret,
+                            }
+                            for user_id, secret_id, secret in rows
+                        ]
+                    )
+                    .on_conflict_do_nothing()
+                    .returning(Vault.user_id, Vault.secret_id)
+                )
+                inserted = result.all()
+                await session.commit()
+
+        inserted_keys = {(row[0], row[1]) for row in inserted}
+        results: list[Optional[RuntimeError]] = []
+        for user_id, secret_id, _ in rows:
+            if (user_id, secret_id) in inserted_keys:
+                # A key submitted twice in one batch is inserted for the first
+                inserted_keys.remove((user_id, secret_id))
+                results.append(None)
+            else:
+                results.append(
+                    RuntimeError(f"Secret {secret_id} already exists for {user_id=}")
+                )
+        return results
+
+    async def _connect_listener(self):
+        connection = await self._engine.connect()
+        try:
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+            driver_connection.add_termination_listener(
+                lambda _: self._listen_connection_lost.set()
+            )
+            for channel, on_notification in self._listeners.items():
+                await driver_connection.add_listener(channel, on_notification)
+        except Exception:
+            with contextlib.suppress(Exception):
+                await connection.invalidate()
+            raise
+        self._listen_connection = connection
+        self._listen_driver_connection = driver_connection
+
+    async def _listen_connection_alive(self) -> bool:
+        if self._listen_driver_connection is None:
+            return False
+        if self._listen_driver_connection.is_closed():
+            return False
+        try:
+            await asyncio.wait_for(
+                self._listen_driver_connection.fetchval("SELECT 1"),
+                timeout=self._listen_check_interval_s,
+            )
+        except Exception:
+            return False
+        return True
+
+    async def _watch_listen_connection(self):
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._listen_connection_lost.wait(),
+                    timeout=self._listen_check_interval_s,
+                )
+            self._listen_connection_lost.clear()
+            if await self._listen_connection_alive():
+                continue
+
+            self._logger.warning("Lost the connection of LISTEN, reconnecting")
+            if self._listen_connection:
+                connection = self._listen_connection
+                self._listen_connection = None
+                self._listen_driver_connection = None
+                with contextlib.suppress(Exception):
+                    await connection.invalidate()
+            try:
+                await self._connect_listener()
+            except Exception as e:
+                self._logger.error(f"Failed to reconnect LISTEN: {e}")
+                continue
+            for on_reconnected in list(self._listen_reconnected_callbacks.values()):
+                try:
+                    await on_reconnected()
+                except Exception as e:
+                    self._logger.error(f"Failed to catch up after reconnecting: {e}")
+
+    @contextlib.asynccontextmanager
+    async def _raw_connection(self) -> AsyncIterator:
+        # A connection of the engine's pool, so the pool settings and stats
+        # apply. Statements run in autocommit mode, outside a transaction.
+        async with self._engine.connect() as connection:
+            raw_connection = await connection.get_raw_connection()
+            yield raw_connection.driver_connection
+
+    async def _warm_up_pool(self):
+        # Open the connections that are kept anyway, so the first requests do
+        # not pay for connecting
+        connections = await asyncio.gather(
+            *[self._engine.connect().start() for _ in range(self._pool_min_size)]
+        )
+        for connection in connections:
+            await connection.close()
+
+    def _select_share_servers(self):
+        # Bootstraps register in the same table. A stable order keeps the keys
+        # and the addresses of the share servers aligned.
+        return (
+            select(Server)
+            .where(Server.type == ServiceType.SHARE_SERVER)
+            .order_by(Server.container_id)
+        )
@@ -0,0 +1,61 @@
+import asyncio
+import contextlib
+import time
+from collections import deque
+from typing import Optional
+
+
+class EventLoopMonitor:
+    """
+    Measures how late the event loop runs its callbacks.
+
+    Every `interval_s` a task asks to wake up after the interval, and the time
+    it wakes up past that is the lag: how long something held the loop, so
+    every other request had to wait. The lag of the latest `window_size`
+    wakeups is kept.
+    """
+
+    def __init__(self, interval_s: float = 0.1, window_size: int = 600):
+        self._interval_s = interval_s
+        self._lags_s: deque[float] = deque(maxlen=window_size)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def lag_s(self) -> float:
+        """The lag of the latest wakeup."""
+        return self._lags_s[-1] if self._lags_s else 0.0
+
+    @property
+    def max_lag_s(self) -> float:
+        """The worst lag within the window."""
+        return max(self._lags_s, default=0.0)
+
+    def start(self):
+        """
+        Starts measuring in the background.
+
+        Returns:
+            None
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._measure())
+
+    async def close(self):
+        """
+        Stops measuring.
+
+        Returns:
+            None
+        """
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    # Private methods
+    async def _measure(self):
+        while True:
+            expected = time.monotonic() + self._interval_s
+            await asyncio.sleep(self._interval_s)
+            self._lags_s.append(max(time.monotonic() - expected, 0.0))
@@ -0,0 +1,109 @@
+import asyncio
+import contextlib
+import logging
+from typing import Awaitable, Callable, Optional
+
+from vault.manager.db_manager import DBManager
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+# Advisory lock of the manager replicas of one DB, "vault" in ASCII
+LEADER_LOCK_ID = 0x7661756C74
+
+
+class LeaderElection:
+    """
+    Elects one leader among the manager replicas sharing a DB.
+
+    The leader is the replica holding a Postgres session advisory lock. The
+    other replicas try to take the lock every `interval_s`, and the leader
+    checks as often that the connection holding it is alive. Postgres releases
+    the lock when the leader's connection is lost, so a crashed leader is
+    replaced within about `interval_s`. `on_elected` runs when this replica
+    becomes the leader, and `on_deposed` when it loses the lock.
+    """
+
+    def __init__(
+        self,
+        db: DBManager,
+        on_elected: Callable[[], Awaitable[None]],
+        on_deposed: Callable[[], Awaitable[None]],
+        lock_id: int = LEADER_LOCK_ID,
+        interval_s: float = 5.0,
+    ):
+        self._logger = logging.getLogger(__class__.__name__)
+        self._db = db
+        self._on_elected = on_elected
+        self._on_deposed = on_deposed
+        self._lock_id = lock_id
+        self._interval_s = interval_s
+        self._is_leader = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    async def start(self):
+        """
+        Runs for leadership once, then keeps running in the background.
+
+        A replica that starts alone is the leader when this returns.
+
+        Returns:
+            None
+        """
+        await self._campaign()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """
+        Stops running for leadership and releases the lock if it is held.
+
+        `on_deposed` is not called, the caller is shutting down anyway.
+
+        Returns:
+            None
+        """
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._is_leader:
+            self._is_leader = False
+            await self._db.advisory_unlock(self._lock_id)
+            self._logger.info("Stepped down as the leader")
+
+    # Private methods
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self._interval_s)
+            if not self._is_leader:
+                await self._campaign()
+            elif not await self._db.advisory_lock_held(self._lock_id):
+                self._is_leader = False
+                self._logger.warning("Lost the leadership")
+                try:
+                    await self._on_deposed()
+                except Exception as e:
+                    self._logger.error(f"Failed to step down as the leader: {e}")
+
+    async def _campaign(self):
+        try:
+            if not await self._db.try_advisory_lock(self._lock_id):
+                return
+        except Exception as e:
+            self._logger.error(f"Failed to run for leadership: {e}")
+            return
+        self._is_leader = True
+        self._logger.info("Elected as the leader")
+        try:
+            await self._on_elected()
+        except Exception as e:
+            # Let another replica take over instead of leading half set up
+            self._logger.error(f"Failed to take over as the leader: {e}")
+            self._is_leader = False
+            await self._db.advisory_unlock(self._lock_id)
@@ -1,20 +1,33 @@
+import asyncio
+import contextlib
+import hashlib
 import logging
-from typing import List
+import time
+from collections import deque
+from typing import AsyncIterator, List, Optional
 
 import grpc
 
 from vault.common import types
+from vault.common.channel_pool import ChannelPool
 from vault.common.generated.vault_pb2 import (
-    DecryptRequest,
-    DecryptResponse,
+    DecryptBatchRequest,
+    DecryptBatchResponse,
+    DeleteShareRequest,
+    GenerateSharesBatchRequest,
+    GenerateSharesBatchResponse,
     GenerateSharesRequest,
     GenerateSharesResponse,
     InnerRequest,
     InnerResponse,
+    RegisterBatchRequest,
+    RegisterBatchResponse,
     RegisterRequest,
     RegisterResponse,
     RetrieveSecretRequest,
     RetrieveSecretResponse,
+    RetrieveSecretsRequest,
+    RetrieveSecretsResponse,
     Secret,
     SecureReqMsgWrapper,
     SecureRespMsgWrapper,
@@ -22,6 +35,10 @@ from vault.common.generated.vault_pb2 import (
     SRPThirdStepAck,
     StoreSecretRequest,
     StoreSecretResponse,
+    StoreSecretsRequest,
+    StoreSecretsResponse,
+    StoreShareBatchRequest,
+    StoreShareBatchResponse,
     StoreShareRequest,
     StoreShareResponse,
 )
@@ -31,13 +48,17 @@ from vault.common.generated.vault_pb2_grpc import (
     ShareServerStub,
     add_ManagerServicer_to_server,
 )
-from vault.crypto.authentication import (
-    srp_authentication_server_step_one,
-    srp_authentication_server_step_three,
-)
 from vault.crypto.certs import generate_component_cert_and_key, load_ca_cert
 from vault.manager.db_manager import DBManager
+from vault.manager.event_loop_monitor import EventLoopMonitor
+from vault.manager.leader_election import LeaderElection
+from vault.manager.resumption_tickets import ResumptionTickets
+from vault.manager.server_registry import ServerRegistry, ServerRegistrySnapshot
 from vault.manager.setup_master import SetupMaster
+from vault.manager.share_server_stats import ShareServerStats
+from vault.manager.srp_executor import SRPExecutor, SRPExecutorFull
+from vault.manager.srp_record_cache import SRPRecord, SRPRecordCache
+from vault.manager.warm_pool import WarmPool
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -65,17 +86,60 @@ class Manager(ManagerServicer):
         share_server_command: str,
         ca_cert_path: str = "certs/ca.crt",
         ca_key_path: str = "certs/ca.key",
+        share_server_timeout_s: float = 5.0,
+        max_concurrent_share_server_requests: int = 64,
+        channel_idle_timeout_s: float = 300.0,
+        max_concurrent_session_requests: int = 32,
+        resumption_ticket_lifetime_s: float = 60.0,
+        max_batch_size: int = 1000,
+        share_server_decrypt_workers: int = 0,
+        threshold: Optional[int] = None,
+        hedge_percentile: float = 0.95,
+        max_parallel_container_ops: int = 8,
+        bootstrap_pool_size: int = 2,
+        bootstrap_max_uses: int = 1,
+        bootstrap_ttl_s: float = 300.0,
+        db_pool_min_size: int = 5,
+        db_pool_max_size: int = 20,
+        db_pool_pre_ping: bool = True,
+        db_pool_recycle_s: float = 1800.0,
+        db_fast_path: bool = True,
+        db_group_commit_window_s: float = 0.002,
+        db_group_commit_max_size: int = 100,
+        srp_record_cache_ttl_s: float = 0.0,
+        srp_record_cache_size: int = 10_000,
+        leader_election_interval_s: float = 5.0,
+        terminate_share_servers_on_stop: bool = True,
+        worker_id: Optional[int] = None,
+        srp_workers: int = 0,
+        srp_worker_processes: bool = True,
+        srp_max_queued: int = 256,
+        metrics_interval_s: float = 60.0,
+        setup_master_address: Optional[str] = None,
     ):
         self._logger = logging.getLogger(__class__.__name__)
         self._port = port
         self._name = name
+        # Share servers and bootstraps register with any replica behind it
+        self._setup_master_address = setup_master_address or name
         self._cert, self._ssl_privkey = generate_component_cert_and_key(
             name=name,
+            dns_names=[self._setup_master_address],
             ca_cert_path=ca_cert_path,
             ca_key_path=ca_key_path,
         )
         self._ca_cert = load_ca_cert(ca_cert_path)
         self._num_of_share_servers = num_of_share_servers
+        # Shares needed to decrypt, the user's share included. Defaults to all of
+        # them, so no group of share servers can decrypt without the user.
+        self._threshold = (
+            threshold if threshold is not None else num_of_share_servers + 1
+        )
+        if not 1 <= self._threshold <= num_of_share_servers + 1:
+            raise RuntimeError(
+                f"Threshold must be between 1 and {num_of_share_servers + 1}, "
+                f"got {self._threshold}"
+            )
         self._share_servers_data: List[types.ServiceData] = []
         self._ready = False
         self._setup_master_port = setup_master_port
@@ -88,21 +152,67 @@ class Manager(ManagerServicer):
         self._share_server_command = share_server_command
         self._ca_cert_path = ca_cert_path
         self._ca_key_path = ca_key_path
+        self._share_server_timeout_s = share_server_timeout_s
+        self._share_server_requests_semaphore = asyncio.Semaphore(
+            max_concurrent_share_server_requests
+        )
+        self._max_concurrent_session_requests = max_concurrent_session_requests
+        self._resumption_tickets = ResumptionTickets(resumption_ticket_lifetime_s)
+        self._srp_records = SRPRecordCache(
+            srp_record_cache_ttl_s, max_records=srp_record_cache_size
+        )
+        self._srp = SRPExecutor(
+            workers=srp_workers,
+            use_processes=srp_worker_processes,
+            max_queued=srp_max_queued,
+        )
+        self._event_loop_monitor = EventLoopMonitor()
+        self._metrics_interval_s = metrics_interval_s
+        self._metrics_task: Optional[asyncio.Task] = None
+        self._max_batch_size = max_batch_size
+        self._share_server_decrypt_workers = share_server_decrypt_workers
+        self._max_parallel_container_ops = max_parallel_container_ops
+        self._terminate_share_servers_on_stop = terminate_share_servers_on_stop
+        self._share_server_stats = ShareServerStats(
+            default_hedge_delay_s=share_server_timeout_s,
+            hedge_percentile=hedge_percentile,
+        )
 
         # grpc server
         self._client_creds = grpc.ssl_channel_credentials(
             root_certificates=self._ca_cert
         )
+        self._channel_pool = ChannelPool(
+            self._client_creds, idle_timeout_s=channel_idle_timeout_s
+        )
         creds = grpc.ssl_server_credentials([(self._ssl_privkey, self._cert)])
-        self._server = grpc.aio.server()
+        self._server = grpc.aio.server(
+            options=[
+                # Users keep long-lived channels with keepalive pings
+                ("grpc.keepalive_permit_without_calls", 1),
+                ("grpc.http2.min_ping_interval_without_data_ms", 10_000),
+                # Worker processes of one manager share the port
+                ("grpc.so_reuseport", 1),
+            ]
+        )
         add_ManagerServicer_to_server(self, self._server)
         self._port = self._server.add_secure_port(f"[::]:{self._port}", creds)
 
         # DB
         self._db = DBManager(
-            f"postgresql+asyncpg://{db_username}:{db_password}@{db_host}:{db_port}/{db_name}"
+            f"postgresql+asyncpg://{db_username}:{db_password}@{db_host}:{db_port}/{db_name}",
+            pool_min_size=db_pool_min_size,
+            pool_max_size=db_pool_max_size,
+            pool_pre_ping=db_pool_pre_ping,
+            pool_recycle_s=db_pool_recycle_s,
+            fast_path=db_fast_path,
+            group_commit_window_s=db_group_commit_window_s,
+            group_commit_max_size=db_group_commit_max_size,
         )
 
+        # Share servers registered with the setup master, loaded from DB on start
+        self._share_servers = ServerRegistry()
+
         # Setup master
         self._setup_master_service: SetupMaster = SetupMaster(
             port=setup_master_port,
@@ -110,13 +220,60 @@ class Manager(ManagerServicer):
             db=self._db,
             server_creds=creds,
             client_creds=self._client_creds,
+            channel_pool=self._channel_pool,
+            registry=self._share_servers,
+        )
+        # Every replica keeps its own bootstraps, named after a hash of the
+        # replica's name so no replica's prefix is the prefix of another's
+        replica_name = self._name if worker_id is None else f"{self._name}-w{worker_id}"
+        replica_token = hashlib.sha256(replica_name.encode()).hexdigest()[:12]
+        self._bootstrap_pool = WarmPool(
+            setup_master=self._setup_master_service,
+            name_prefix=f"vault-bootstrap-{replica_token}",
+            image=docker_image,
+            command=bootstrap_command,
+            network=docker_network,
+            environment={
+                "PORT": self._bootstrap_port,
+                "SETUP_UNIT_PORT": self._setup_unit_port,
+                "SETUP_MASTER_ADDRESS": self._setup_master_address,
+                "SETUP_MASTER_PORT": self._setup_master_port,
+                "CA_CERT_PATH": self._ca_cert_path,
+                "CA_KEY_PATH": self._ca_key_path,
+                # Lets idle bootstraps generate the key material ahead of time
+                "THRESHOLD": self._threshold,
+                "NUM_OF_SHARES": self._num_of_share_servers + 1,
+            },
+            size=bootstrap_pool_size,
+            max_uses=bootstrap_max_uses,
+            ttl_s=bootstrap_ttl_s,
+            max_parallel=max_parallel_container_ops,
+        )
+
+        # Replicas sharing the DB elect the one that owns the share servers
+        self._leader_election = LeaderElection(
+            db=self._db,
+            on_elected=self._on_elected,
+            on_deposed=self._on_deposed,
+            interval_s=leader_election_interval_s,
         )
 
+    @property
+    def is_leader(self) -> bool:
+        return self._leader_election.is_leader
+
     async def start(self):
         await self._db.start()
+        await self._share_servers.load(self._db)
+        await self._channel_pool.start()
         await self._setup_master_service.start()
 
-        await self.launch_all_share_servers()
+        await self._leader_election.start()
+        await self._bootstrap_pool.start()
+        await self._srp.start()
+        self._event_loop_monitor.start()
+        if self._metrics_interval_s > 0:
+            self._metrics_task = asyncio.create_task(self._log_metrics())
 
         await self._server.start()
         self._ready = True
@@ -125,10 +282,21 @@ class Manager(ManagerServicer):
     async def stop(self):
         self._ready = False
         await self._server.stop(grace=5.0)
-        await self.terminate_all_share_servers()
+        if self._metrics_task:
+            self._metrics_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._metrics_task
+            self._metrics_task = None
+        await self._event_loop_monitor.close()
+        await self._srp.close()
+        await self._bootstrap_pool.close()
+        if self.is_leader and self._terminate_share_servers_on_stop:
+            await self.terminate_all_share_servers()
+        await self._leader_election.close()
 
         # db must live until _setup_master_service dies
         await self._setup_master_service.stop()
+        await self._channel_pool.close()
         await self._db.close()
         self._logger.info("Server stopped")
 
@@ -138,23 +306,51 @@ class Manager(ManagerServicer):
             await self._db.add_auth_client(
                 username=request.user_id, verifier=request.verifier, salt=request.salt
             )
+            self._srp_records.invalidate(request.user_id)
         except Exception as e:
             await context.abort(
                 grpc.StatusCode.INTERNAL, f"SRP registration failed {e}"
             )
             return
 
+        registered = False
         try:
-            return await self._register(request)
-        except RuntimeError as e:
+            response = await self._register(request)
+            registered = True
+            return response
+        except Exception as e:
             await context.abort(
                 grpc.StatusCode.UNKNOWN, f"_vault_register had error: {e}"
             )
             return
+        finally:
+            # The auth client was added by this request, so the user can retry,
+            # whatever failed, including a cancelled call
+            if not registered:
+                await asyncio.shield(self._db.remove_auth_client(request.user_id))
+                self._srp_records.invalidate(request.user_id)
+
+    async def RegisterBatch(
+        self, request: RegisterBatchRequest, context
+    ) -> RegisterBatchResponse:
+        self._logger.info(f"RegisterBatch request for {len(request.users)} users")
+        try:
+            return await self._register_batch(request)
+        except Exception as e:
+            await context.abort(
+                grpc.StatusCode.UNKNOWN, f"_vault_register_batch had error: {e}"
+            )
+            return
 
     async def SecureCall(self, request_iterator, context):
         """
         Bidirectional stream handling:
+        SRP handshake (auth_step_1 -> auth_step_2 -> auth_step_3 -> auth_step_3_ack),
+        then a single app_req -> app_resp. If auth_step_1 asks for a session, the
+        stream instead serves app_req messages until the client is done writing,
+        handling them concurrently and answering each one as soon as it completes.
+        A client holding a resumption ticket from auth_step_3_ack may instead open
+        with auth_resume, directly followed by its app_req.
         """
         req_iter = request_iterator.__aiter__()
 
@@ -164,6 +360,24 @@ class Manager(ManagerServicer):
             await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "no messages")
             return
 
+        if auth_step_1_msg and auth_step_1_msg.HasField("auth_resume"):
+            auth_resume = auth_step_1_msg.auth_resume
+            if not self._resumption_tickets.verify(
+                username=auth_resume.username,
+                ticket=auth_resume.ticket,
+                nonce=auth_resume.nonce,
+                proof=auth_resume.proof,
+            ):
+                await context.abort(
+                    grpc.StatusCode.UNAUTHENTICATED, "invalid resumption ticket"
+                )
+                return
+            async for resp in self._serve_authenticated(
+                req_iter, context, session=False
+            ):
+                yield resp
+            return
+
         if not auth_step_1_msg or not auth_step_1_msg.HasField("auth_step_1"):
             await context.abort(
                 grpc.StatusCode.INVALID_ARGUMENT, "expected auth_step_1"
@@ -171,17 +385,20 @@ class Manager(ManagerServicer):
             return
 
         username: str = auth_step_1_msg.auth_step_1.username
-        password_verifier: str = await self._db.get_auth_client_verifier(username)
-        salt: str = await self._db.get_auth_client_salt(username)
+        srp_record = await self._get_srp_record(username)
 
-        server_public, server_private = srp_authentication_server_step_one(
-            username=username,
-            password_verifier=password_verifier,
-        )
+        try:
+            server_public, server_private = await self._srp.step_one(
+                username=username,
+                password_verifier=srp_record.verifier,
+            )
+        except SRPExecutorFull as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+            return
         yield SecureRespMsgWrapper(
             auth_step_2=SRPSecondStep(
                 server_public_key=server_public,
-                salt=salt,
+                salt=srp_record.salt,
             )
         )
 
@@ -202,20 +419,52 @@ class Manager(ManagerServicer):
             auth_step_3_msg.auth_step_3.client_session_key_proof
         )
 
-        _ = srp_authentication_server_step_three(
-            username=username,
-            password_verifier=password_verifier,
-            salt=salt,
-            server_private=server_private,
-            client_public=client_public,
-            client_session_key_proof=client_session_key_proof,
-        )
+        try:
+            session_key = await self._srp.step_three(
+                username=username,
+                password_verifier=srp_record.verifier,
+                salt=srp_record.salt,
+                server_private=server_private,
+                client_public=client_public,
+                client_session_key_proof=client_session_key_proof,
+            )
+        except SRPExecutorFull as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+            return
 
-        yield SecureRespMsgWrapper(
-            auth_step_3_ack=SRPThirdStepAck(
-                ok=True,
+        auth_step_3_ack = SRPThirdStepAck(ok=True)
+        if self._resumption_tickets.enabled:
+            auth_step_3_ack.resumption_ticket = self._resumption_tickets.issue(
+                username, session_key
             )
-        )
+            auth_step_3_ack.resumption_ticket_lifetime_s = int(
+                self._resumption_tickets.lifetime_s
+            )
+        yield SecureRespMsgWrapper(auth_step_3_ack=auth_step_3_ack)
+
+        async for resp in self._serve_authenticated(
+            req_iter, context, session=auth_step_1_msg.auth_step_1.session
+        ):
+            yield resp
+
+    async def _get_srp_record(self, username: str) -> SRPRecord:
+        srp_record = self._srp_records.get(username)
+        if srp_record is None:
+            verifier, salt = await self._db.get_auth_client(username)
+            srp_record = SRPRecord(verifier=verifier, salt=salt)
+            self._srp_records.put(username, srp_record)
+        return srp_record
+
+    async def _serve_authenticated(
+        self, req_iter: AsyncIterator[SecureReqMsgWrapper], context, session: bool
+    ) -> AsyncIterator[SecureRespMsgWrapper]:
+        if session:
+            try:
+                async for session_resp in self._serve_session(req_iter):
+                    yield session_resp
+            except ValueError as e:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            return
 
         try:
             app_request_msg: SecureReqMsgWrapper = await req_iter.__anext__()
@@ -239,6 +488,49 @@ class Manager(ManagerServicer):
         # Must yield here - otherwise python is mad.
         yield SecureRespMsgWrapper(app_resp=app_resp)
 
+    async def _serve_session(
+        self, req_iter: AsyncIterator[SecureReqMsgWrapper]
+    ) -> AsyncIterator[SecureRespMsgWrapper]:
+        responses: asyncio.Queue[SecureRespMsgWrapper | None] = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self._max_concurrent_session_requests)
+        handlers: set[asyncio.Task] = set()
+
+        async def handle(app_req: InnerRequest):
+            try:
+                app_resp = await self._handle_user_inner_request(app_req)
+            except Exception as e:
+                app_resp = InnerResponse(
+                    error=f"_handle_user_inner_request had error: {e}"
+                )
+            finally:
+                semaphore.release()
+            app_resp.request_id = app_req.request_id
+            await responses.put(SecureRespMsgWrapper(app_resp=app_resp))
+
+        async def read_requests():
+            try:
+                async for msg in req_iter:
+                    if not msg.HasField("app_req"):
+                        raise ValueError("expected app_req")
+                    await semaphore.acquire()
+                    handler = asyncio.create_task(handle(msg.app_req))
+                    handlers.add(handler)
+                    handler.add_done_callback(handlers.discard)
+                await asyncio.gather(*handlers)
+            finally:
+                await responses.put(None)
+
+        reader = asyncio.create_task(read_requests())
+        try:
+            while (app_resp_msg := await responses.get()) is not None:
+                yield app_resp_msg
+            # Raises if the client sent an unexpected message
+            await reader
+        finally:
+            reader.cancel()
+            for handler in handlers:
+                handler.cancel()
+
     async def _handle_user_inner_request(
         self, inner_request: InnerRequest
     ) -> InnerResponse:
@@ -248,6 +540,14 @@ class Manager(ManagerServicer):
             return InnerResponse(
                 retrieve=await self.retrieve_secret(inner_request.retrieve)
             )
+        elif inner_request.HasField("store_batch"):
+            return InnerResponse(
+                store_batch=await self.store_secrets(inner_request.store_batch)
+            )
+        elif inner_request.HasField("retrieve_batch"):
+            return InnerResponse(
+                retrieve_batch=await self.retrieve_secrets(inner_request.retrieve_batch)
+            )
         else:
             raise RuntimeError("unknown InnerRequest body type")
 
@@ -257,75 +557,351 @@ class Manager(ManagerServicer):
         self._validate_server_ready()
         await self._validate_user_not_exists(request.user_id)
 
-        # Add user to DB
+        # Add user to DB, it is removed again if the registration fails or is
+        # cancelled. The removal is shielded, so a second cancel cannot stop it.
         await self._db.add_user(request.user_id, request.user_public_key)
+        registered = False
+        try:
+            response = await self._generate_and_distribute_shares(request)
+            registered = True
+            return response
+        finally:
+            if not registered:
+                await asyncio.shield(self._db.remove_user(request.user_id))
 
-        # Get public keys of share servers
-        public_keys = await self._db.get_servers_keys()
-        self._validate_num_of_servers_in_db(len(public_keys))
+    async def _generate_and_distribute_shares(
+        self, request: RegisterRequest
+    ) -> RegisterResponse:
+        # One snapshot keeps the keys and the addresses of the servers aligned
+        share_servers = self._share_servers.snapshot()
+        self._validate_num_of_servers_in_db(len(share_servers.servers))
+        public_keys = share_servers.public_keys
 
         # Add user's public key to the end of the list, where the bootstrap expects it
         public_keys.append(request.user_public_key)
 
-        # Create bootstrap
-        bootstrap_server_data = await self._setup_master_service.spawn_server(
-            image=self._docker_image,
-            container_name=f"vault-bootstrap-{request.user_id}",
-            command=self._bootstrap_command,
-            network=self._docker_network,
-            environment={
-                "PORT": self._bootstrap_port,
-                "SETUP_UNIT_PORT": self._setup_unit_port,
-                "SETUP_MASTER_ADDRESS": self._name,
-                "SETUP_MASTER_PORT": self._setup_master_port,
-                "CA_CERT_PATH": self._ca_cert_path,
-                "CA_KEY_PATH": self._ca_key_path,
-            },
+        # Take a ready bootstrap. It is terminated in the background after its
+        # last use, so the shares below are distributed while it shuts down.
+        async with self._bootstrap_pool.service() as bootstrap_server_data:
+            bootstrap_address = (
+                f"{bootstrap_server_data.container_name}:{self._bootstrap_port}"
+            )
+
+            # Sending generate shares request to bootstrap
+            async with self._channel_pool.channel(bootstrap_address) as channel:
+                stub = BootstrapStub(channel)
+                bootstrap_response: GenerateSharesResponse = await stub.GenerateShares(
+                    GenerateSharesRequest(
+                        threshold=self._threshold,
+                        num_of_shares=self._num_of_share_servers + 1,  # +1 for the user
+                        public_keys=public_keys,
+                    )
+                )
+
+        # Get user's share, assuming it is the last one
+        user_share = bootstrap_response.encrypted_shares.pop()
+
+        # Send shares to all the share servers at once
+        await self._distribute_shares(
+            request.user_id,
+            dict(zip(share_servers.addresses, bootstrap_response.encrypted_shares)),
         )
-        bootstrap_address = (
-            f"{bootstrap_server_data.container_name}:{self._bootstrap_port}"
+
+        # Send to user his share and encryption key
+        return RegisterResponse(
+            encrypted_share=user_share,
+            encrypted_key=bootstrap_response.encrypted_key,
+            threshold=self._threshold,
+            num_of_shares=self._num_of_share_servers + 1,
         )
 
-        # Sending generate shares request to bootstrap
-        async with grpc.aio.secure_channel(
-            bootstrap_address, self._client_creds
-        ) as channel:
-            stub = BootstrapStub(channel)
-            bootstrap_response: GenerateSharesResponse = await stub.GenerateShares(
-                GenerateSharesRequest(
-                    threshold=self._num_of_share_servers + 1,  # +1 for the user
+    async def _distribute_shares(self, user_id: str, shares: dict[str, bytes]):
+        """
+        Stores the shares of a user on all the share servers concurrently.
+
+        Either every server stores its share, or the shares are deleted again
+        from the servers that may have stored them.
+
+        Args:
+            user_id (str): The user the shares belong to.
+            shares (dict[str, bytes]): The encrypted share of every server address.
+
+        Returns:
+            None
+        """
+        try:
+            results = await asyncio.gather(
+                *[
+                    self._store_share_on_share_server(server_address, user_id, share)
+                    for server_address, share in shares.items()
+                ],
+                return_exceptions=True,
+            )
+        except asyncio.CancelledError:
+            # Any server might have stored its share before the call was cancelled
+            await asyncio.shield(self._delete_shares([user_id], list(shares)))
+            raise
+        failed = {
+            server_address: result
+            for server_address, result in zip(shares, results)
+            if isinstance(result, BaseException)
+        }
+        if not failed:
+            return
+
+        for server_address, error in failed.items():
+            self._logger.error(
+                f"Failed to store share of {user_id} on server {server_address}: {error}"
+            )
+        # A server that rejected the share as existing did not store it, any
+        # other server, including one that timed out, might have
+        rollback_addresses = [
+            server_address
+            for server_address in shares
+            if not self._is_already_exists(failed.get(server_address))
+        ]
+        await self._delete_shares([user_id], rollback_addresses)
+        raise RuntimeError(
+            f"Failed to store shares of {user_id} on {len(failed)} of "
+            f"{len(shares)} share servers"
+        )
+
+    async def _store_share_on_share_server(
+        self, server_address: str, user_id: str, share: bytes
+    ):
+        async with self._share_server_requests_semaphore:
+            async with self._channel_pool.channel(
+                f"{server_address}:{self._share_server_port}"
+            ) as channel:
+                stub = ShareServerStub(channel)
+                response: StoreShareResponse = await stub.StoreShare(
+                    StoreShareRequest(user_id=user_id, encrypted_share=share),
+                    timeout=self._share_server_timeout_s,
+                )
+        if not response.success:
+            raise RuntimeError(f"Share server {server_address} did not store share")
+
+    async def _delete_shares(self, user_ids: list[str], server_addresses: list[str]):
+        await asyncio.gather(
+            *[
+                self._delete_share_on_share_server(server_address, user_id)
+                for user_id in user_ids
+                for server_address in server_addresses
+            ]
+        )
+
+    async def _delete_share_on_share_server(self, server_address: str, user_id: str):
+        try:
+            async with self._share_server_requests_semaphore:
+                async with self._channel_pool.channel(
+                    f"{server_address}:{self._share_server_port}"
+                ) as channel:
+                    stub = ShareServerStub(channel)
+                    await stub.DeleteShare(
+                        DeleteShareRequest(user_id=user_id),
+                        timeout=self._share_server_timeout_s,
+                    )
+        except grpc.aio.AioRpcError as e:
+            if e.code() != grpc.StatusCode.NOT_FOUND:
+                self._logger.error(
+                    f"Failed to roll back share of {user_id} on server "
+                    f"{server_address}: {e.code()}"
+                )
+
+    async def _register_batch(
+        self, request: RegisterBatchRequest
+    ) -> RegisterBatchResponse:
+        self._validate_server_ready()
+        self._validate_batch_size(len(request.users))
+        user_ids = [user.user_id for user in request.users]
+        if len(set(user_ids)) != len(user_ids):
+            raise RuntimeError("Duplicate users in batch")
+        existing_users = await self._db.get_existing_users(user_ids)
+        if existing_users:
+            raise RuntimeError(f"Users {sorted(existing_users)} already exist")
+
+        # Add users to DB, the users that fail to register are removed again.
+        # All of them are removed if the call fails or is cancelled half way,
+        # shielded so a second cancel cannot stop it.
+        try:
+            await self._db.add_auth_clients(
+                [(user.user_id, user.verifier, user.salt) for user in request.users]
+            )
+        except Exception as e:
+            raise RuntimeError(f"SRP registration failed {e}") from e
+        for user in request.users:
+            self._srp_records.invalidate(user.user_id)
+        distributed = False
+        try:
+            await self._db.add_users(
+                [(user.user_id, user.user_public_key) for user in request.users]
+            )
+            share_servers, bootstrap_response = await self._generate_shares_batch(
+                request
+            )
+
+            # Send each share server the shares of all the users at once
+            failed = await self._distribute_shares_batch(
+                user_ids,
+                {
+                    server_address: [
+                        user_response.encrypted_shares[i]
+                        for user_response in bootstrap_response.users
+                    ]
+                    for i, server_address in enumerate(share_servers.addresses)
+                },
+            )
+            distributed = True
+        finally:
+            if not distributed:
+                await asyncio.shield(self._remove_users(user_ids))
+        if failed:
+            await asyncio.shield(self._remove_users(list(failed)))
+
+        # Send to users their shares and encryption keys, the user's share is last
+        return RegisterBatchResponse(
+            users=[
+                RegisterResponse(error=failed[user_id])
+                if user_id in failed
+                else RegisterResponse(
+                    encrypted_share=user_response.encrypted_shares[-1],
+                    encrypted_key=user_response.encrypted_key,
+                    threshold=self._threshold,
                     num_of_shares=self._num_of_share_servers + 1,
-                    public_keys=public_keys,
                 )
+                for user_id, user_response in zip(user_ids, bootstrap_response.users)
+            ]
+        )
+
+    async def _generate_shares_batch(
+        self, request: RegisterBatchRequest
+    ) -> tuple[ServerRegistrySnapshot, GenerateSharesBatchResponse]:
+        # One snapshot keeps the keys and the addresses of the servers aligned
+        share_servers = self._share_servers.snapshot()
+        self._validate_num_of_servers_in_db(len(share_servers.servers))
+
+        # One bootstrap generates the key sets of all the users
+        async with self._bootstrap_pool.service() as bootstrap_server_data:
+            bootstrap_address = (
+                f"{bootstrap_server_data.container_name}:{self._bootstrap_port}"
             )
+            async with self._channel_pool.channel(bootstrap_address) as channel:
+                stub = BootstrapStub(channel)
+                bootstrap_response: GenerateSharesBatchResponse = (
+                    await stub.GenerateSharesBatch(
+                        GenerateSharesBatchRequest(
+                            threshold=self._threshold,
+                            num_of_shares=self._num_of_share_servers + 1,
+                            server_public_keys=share_servers.public_keys,
+                            user_public_keys=[
+                                user.user_public_key for user in request.users
+                            ],
+                        )
+                    )
+                )
+        if len(bootstrap_response.users) != len(request.users):
+            raise RuntimeError(
+                f"Bootstrap returned {len(bootstrap_response.users)} key sets "
+                f"for {len(request.users)} users"
+            )
+        return share_servers, bootstrap_response
 
-        # terminate bootstrap
-        await self._setup_master_service.terminate_service(bootstrap_server_data)
+    async def _distribute_shares_batch(
+        self, user_ids: list[str], shares: dict[str, list[bytes]]
+    ) -> dict[str, str]:
+        """
+        Stores the shares of many users on all the share servers concurrently.
 
-        # Get user's share, assuming it is the last one
-        user_share = bootstrap_response.encrypted_shares.pop()
+        A user is registered only if every server stores its share. The shares
+        of the other users are deleted again from the servers that may have
+        stored them.
 
-        # Send shares to share servers
-        servers_addresses = await self._db.get_servers_addresses()
-        for share, server_address in zip(
-            bootstrap_response.encrypted_shares, servers_addresses
-        ):
-            async with grpc.aio.secure_channel(
-                f"{server_address}:{self._share_server_port}", self._client_creds
+        Args:
+            user_ids (list[str]): The users the shares belong to.
+            shares (dict[str, list[bytes]]): The encrypted shares of every server
+                address, in the order of `user_ids`.
+
+        Returns:
+            dict[str, str]: Why each user that was not registered failed.
+        """
+        try:
+            results = await asyncio.gather(
+                *[
+                    self._store_shares_on_share_server(
+                        server_address,
+                        StoreShareBatchRequest(
+                            shares=[
+                                StoreShareRequest(
+                                    user_id=user_id, encrypted_share=share
+                                )
+                                for user_id, share in zip(user_ids, server_shares)
+                            ]
+                        ),
+                    )
+                    for server_address, server_shares in shares.items()
+                ],
+                return_exceptions=True,
+            )
+        except asyncio.CancelledError:
+            # Any server might have stored the shares before the call was cancelled
+            await asyncio.shield(self._delete_shares(user_ids, list(shares)))
+            raise
+        failed: dict[str, str] = {}
+        # The servers that may hold a share of each user
+        stored_on: dict[str, list[str]] = {user_id: [] for user_id in user_ids}
+        for server_address, result in zip(shares, results):
+            if isinstance(result, BaseException):
+                self._logger.error(
+                    f"Failed to store shares on server {server_address}: {result}"
+                )
+                for user_id in user_ids:
+                    failed.setdefault(
+                        user_id, f"Share server {server_address} failed: {result}"
+                    )
+                    stored_on[user_id].append(server_address)
+                continue
+            for user_id, success in zip(user_ids, result):
+                if success:
+                    stored_on[user_id].append(server_address)
+                else:
+                    failed.setdefault(
+                        user_id,
+                        f"Share server {server_address} did not store the share",
+                    )
+        if failed:
+            self._logger.error(f"Failed to store shares of {len(failed)} users")
+            await asyncio.gather(
+                *[
+                    self._delete_share_on_share_server(server_address, user_id)
+                    for user_id in failed
+                    for server_address in stored_on[user_id]
+                ]
+            )
+        return failed
+
+    async def _store_shares_on_share_server(
+        self, server_address: str, request: StoreShareBatchRequest
+    ) -> list[bool]:
+        async with self._share_server_requests_semaphore:
+            async with self._channel_pool.channel(
+                f"{server_address}:{self._share_server_port}"
             ) as channel:
                 stub = ShareServerStub(channel)
-                share_server_response: StoreShareResponse = await stub.StoreShare(
-                    StoreShareRequest(user_id=request.user_id, encrypted_share=share)
+                response: StoreShareBatchResponse = await stub.StoreShareBatch(
+                    request, timeout=self._share_server_timeout_s
                 )
-                if not share_server_response.success:
-                    self._logger.error(
-                        f"Failed to store share on server {server_address}"
-                    )
+        if len(response.success) != len(request.shares):
+            raise RuntimeError(
+                f"Share server {server_address} answered {len(response.success)} "
+                f"of {len(request.shares)} shares"
+            )
+        return list(response.success)
 
-        # Send to user his share and encryption key
-        return RegisterResponse(
-            encrypted_share=user_share, encrypted_key=bootstrap_response.encrypted_key
-        )
+    async def _remove_users(self, user_ids: list[str]):
+        await self._db.remove_users(user_ids)
+        await self._db.remove_auth_clients(user_ids)
+        for user_id in user_ids:
+            self._srp_records.invalidate(user_id)
 
     async def store_secret(self, request: StoreSecretRequest) -> StoreSecretResponse:
         self._logger.info(
@@ -346,70 +922,323 @@ class Manager(ManagerServicer):
         )
 
         self._validate_server_ready()
-        await self._validate_user_exists(request.user_id)
 
-        # Get secret from DB
-        bytes_secret = await self._db.get_secret(request.user_id, request.secret_id)
-        if not bytes_secret:
+        # Get the user's public key and the secret from DB
+        user_public_key, bytes_secrets = await self._get_user_and_secrets(
+            request.user_id, [request.secret_id]
+        )
+        if request.secret_id not in bytes_secrets:
             raise RuntimeError("Secret not found")
         secret = Secret()
-        secret.ParseFromString(bytes_secret)
-
-        # Get partial decryptions from share servers
-        servers_addresses = await self._db.get_servers_addresses()
-        encrypted_partial_decryptions: list[bytes] = []
-        for server_address in servers_addresses:
-            async with grpc.aio.secure_channel(
-                f"{server_address}:{self._share_server_port}", self._client_creds
-            ) as channel:
-                stub = ShareServerStub(channel)
-                response: DecryptResponse = await stub.Decrypt(
-                    DecryptRequest(
-                        user_id=request.user_id,
-                        secret=secret,
-                        user_public_key=await self._db.get_user_public_key(
-                            request.user_id
-                        ),
-                    )
-                )
-                encrypted_partial_decryptions.append(
-                    response.encrypted_partial_decryption
-                )
+        secret.ParseFromString(bytes_secrets[request.secret_id])
+
+        encrypted_partial_decryptions = (
+            await self._get_partial_decryptions(
+                request.user_id, user_public_key, [secret]
+            )
+        )[0]
         return RetrieveSecretResponse(
             encrypted_partial_decryptions=encrypted_partial_decryptions, secret=secret
         )
 
+    async def store_secrets(self, request: StoreSecretsRequest) -> StoreSecretsResponse:
+        self._logger.info(
+            f"Storing {len(request.secrets)} secrets for user {request.user_id}"
+        )
+        self._validate_server_ready()
+        self._validate_batch_size(len(request.secrets))
+        await self._validate_user_exists(request.user_id)
+        await self._db.add_secrets(
+            request.user_id,
+            [
+                (entry.secret_id, entry.secret.SerializeToString())
+                for entry in request.secrets
+            ],
+        )
+        return StoreSecretsResponse(success=True)
+
+    async def retrieve_secrets(
+        self, request: RetrieveSecretsRequest
+    ) -> RetrieveSecretsResponse:
+        self._logger.info(
+            f"Retrieving {len(request.secret_ids)} secrets for user {request.user_id}"
+        )
+        self._validate_server_ready()
+        self._validate_batch_size(len(request.secret_ids))
+
+        # Get the user's public key and the secrets from DB
+        user_public_key, bytes_secrets = await self._get_user_and_secrets(
+            request.user_id, list(request.secret_ids)
+        )
+        missing = [i for i in request.secret_ids if i not in bytes_secrets]
+        if missing:
+            raise RuntimeError(f"Secrets not found: {missing}")
+        secrets = [Secret.FromString(bytes_secrets[i]) for i in request.secret_ids]
+
+        partial_decryptions = await self._get_partial_decryptions(
+            request.user_id, user_public_key, secrets
+        )
+        return RetrieveSecretsResponse(
+            secrets=[
+                RetrieveSecretResponse(
+                    encrypted_partial_decryptions=encrypted_partial_decryptions,
+                    secret=secret,
+                )
+                for secret, encrypted_partial_decryptions in zip(
+                    secrets, partial_decryptions
+                )
+            ]
+        )
+
+    async def _get_user_and_secrets(
+        self, user_id: str, secret_ids: list[str]
+    ) -> tuple[bytes, dict[str, bytes]]:
+        user_and_secrets = await self._db.get_user_and_secrets(user_id, secret_ids)
+        if user_and_secrets is None:
+            raise RuntimeError(f"User {user_id} does not exists")
+        return user_and_secrets
+
+    async def _get_partial_decryptions(
+        self, user_id: str, user_public_key: bytes, secrets: list[Secret]
+    ) -> list[list[bytes]]:
+        """
+        Gets the partial decryptions of `secrets` from the fastest share servers.
+
+        threshold - 1 answers are needed, which is enough together with the user's
+        share. With hedging, the historically fastest threshold - 1 servers are
+        asked first, and a spare server is asked whenever one fails or no answer
+        arrives within the hedge delay. Without hedging, all servers are asked at
+        once. The remaining requests are cancelled once enough servers answered.
+
+        Returns:
+            list[list[bytes]]: For each secret, threshold - 1 encrypted partial
+            decryptions in the order of the share servers.
+        """
+        needed = self._threshold - 1  # The user adds its own partial decryption
+        if needed == 0:
+            return [[] for _ in secrets]
+
+        servers_addresses = self._share_servers_addresses()
+        request = DecryptBatchRequest(
+            user_id=user_id, secrets=secrets, user_public_key=user_public_key
+        )
+
+        # Ask the historically fastest servers first, and keep the rest as spares
+        # for failures and for hedging requests that are late
+        spares = deque(self._share_server_stats.rank(servers_addresses))
+        tasks: dict[asyncio.Task, str] = {}
+        responses: dict[str, DecryptBatchResponse] = {}
+        errors: list[RuntimeError] = []
+        loop = asyncio.get_running_loop()
+        hedge_at = loop.time()
+
+        def send_to_spare():
+            # Every request sent gets the whole hedge delay before it is hedged
+            nonlocal hedge_at
+            hedge_at = loop.time() + self._share_server_stats.hedge_delay_s()
+            server_address = spares.popleft()
+            tasks[
+                asyncio.create_task(
+                    self._timed_decrypt_on_share_server(server_address, request)
+                )
+            ] = server_address
+
+        first = needed if self._share_server_stats.hedging_enabled else len(spares)
+        for _ in range(min(first, len(spares))):
+            send_to_spare()
+        pending = set(tasks)
+        try:
+            while pending and len(responses) < needed:
+                hedging = spares and self._share_server_stats.hedging_enabled
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(hedge_at - loop.time(), 0) if hedging else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    try:
+                        responses[tasks[task]] = task.result()
+                    except RuntimeError as e:
+                        self._logger.warning(str(e))
+                        errors.append(e)
+                        if spares:
+                            send_to_spare()
+                if not done and hedging:
+                    self._logger.info("Share servers are late, hedging the request")
+                    send_to_spare()
+                pending = {task for task in tasks if not task.done()}
+                if len(responses) + len(pending) + len(spares) < needed:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if len(responses) < needed:
+            raise RuntimeError(
+                f"Only {len(responses)} of the {needed} required share servers "
+                f"answered: {errors}"
+            )
+        # Keep the order of the servers, regardless of who answered first
+        fastest = [
+            responses[address] for address in servers_addresses if address in responses
+        ][:needed]
+        return [
+            [response.encrypted_partial_decryptions[i] for response in fastest]
+            for i in range(len(secrets))
+        ]
+
+    async def _timed_decrypt_on_share_server(
+        self, server_address: str, request: DecryptBatchRequest
+    ) -> DecryptBatchResponse:
+        start = time.monotonic()
+        try:
+            response = await self._decrypt_on_share_server(server_address, request)
+        except RuntimeError:
+            self._share_server_stats.record_failure(
+                server_address, time.monotonic() - start
+            )
+            raise
+        except asyncio.CancelledError:
+            # A server that keeps losing hedge races must lose its place too
+            self._share_server_stats.record_cancelled(
+                server_address, time.monotonic() - start
+            )
+            raise
+        self._share_server_stats.record_success(
+            server_address, time.monotonic() - start
+        )
+        return response
+
+    async def _decrypt_on_share_server(
+        self, server_address: str, request: DecryptBatchRequest
+    ) -> DecryptBatchResponse:
+        async with self._share_server_requests_semaphore:
+            async with self._channel_pool.channel(
+                f"{server_address}:{self._share_server_port}"
+            ) as channel:
+                stub = ShareServerStub(channel)
+                try:
+                    response: DecryptBatchResponse = await stub.DecryptBatch(
+                        request, timeout=self._share_server_timeout_s
+                    )
+                except grpc.aio.AioRpcError as e:
+                    raise RuntimeError(
+                        f"Decrypt on share server {server_address} failed: {e.code()}"
+                    ) from e
+        if len(response.encrypted_partial_decryptions) != len(request.secrets):
+            raise RuntimeError(
+                f"Share server {server_address} returned "
+                f"{len(response.encrypted_partial_decryptions)} partial "
+                f"decryptions for {len(request.secrets)} secrets"
+            )
+        return response
+
+    def metrics(self) -> dict[str, float]:
+        """
+        Returns the current load of the manager, for monitoring.
+
+        Returns:
+            dict[str, float]: The event loop lag, the SRP steps running,
+            waiting and rejected, and the DB connections in use.
+        """
+        srp_stats = self._srp.stats()
+        metrics = {
+            "event_loop_lag_s": self._event_loop_monitor.lag_s,
+            "event_loop_max_lag_s": self._event_loop_monitor.max_lag_s,
+            "srp_running": srp_stats.running,
+            "srp_queued": srp_stats.queued,
+            "srp_rejected": srp_stats.rejected,
+        }
+        db_pool_stats = self._db.pool_stats()
+        if db_pool_stats:
+            metrics["db_connections_checked_out"] = db_pool_stats.checked_out
+        return metrics
+
     async def launch_all_share_servers(self):
+        # Share servers left by a previous leader keep the shares, adopt them
+        await self._share_servers.load(self._db)
+        registered = list(self._share_servers.snapshot().servers)
+        alive = await asyncio.gather(
+            *[self._share_server_alive(server) for server in registered]
+        )
+        adopted = [server for server, is_alive in zip(registered, alive) if is_alive]
+        for server, is_alive in zip(registered, alive):
+            if is_alive:
+                continue
+            self._logger.warning(
+                f"share server {server.container_name} does not answer, "
+                "relaunching it, the shares it kept are lost"
+            )
+            await self._setup_master_service.remove_dead_service(server)
+        adopted_names = {server.container_name for server in adopted}
+        container_names = [
+            name
+            for name in (f"vault-share-{i}" for i in range(self._num_of_share_servers))
+            if name not in adopted_names
+        ]
+        if adopted:
+            self._logger.info(f"adopting {len(adopted)} running share servers")
         environment = {
             "PORT": self._share_server_port,
             "SETUP_UNIT_PORT": self._setup_unit_port,
-            "SETUP_MASTER_ADDRESS": self._name,
+            "SETUP_MASTER_ADDRESS": self._setup_master_address,
             "SETUP_MASTER_PORT": self._setup_master_port,
             "CA_CERT_PATH": self._ca_cert_path,
             "CA_KEY_PATH": self._ca_key_path,
+            "DECRYPT_WORKERS": self._share_server_decrypt_workers,
         }
-        for i in range(self._num_of_share_servers):
-            self._logger.info(f"creating share server number {i}")
-            self._share_servers_data.append(
-                await self._setup_master_service.spawn_server(
-                    image=self._docker_image,
-                    container_name=f"vault-share-{i}",
-                    command=self._share_server_command,
-                    network=self._docker_network,
-                    environment=environment,
-                ),
-            )
-        # TODO: make paralel and by not blocking on each share server and sample the db.
+        self._logger.info(f"creating {len(container_names)} share servers")
+        spawned = await self._setup_master_service.spawn_servers(
+            image=self._docker_image,
+            container_names=container_names,
+            command=self._share_server_command,
+            network=self._docker_network,
+            environment=environment,
+            max_parallel=self._max_parallel_container_ops,
+        )
+        self._share_servers_data = adopted + spawned
 
     async def terminate_all_share_servers(self):
-        for share_server_data in self._share_servers_data:
-            self._logger.debug(
-                f"terminating share server with container id {share_server_data.container_id}"
-            )
-            await self._setup_master_service.terminate_service(share_server_data)
-        # TODO: make paralel and by not blocking on each share server and sample the db.
+        self._logger.debug(
+            f"terminating {len(self._share_servers_data)} share servers with container ids "
+            f"{[data.container_id for data in self._share_servers_data]}"
+        )
+        await self._setup_master_service.terminate_services(
+            self._share_servers_data, max_parallel=self._max_parallel_container_ops
+        )
+        self._share_servers_data = []
 
     # private methdods
+    async def _log_metrics(self):
+        while True:
+            await asyncio.sleep(self._metrics_interval_s)
+            self._logger.info(
+                "Metrics: "
+                + ", ".join(f"{key}={value:g}" for key, value in self.metrics().items())
+            )
+
+    async def _on_elected(self):
+        await self.launch_all_share_servers()
+
+    async def _on_deposed(self):
+        # The share servers keep running for the next leader to adopt
+        self._share_servers_data = []
+
+    async def _share_server_alive(self, server: types.ServiceData) -> bool:
+        address = f"{server.container_name}:{self._share_server_port}"
+        try:
+            async with self._channel_pool.channel(address) as channel:
+                await asyncio.wait_for(
+                    channel.channel_ready(), self._share_server_timeout_s
+                )
+        except Exception:
+            return False
+        return True
+
+    def _share_servers_addresses(self) -> list[str]:
+        return self._share_servers.snapshot().addresses
+
     def _validate_server_ready(self):
         if not self._ready:
             raise RuntimeError("Server is not ready to accept requests")
@@ -422,6 +1251,19 @@ class Manager(ManagerServicer):
         if not await self._db.user_exists(user_id):
             raise RuntimeError(f"User {user_id} does not exists")
 
+    def _validate_batch_size(self, batch_size: int):
+        if not 0 < batch_size <= self._max_batch_size:
+            raise RuntimeError(
+                f"Batch size must be between 1 and {self._max_batch_size}, got {batch_size}"
+            )
+
+    @staticmethod
+    def _is_already_exists(error: Optional[BaseException]) -> bool:
+        return (
+            isinstance(error, grpc.aio.AioRpcError)
+            and error.code() == grpc.StatusCode.ALREADY_EXISTS
+        )
+
     def _validate_num_of_servers_in_db(self, num_in_db: int):
         if num_in_db != self._num_of_share_servers:
             raise RuntimeError(
@@ -0,0 +1,96 @@
+import secrets
+import time
+from collections import OrderedDict
+
+from pydantic import BaseModel
+
+from vault.crypto.authentication import srp_resumption_server_verify
+
+
+class ResumptionTicket(BaseModel):
+    username: str
+    session_key: bytes
+    expires_at: float
+    seen_nonces: set[bytes] = set()
+
+
+class ResumptionTickets:
+    """
+    Short-lived SRP resumption tickets, kept in the manager's memory.
+
+    A ticket is issued after a successful SRP handshake and bound to its
+    session key. Until it expires, the client can authenticate a new
+    SecureCall by proving possession of that key instead of running the
+    handshake again. Each nonce is accepted once per ticket.
+    """
+
+    def __init__(self, lifetime_s: float, max_tickets: int = 100_000):
+        self._lifetime_s = lifetime_s
+        self._max_tickets = max_tickets
+        # Insertion order is also expiry order, the lifetime is fixed
+        self._tickets: OrderedDict[bytes, ResumptionTicket] = OrderedDict()
+
+    @property
+    def lifetime_s(self) -> float:
+        return self._lifetime_s
+
+    @property
+    def enabled(self) -> bool:
+        return self._lifetime_s > 0
+
+    def issue(self, username: str, session_key: bytes) -> bytes:
+        """
+        Issues a ticket for an authenticated SRP session.
+
+        Args:
+            username (str): The authenticated username.
+            session_key (bytes): The session key from the SRP handshake.
+
+        Returns:
+            bytes: The opaque ticket to hand to the client.
+        """
+        self._purge_expired()
+        while len(self._tickets) >= self._max_tickets:
+            self._tickets.popitem(last=False)
+
+        ticket = secrets.token_bytes(32)
+        self._tickets[ticket] = ResumptionTicket(
+            username=username,
+            session_key=session_key,
+            expires_at=time.monotonic() + self._lifetime_s,
+        )
+        return ticket
+
+    def verify(self, username: str, ticket: bytes, nonce: bytes, proof: bytes) -> bool:
+        """
+        Verifies a resumption attempt.
+
+        Args:
+            username (str): The username the client claims.
+            ticket (bytes): The ticket previously issued to the client.
+            nonce (bytes): The client's fresh nonce.
+            proof (bytes): The client's proof over the ticket and nonce.
+
+        Returns:
+            bool: True if the client may skip the SRP handshake.
+        """
+        self._purge_expired()
+        entry = self._tickets.get(ticket)
+        if (
+            entry is None
+            or entry.username != username
+            or nonce in entry.seen_nonces
+            or not srp_resumption_server_verify(entry.session_key, ticket, nonce, proof)
+        ):
+            return False
+        entry.seen_nonces.add(nonce)
+        return True
+
+    # Private methods
+    def _purge_expired(self):
+        now = time.monotonic()
+        while self._tickets:
+            ticket, entry = next(iter(self._tickets.items()))
+            if entry.expires_at > now:
+                break
+            del self._tickets[ticket]
@@ -0,0 +1,135 @@
+import asyncio
+from dataclasses import dataclass
+
+from vault.common import types
+from vault.manager.db_manager import DBManager
+
+
+@dataclass(frozen=True)
+class ServerRegistrySnapshot:
+    """An immutable view of the registered share servers, ordered by container id."""
+
+    version: int
+    servers: tuple[types.ServiceData, ...]
+
+    @property
+    def addresses(self) -> list[str]:
+        return [server.container_name for server in self.servers]
+
+    @property
+    def public_keys(self) -> list[bytes]:
+        return [server.public_key for server in self.servers]
+
+
+class ServerRegistry:
+    """
+    The registered share servers, kept in the manager's memory.
+
+    The registry is loaded from the DB once at startup and then follows the
+    registrations and unregistrations seen by the SetupMaster. Every change
+    publishes a new immutable snapshot with a higher version, so a request that
+    takes one snapshot sees the same servers, keys and addresses throughout.
+    The DB stays the source of truth, used to recover the registry.
+    """
+
+    def __init__(
+        self, service_type: types.ServiceType = types.ServiceType.SHARE_SERVER
+    ):
+        self._service_type = service_type
+        self._snapshot = ServerRegistrySnapshot(version=0, servers=())
+        self._changed = asyncio.Condition()
+
+    def snapshot(self) -> ServerRegistrySnapshot:
+        """
+        Returns the current servers. The snapshot never changes.
+
+        Returns:
+            ServerRegistrySnapshot: The current snapshot.
+        """
+        return self._snapshot
+
+    async def load(self, db: DBManager):
+        """
+        Replaces the registry with the servers registered in the DB.
+
+        Args:
+            db (DBManager): The DB to load from.
+
+        Returns:
+            None
+        """
+        servers = await db.get_servers_of_type(self._service_type)
+        await self._publish(servers)
+
+    async def add(self, service_data: types.ServiceData):
+        """
+        Adds or updates a server, ignoring services of other types.
+
+        Args:
+            service_data (types.ServiceData): The registered service.
+
+        Returns:
+            None
+        """
+        if (
+            service_data.type != self._service_type
+            or service_data in self._snapshot.servers
+        ):
+            return
+        servers = [
+            server
+            for server in self._snapshot.servers
+            if server.container_id != service_data.container_id
+        ]
+        servers.append(service_data)
+        await self._publish(servers)
+
+    async def remove(self, container_id: str):
+        """
+        Removes a server, if it is in the registry.
+
+        Args:
+            container_id (str): The container of the unregistered service.
+
+        Returns:
+            None
+        """
+        servers = [
+            server
+            for server in self._snapshot.servers
+            if server.container_id != container_id
+        ]
+        if len(servers) != len(self._snapshot.servers):
+            await self._publish(servers)
+
+    async def wait_for_change(
+        self, version: int, timeout_s: float
+    ) -> ServerRegistrySnapshot:
+        """
+        Waits until the registry changes after a snapshot.
+
+        Args:
+            version (int): The version of the snapshot already seen.
+            timeout_s (float): How long to wait for a change.
+
+        Returns:
+            ServerRegistrySnapshot: The first snapshot newer than `version`.
+
+        Raises:
+            TimeoutError: If the registry did not change in time.
+        """
+        async with self._changed:
+            await asyncio.wait_for(
+                self._changed.wait_for(lambda: self._snapshot.version > version),
+                timeout=timeout_s,
+            )
+            return self._snapshot
+
+    # Private methods
+    async def _publish(self, servers: list[types.ServiceData]):
+        async with self._changed:
+            self._snapshot = ServerRegistrySnapshot(
+                version=self._snapshot.version + 1,
+                servers=tuple(sorted(servers, key=lambda s: s.container_id)),
+            )
+            self._changed.notify_all()
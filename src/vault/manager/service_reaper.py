@@ -0,0 +1,106 @@
+import asyncio
+import contextlib
+import logging
+
+from vault.common import types
+from vault.manager.setup_master import SetupMaster
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+class ServiceReaper:
+    """
+    Terminates services in the background, off the path of the requests.
+
+    Services are queued by `reap` and terminated by up to `max_parallel`
+    workers, each waiting for its service to unregister, stop and be removed.
+    Services still queued when the manager crashes are left as orphans, to be
+    removed by `SetupMaster.remove_orphaned_services` on the next startup.
+    """
+
+    def __init__(
+        self,
+        setup_master: SetupMaster,
+        max_parallel: int = 8,
+        close_timeout_s: float = 30.0,
+    ):
+        self._logger = logging.getLogger(__class__.__name__)
+        self._setup_master = setup_master
+        self._max_parallel = max_parallel
+        self._close_timeout_s = close_timeout_s
+        self._queue: asyncio.Queue[types.ServiceData] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._pending_count = 0
+
+    @property
+    def pending_count(self) -> int:
+        """The number of services queued or being terminated."""
+        return self._pending_count
+
+    async def start(self):
+        """
+        Starts the workers, if `reap` did not start them already.
+
+        Returns:
+            None
+        """
+        self._start_workers()
+
+    async def close(self):
+        """
+        Waits for the queued services to terminate, then stops the workers.
+
+        Returns:
+            None
+        """
+        if self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), self._close_timeout_s)
+            except asyncio.TimeoutError:
+                self._logger.error(
+                    f"{self.pending_count} services were not terminated "
+                    f"within {self._close_timeout_s}s"
+                )
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            with contextlib.suppress(asyncio.CancelledError):
+                await worker
+        self._workers = []
+
+    def reap(self, service_data: types.ServiceData):
+        """
+        Queues a service for termination, without waiting for it.
+
+        Args:
+            service_data (types.ServiceData): The service to terminate.
+
+        Returns:
+            None
+        """
+        self._logger.info(f"Queueing {service_data.container_name} for termination")
+        self._start_workers()
+        self._pending_count += 1
+        self._queue.put_nowait(service_data)
+
+    # Private methods
+    def _start_workers(self):
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(self._max_parallel)
+            ]
+
+    async def _worker(self):
+        while True:
+            service_data = await self._queue.get()
+            try:
+                await self._setup_master.terminate_service(service_data)
+            except Exception as e:
+                self._logger.error(
+                    f"Failed to terminate {service_data.container_name}: {e}"
+                )
+            finally:
+                self._pending_count -= 1
+                self._queue.task_done()
@@ -1,4 +1,6 @@
 import asyncio
+import base64
+import json
 from concurrent import futures
 from typing import Optional
 
@@ -6,8 +8,13 @@ import grpc
 from google.protobuf.empty_pb2 import Empty
 
 from vault.common import docker_utils, types
+from vault.common.channel_pool import ChannelPool
 from vault.common.generated import setup_pb2, setup_pb2_grpc
 from vault.manager.db_manager import DBManager
+from vault.manager.server_registry import ServerRegistry
+
+# Postgres channel of the registrations and unregistrations of all managers
+SETUP_CHANNEL = "vault_setup"
 
 
 class SetupMaster(setup_pb2_grpc.SetupMaster):
@@ -18,10 +25,16 @@ class SetupMaster(setup_pb2_grpc.SetupMaster):
         db: DBManager,
         server_creds: grpc.ServerCredentials,
         client_creds: grpc.ChannelCredentials,
+        channel_pool: Optional[ChannelPool] = None,
+        registry: Optional[ServerRegistry] = None,
     ):
         setup_pb2_grpc.SetupMaster.__init__(self)
         self._db = db
-        self._wait_for_container_id_condition = asyncio.Condition()
+        self._registry = registry
+        # Futures of the callers waiting for a container, by container id and
+        # by whether they wait for its registration or its unregistration
+        self._waiters: dict[tuple[str, bool], list[asyncio.Future]] = {}
+        self._notification_tasks: set[asyncio.Task] = set()
 
         self._is_setup_finished = False
         self._is_setup_finished_lock = asyncio.Lock()
@@ -29,15 +42,30 @@ class SetupMaster(setup_pb2_grpc.SetupMaster):
         self._port = port
         self._setup_unit_port = setup_unit_port
         self._client_creds = client_creds
+        # A pool created here is owned, so it is started and closed here too
+        self._owns_channel_pool = channel_pool is None
+        self._channel_pool = channel_pool or ChannelPool(client_creds)
 
         # grpc server
-        self._server = grpc.aio.server(futures.ThreadPoolExecutor(max_workers=10))
+        self._server = grpc.aio.server(
+            futures.ThreadPoolExecutor(max_workers=10),
+            # Worker processes of one manager share the port
+            options=[("grpc.so_reuseport", 1)],
+        )
         setup_pb2_grpc.add_SetupMasterServicer_to_server(self, self._server)
         self._server.add_secure_port(f"[::]:{self._port}", server_creds)
 
         self._ready = False
 
     async def start(self):
+        if self._owns_channel_pool:
+            await self._channel_pool.start()
+        if not await self._db.listen(
+            SETUP_CHANNEL,
+            self._on_setup_notification,
+            on_reconnected=self._catch_up_from_db,
+        ):
+            print("Registrations of other managers will not be seen", flush=True)
         await self._server.start()
         self._ready = True
         print("SetupMaster started!")
@@ -45,23 +73,29 @@ class SetupMaster(setup_pb2_grpc.SetupMaster):
     async def stop(self):
         self._ready = False
         await self._server.stop(grace=5.0)
+        await self._db.unlisten(SETUP_CHANNEL)
+        if self._owns_channel_pool:
+            await self._channel_pool.close()
         print("SetupMaster stopped")
 
     # setup_pb2_grpc.SetupMaster inherited methods
     async def SetupRegister(self, request: setup_pb2.SetupRegisterRequest, context):
         print("in Register!", flush=True)
-        await self._db.add_server(types.SetupRegisterRequest_to_ServiceData(request))
-        async with self._wait_for_container_id_condition:
-            self._wait_for_container_id_condition.notify_all()
+        service_data = types.SetupRegisterRequest_to_ServiceData(request)
+        await self._db.add_server(service_data)
+        await self._on_registered(service_data)
+        await self._notify(registered=True, service_data=service_data)
         return setup_pb2.SetupRegisterResponse(is_registered=True)
 
     async def SetupUnregister(self, request: setup_pb2.SetupUnregisterRequest, context):
         print("in SetupUnregister!", flush=True)
         is_unregistered = False
         try:
+            service_data = await self._db.get_server(request.container_id)
             await self._db.remove_server(request.container_id)
-            async with self._wait_for_container_id_condition:
-                self._wait_for_container_id_condition.notify_all()
+            await self._channel_pool.remove_host(service_data.container_name)
+            await self._on_unregistered(service_data)
+            await self._notify(registered=False, service_data=service_data)
             is_unregistered = True
         except Exception:
             pass
@@ -77,7 +111,8 @@ class SetupMaster(setup_pb2_grpc.SetupMaster):
         environment: dict = {},
         block: bool = True,
     ):
-        container = docker_utils.spawn_container(
+        container = await asyncio.to_thread(
+            docker_utils.spawn_container,
             image,
             container_name=container_name,
             command=command,
@@ -93,17 +128,199 @@ class SetupMaster(setup_pb2_grpc.SetupMaster):
             )
         return service_data
 
+    async def spawn_servers(
+        self,
+        image: str,
+        container_names: list[str],
+        command: str = None,
+        network: str = None,
+        environment: dict = {},
+        max_parallel: int = 8,
+        timeout_s: int = 30,
+    ) -> list[types.ServiceData]:
+        """
+        Spawns many containers concurrently and waits for all their registrations.
+
+        Args:
+            image (str): The image of the containers.
+            container_names (list[str]): A name per container to spawn.
+            command (str): The command of the containers.
+            network (str): The network to attach the containers to.
+            environment (dict): The environment of the containers.
+            max_parallel (int): Maximum number of containers spawned at once.
+            timeout_s (int): How long to wait for all the registrations.
+
+        Returns:
+            list[types.ServiceData]: The registered services, in the order of
+            `container_names`.
+        """
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def spawn(container_name: str) -> str:
+            async with semaphore:
+                container = await asyncio.to_thread(
+                    docker_utils.spawn_container,
+                    image,
+                    container_name=container_name,
+                    command=command,
+                    network=network,
+                    environment=environment,
+                )
+            return container.short_id
+
+        results = await asyncio.gather(
+            *[spawn(container_name) for container_name in container_names],
+            return_exceptions=True,
+        )
+        container_ids = [
+            result for result in results if not isinstance(result, BaseException)
+        ]
+        errors = [result for result in results if isinstance(result, BaseException)]
+        try:
+            if errors:
+                raise errors[0]
+            print(f"waiting for {len(container_ids)} registrations", flush=True)
+            services = await self._wait_for_containers(
+                container_ids, registered=True, timeout_s=timeout_s
+            )
+        except BaseException:
+            # The containers that did start would keep running, registered
+            await asyncio.shield(self._remove_containers(container_ids, max_parallel))
+            raise
+        return [services[container_id] for container_id in container_ids]
+
+    async def terminate_services(
+        self,
+        services: list[types.ServiceData],
+        max_parallel: int = 8,
+        timeout_s: int = 30,
+    ):
+        """
+        Terminates many services concurrently and waits for all of them to go away.
+
+        Args:
+            services (list[types.ServiceData]): The services to terminate.
+            max_parallel (int): Maximum number of services terminated at once.
+            timeout_s (int): How long to wait for all the unregistrations.
+
+        Returns:
+            None
+        """
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def terminate(service_data: types.ServiceData):
+            async with semaphore:
+                await self.terminate_service(service_data, block=False)
+
+        async def remove(service_data: types.ServiceData):
+            async with semaphore:
+                await docker_utils.wait_for_container_to_stop(service_data.container_id)
+                await asyncio.to_thread(
+                    docker_utils.remove_container, service_data.container_id
+                )
+
+        await asyncio.gather(*[terminate(service) for service in services])
+        await self._wait_for_containers(
+            [service.container_id for service in services],
+            registered=False,
+            timeout_s=timeout_s,
+        )
+        await asyncio.gather(*[remove(service) for service in services])
+
     async def terminate_service(
         self, service_data: types.ServiceData, block: bool = True
     ):
         _address = f"{service_data.container_name}:{self._setup_unit_port}"
-        async with grpc.aio.secure_channel(_address, self._client_creds) as channel:
+        async with self._channel_pool.channel(_address) as channel:
             stub = setup_pb2_grpc.SetupUnitStub(channel)
             await stub.Terminate(Empty())
         if block:
             await self._wait_for_container_id_unregistration(service_data.container_id)
             await docker_utils.wait_for_container_to_stop(service_data.container_id)
-            docker_utils.remove_container(service_data.container_id)
+            await asyncio.to_thread(
+                docker_utils.remove_container, service_data.container_id
+            )
+
+    async def remove_dead_service(self, service_data: types.ServiceData):
+        """
+        Kills a service and removes its registration.
+
+        For a service that stopped answering or has to go at once, so it is not
+        asked to unregister. It is unregistered on its behalf and every manager
+        is notified.
+
+        Args:
+            service_data (types.ServiceData): The service to remove.
+
+        Returns:
+            None
+        """
+        try:
+            await asyncio.to_thread(
+                docker_utils.remove_container, service_data.container_id, force=True
+            )
+        except Exception as e:
+            print(
+                f"Failed to remove container {service_data.container_id}: {e}",
+                flush=True,
+            )
+        # Another manager may have removed the registration already
+        await self._db.remove_servers([service_data.container_id])
+        await self._channel_pool.remove_host(service_data.container_name)
+        await self._on_unregistered(service_data)
+        await self._notify(registered=False, service_data=service_data)
+
+    async def remove_orphaned_services(self, name_prefix: str, max_parallel: int = 8):
+        """
+        Removes the containers and registrations left over by a previous run.
+
+        Containers that were still being terminated when the manager stopped or
+        crashed are killed without asking them to unregister.
+
+        Args:
+            name_prefix (str): The prefix of the names of the orphaned containers.
+            max_parallel (int): Maximum number of containers removed at once.
+
+        Returns:
+            None
+        """
+        container_ids = await asyncio.to_thread(
+            docker_utils.list_container_ids, name_prefix
+        )
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def remove(container_id: str):
+            async with semaphore:
+                await asyncio.to_thread(
+                    docker_utils.remove_container, container_id, force=True
+                )
+
+        await asyncio.gather(*[remove(container_id) for container_id in container_ids])
+        num_of_rows = await self._db.remove_servers_by_name_prefix(name_prefix)
+        print(
+            f"Removed {len(container_ids)} orphaned {name_prefix} containers "
+            f"and {num_of_rows} registrations",
+            flush=True,
+        )
+
+    # Private methods
+    async def _remove_containers(self, container_ids: list[str], max_parallel: int):
+        services = await self._db.get_servers(container_ids)
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def remove(container_id: str):
+            async with semaphore:
+                if container_id in services:
+                    await self.remove_dead_service(services[container_id])
+                    return
+                try:
+                    await asyncio.to_thread(
+                        docker_utils.remove_container, container_id, force=True
+                    )
+                except Exception as e:
+                    print(f"Failed to remove container {container_id}: {e}", flush=True)
+
+        await asyncio.gather(*[remove(container_id) for container_id in container_ids])
 
     # Private methods
     async def _get_container_data(
@@ -114,53 +331,155 @@ class SetupMaster(setup_pb2_grpc.SetupMaster):
     async def _wait_for_container_id_registration(
         self, container_id: str, timeout_s: int = 10
     ) -> types.ServiceData:
-        start_time = asyncio.get_event_loop().time()
-        while True:
-            retval = await self._get_container_data(container_id)
-            if retval:
-                return retval
-
-            # calculate remaining timeout
-            elapsed = asyncio.get_event_loop().time() - start_time
-            remaining_s = timeout_s - elapsed
-            if remaining_s <= 0:
-                raise TimeoutError(
-                    f"container_id '{container_id}' did not appear in DB within {timeout_s}s"
-                )
-
-            async with self._wait_for_container_id_condition:
-                try:
-                    await asyncio.wait_for(
-                        self._wait_for_container_id_condition.wait(),
-                        timeout=remaining_s,
-                    )
-                    print("Woke up by notification, rechecking DB...")
-                except asyncio.TimeoutError:
-                    print(f"No notification in {remaining_s}s, rechecking DB...")
+        services = await self._wait_for_containers(
+            [container_id], registered=True, timeout_s=timeout_s
+        )
+        return services[container_id]
 
     async def _wait_for_container_id_unregistration(
         self, container_id: str, timeout_s: int = 10
     ):
-        start_time = asyncio.get_event_loop().time()
-        while True:
-            retval = await self._get_container_data(container_id)
-            if retval is None:
-                return
-
-            # calculate remaining timeout
-            elapsed = asyncio.get_event_loop().time() - start_time
-            remaining_s = timeout_s - elapsed
-            if remaining_s <= 0:
-                raise TimeoutError(
-                    f"container_id '{container_id}' appears in DB within {timeout_s}s"
-                )
+        await self._wait_for_containers(
+            [container_id], registered=False, timeout_s=timeout_s
+        )
 
-            async with self._wait_for_container_id_condition:
-                try:
-                    await asyncio.wait_for(
-                        self._wait_for_container_id_condition.wait(),
-                        timeout=remaining_s,
+    async def _wait_for_containers(
+        self, container_ids: list[str], registered: bool, timeout_s: int
+    ) -> dict[str, types.ServiceData]:
+        """
+        Waits until all of `container_ids` are registered, or all are unregistered.
+
+        A future per container is resolved by the registration or unregistration
+        of the container, whether this manager or another one received it. The
+        DB is queried once after subscribing, for the containers that changed
+        before, and once more on timeout, in case a notification was lost.
+        """
+        loop = asyncio.get_running_loop()
+        waiters = {}
+        for container_id in set(container_ids):
+            future = loop.create_future()
+            self._waiters.setdefault((container_id, registered), []).append(future)
+            waiters[container_id] = future
+
+        try:
+            services = await self._db.get_servers(container_ids)
+            self._resolve_from_db(waiters, registered, services)
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*waiters.values()), timeout=timeout_s
+                )
+            except asyncio.TimeoutError:
+                services = await self._db.get_servers(container_ids)
+                self._resolve_from_db(waiters, registered, services)
+                pending = sorted(
+                    container_id
+                    for container_id, future in waiters.items()
+                    if not future.done()
+                )
+                if pending and registered:
+                    raise TimeoutError(
+                        f"container_ids {pending} did not appear in DB within {timeout_s}s"
+                    )
+                if pending:
+                    raise TimeoutError(
+                        f"container_ids {pending} appear in DB within {timeout_s}s"
                     )
-                    print("Woke up by notification, rechecking DB...")
-                except asyncio.TimeoutError:
-                    print(f"No notification in {remaining_s}s, rechecking DB...")
+        finally:
+            for container_id, future in waiters.items():
+                key = (container_id, registered)
+                if key in self._waiters and future in self._waiters[key]:
+                    self._waiters[key].remove(future)
+                    if not self._waiters[key]:
+                        del self._waiters[key]
+
+        if not registered:
+            return {}
+        return {
+            container_id: future.result() for container_id, future in waiters.items()
+        }
+
+    def _resolve_from_db(
+        self,
+        waiters: dict[str, asyncio.Future],
+        registered: bool,
+        services: dict[str, types.ServiceData],
+    ):
+        for container_id, future in waiters.items():
+            if future.done():
+                continue
+            if registered and container_id in services:
+                future.set_result(services[container_id])
+            elif not registered and container_id not in services:
+                future.set_result(None)
+
+    def _resolve_waiters(
+        self,
+        container_id: str,
+        registered: bool,
+        service_data: Optional[types.ServiceData],
+    ):
+        for future in self._waiters.pop((container_id, registered), []):
+            if not future.done():
+                future.set_result(service_data if registered else None)
+
+    async def _catch_up_from_db(self):
+        # The notifications sent while LISTEN was disconnected are lost
+        if self._registry:
+            await self._registry.load(self._db)
+        for registered in (True, False):
+            container_ids = [
+                container_id
+                for container_id, is_registration in self._waiters
+                if is_registration == registered
+            ]
+            if not container_ids:
+                continue
+            services = await self._db.get_servers(container_ids)
+            for container_id in container_ids:
+                if registered and container_id in services:
+                    self._resolve_waiters(container_id, True, services[container_id])
+                elif not registered and container_id not in services:
+                    self._resolve_waiters(container_id, False, None)
+
+    async def _on_registered(self, service_data: types.ServiceData):
+        if self._registry:
+            await self._registry.add(service_data)
+        self._resolve_waiters(service_data.container_id, True, service_data)
+
+    async def _on_unregistered(self, service_data: types.ServiceData):
+        if self._registry:
+            await self._registry.remove(service_data.container_id)
+        self._resolve_waiters(service_data.container_id, False, service_data)
+
+    async def _notify(self, registered: bool, service_data: types.ServiceData):
+        payload = {
+            "registered": registered,
+            "type": int(service_data.type),
+            "container_id": service_data.container_id,
+            "container_name": service_data.container_name,
+            "public_key": base64.b64encode(service_data.public_key).decode(),
+        }
+        try:
+            await self._db.notify(SETUP_CHANNEL, json.dumps(payload))
+        except Exception as e:
+            # Waiters of this process are already resolved, and those of other
+            # managers check the DB again on timeout
+            print(f"Failed to notify {SETUP_CHANNEL}: {e}", flush=True)
+
+    def _on_setup_notification(self, payload: str):
+        # Also receives the notifications sent by this manager, which are
+        # handled already and change nothing when handled again
+        message = json.loads(payload)
+        service_data = types.ServiceData(
+            type=message["type"],
+            container_id=message["container_id"],
+            container_name=message["container_name"],
+            public_key=base64.b64decode(message["public_key"]),
+        )
+        if message["registered"]:
+            handler = self._on_registered(service_data)
+        else:
+            handler = self._on_unregistered(service_data)
+        task = asyncio.get_running_loop().create_task(handler)
+        self._notification_tasks.add(task)
+        task.add_done_callback(self._notification_tasks.discard)
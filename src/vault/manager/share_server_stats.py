@@ -0,0 +1,135 @@
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass
+class _ServerStats:
+    ewma_latency_s: float = 0.0
+    ewma_error_rate: float = 0.0
+    samples: int = 0
+
+
+class ShareServerStats:
+    """
+    Latency and error statistics of the share servers, kept by address.
+
+    Every server has an exponentially weighted moving average (EWMA) of its
+    latency and of its error rate, used to rank the servers from the
+    historically fastest. A window of the latest latencies of all servers gives
+    the deadline after which a request is considered late and worth hedging.
+    """
+
+    def __init__(
+        self,
+        default_hedge_delay_s: float,
+        hedge_percentile: float = 0.95,
+        alpha: float = 0.2,
+        window_size: int = 1000,
+        min_samples: int = 20,
+    ):
+        self._default_hedge_delay_s = default_hedge_delay_s
+        self._hedge_percentile = hedge_percentile
+        self._alpha = alpha
+        self._min_samples = min_samples
+        self._servers: dict[str, _ServerStats] = {}
+        self._latencies_s: deque[float] = deque(maxlen=window_size)
+
+    @property
+    def hedging_enabled(self) -> bool:
+        return 0 < self._hedge_percentile < 1
+
+    def record_success(self, address: str, latency_s: float):
+        """
+        Records a successful request to a share server.
+
+        Args:
+            address (str): The share server address.
+            latency_s (float): The request latency in seconds.
+
+        Returns:
+            None
+        """
+        stats = self._servers.setdefault(address, _ServerStats())
+        stats.ewma_latency_s = self._ewma(stats.ewma_latency_s, latency_s, stats)
+        stats.ewma_error_rate = self._ewma(stats.ewma_error_rate, 0.0, stats)
+        stats.samples += 1
+        self._latencies_s.append(latency_s)
+
+    def record_failure(self, address: str, latency_s: float):
+        """
+        Records a failed request to a share server.
+
+        Args:
+            address (str): The share server address.
+            latency_s (float): The time until the request failed, in seconds.
+
+        Returns:
+            None
+        """
+        stats = self._servers.setdefault(address, _ServerStats())
+        stats.ewma_latency_s = self._ewma(stats.ewma_latency_s, latency_s, stats)
+        stats.ewma_error_rate = self._ewma(stats.ewma_error_rate, 1.0, stats)
+        stats.samples += 1
+
+    def record_cancelled(self, address: str, elapsed_s: float):
+        """
+        Records a request cancelled before it was answered, e.g. one that lost
+        a hedge race.
+
+        Its latency is at least `elapsed_s`, so the server's average latency can
+        only grow. The error rate is left alone, as the server did not fail.
+
+        Args:
+            address (str): The share server address.
+            elapsed_s (float): The time until the request was cancelled, in seconds.
+
+        Returns:
+            None
+        """
+        stats = self._servers.setdefault(address, _ServerStats())
+        if stats.samples > 0 and elapsed_s <= stats.ewma_latency_s:
+            return
+        stats.ewma_latency_s = self._ewma(stats.ewma_latency_s, elapsed_s, stats)
+        stats.samples += 1
+
+    def rank(self, addresses: list[str]) -> list[str]:
+        """
+        Orders share servers from the historically fastest.
+
+        The expected latency of a server grows with its error rate, as a failed
+        request has to be sent again elsewhere. Servers without history come
+        first, so they get measured.
+
+        Args:
+            addresses (list[str]): The share server addresses.
+
+        Returns:
+            list[str]: The addresses, fastest first.
+        """
+
+        def expected_latency_s(address: str) -> float:
+            stats = self._servers.get(address)
+            if stats is None:
+                return 0.0
+            return stats.ewma_latency_s / max(1.0 - stats.ewma_error_rate, 0.01)
+
+        return sorted(addresses, key=expected_latency_s)
+
+    def hedge_delay_s(self) -> float:
+        """
+        Returns how long to wait for a response before hedging the request.
+
+        Returns:
+            float: The configured percentile of the recent latencies, or the
+            default delay until enough latencies were recorded.
+        """
+        if len(self._latencies_s) < self._min_samples:
+            return self._default_hedge_delay_s
+        ordered = sorted(self._latencies_s)
+        return ordered[int(self._hedge_percentile * (len(ordered) - 1))]
+
+    # Private methods
+    def _ewma(self, average: float, value: float, stats: _ServerStats) -> float:
+        if stats.samples == 0:
+            return value
+        return self._alpha * value + (1 - self._alpha) * average
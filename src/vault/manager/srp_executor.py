@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar
+
+from vault.crypto.authentication import (
+    srp_authentication_server_step_one,
+    srp_authentication_server_step_three,
+)
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+T = TypeVar("T")
+
+
+class SRPExecutorFull(RuntimeError):
+    """Raised when too many SRP steps already wait for a worker."""
+
+
+@dataclass(frozen=True)
+class SRPExecutorStats:
+    running: int
+    queued: int
+    rejected: int
+
+
+class SRPExecutor:
+    """
+    Runs the server steps of SRP off the event loop.
+
+    The steps are modular exponentiations in pure Python, so on the event
+    loop every other request waits for them. With `workers` > 0 they run on a
+    pool of worker processes, or of threads if `use_processes` is False.
+    Threads only help if the SRP library releases the GIL. At most
+    `max_queued` steps wait for a free worker, further steps are rejected with
+    `SRPExecutorFull` so an overloaded manager sheds handshakes instead of
+    queueing them without bound. With `workers` = 0 the steps run inline.
+    """
+
+    def __init__(
+        self, workers: int = 0, use_processes: bool = True, max_queued: int = 256
+    ):
+        self._logger = logging.getLogger(__class__.__name__)
+        self._workers = workers
+        self._use_processes = use_processes
+        self._max_queued = max_queued
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._workers > 0
+
+    async def start(self):
+        """
+        Starts the workers, so the first handshakes do not wait for them.
+
+        Returns:
+            None
+        """
+        if not self.enabled:
+            return
+        self._executor = self._create_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *[loop.run_in_executor(self._executor, int) for _ in range(self._workers)]
+        )
+        self._logger.info(
+            f"Running SRP on {self._workers} "
+            f"{'processes' if self._use_processes else 'threads'}"
+        )
+
+    async def close(self):
+        """
+        Stops the workers, cancelling the steps that did not start.
+
+        Returns:
+            None
+        """
+        if self._executor:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, cancel_futures=True)
+
+    def stats(self) -> SRPExecutorStats:
+        """
+        Returns how many SRP steps run and wait, for monitoring.
+
+        Returns:
+            SRPExecutorStats: The current usage.
+        """
+        running = min(self._pending, self._workers)
+        return SRPExecutorStats(
+            running=running,
+            queued=self._pending - running,
+            rejected=self._rejected,
+        )
+
+    async def step_one(self, username: str, password_verifier: str) -> tuple[str, str]:
+        """
+        Runs `srp_authentication_server_step_one`.
+
+        Returns:
+            tuple[str, str]: The server's public and private keys.
+        """
+        return await self._run(
+            srp_authentication_server_step_one, username, password_verifier
+        )
+
+    async def step_three(
+        self,
+        username: str,
+        password_verifier: str,
+        salt: str,
+        server_private: str,
+        client_public: str,
+        client_session_key_proof: str,
+    ) -> str:
+        """
+        Runs `srp_authentication_server_step_three`.
+
+        Returns:
+            str: The shared session key.
+        """
+        return await self._run(
+            srp_authentication_server_step_three,
+            username,
+            password_verifier,
+            salt,
+            server_private,
+            client_public,
+            client_session_key_proof,
+        )
+
+    # Private methods
+    def _create_executor(self) -> Executor:
+        if self._use_processes:
+            # gRPC does not support forked processes
+            return ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return ThreadPoolExecutor(max_workers=self._workers)
+
+    async def _run(self, step: Callable[..., T], *args) -> T:
+        if self._executor is None:
+            return step(*args)
+        if self._pending >= self._workers + self._max_queued:
+            self._rejected += 1
+            raise SRPExecutorFull(
+                f"{self._pending - self._workers} SRP steps already wait for a worker"
+            )
+        self._pending += 1
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, step, *args
+            )
+        except BrokenProcessPool as e:
+            # A worker died, the pool fails every step until it is replaced.
+            # The steps that were on it fail, their clients can retry.
+            if self._executor is executor:
+                self._logger.error("An SRP worker died, restarting the workers")
+                self._executor = self._create_executor()
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise RuntimeError("The SRP worker running this step died") from e
+        finally:
+            self._pending -= 1
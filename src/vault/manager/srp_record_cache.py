@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+
+from pydantic import BaseModel
+
+
+class SRPRecord(BaseModel):
+    verifier: str
+    salt: str
+
+
+class SRPRecordCache:
+    """
+    Bounded cache of the SRP records of users, kept in the manager's memory.
+
+    Every SecureCall handshake reads the verifier and salt of its user, so
+    recently used records are kept for `ttl_s` seconds, up to `max_records`
+    records, dropping the least recently used first. A record must be
+    invalidated whenever it is added or removed in the DB.
+    """
+
+    def __init__(self, ttl_s: float, max_records: int = 10_000):
+        self._ttl_s = ttl_s
+        self._max_records = max_records
+        self._records: OrderedDict[str, tuple[float, SRPRecord]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl_s > 0 and self._max_records > 0
+
+    def get(self, username: str) -> SRPRecord | None:
+        """
+        Returns the cached record of a user.
+
+        Args:
+            username (str): The username.
+
+        Returns:
+            SRPRecord | None: The record, None if it is not cached or expired.
+        """
+        entry = self._records.get(username)
+        if entry is None:
+            return None
+        expires_at, record = entry
+        if expires_at <= time.monotonic():
+            del self._records[username]
+            return None
+        self._records.move_to_end(username)
+        return record
+
+    def put(self, username: str, record: SRPRecord):
+        """
+        Caches the record of a user.
+
+        Args:
+            username (str): The username.
+            record (SRPRecord): The record read from the DB.
+
+        Returns:
+            None
+        """
+        if not self.enabled:
+            return
+        self._records[username] = (time.monotonic() + self._ttl_s, record)
+        self._records.move_to_end(username)
+        while len(self._records) > self._max_records:
+            self._records.popitem(last=False)
+
+    def invalidate(self, username: str):
+        """
+        Drops the cached record of a user.
+
+        Args:
+            username (str): The username.
+
+        Returns:
+            None
+        """
+        self._records.pop(username, None)
@@ -0,0 +1,196 @@
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from vault.common import types
+from vault.manager.service_reaper import ServiceReaper
+from vault.manager.setup_master import SetupMaster
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+@dataclass
+class _PooledService:
+    service_data: types.ServiceData
+    spawned_at: float
+    uses: int = 0
+
+
+class WarmPool:
+    """
+    Pool of pre-spawned, registered services of one kind, e.g. bootstraps.
+
+    Up to `size` idle services are kept ready, so a caller does not wait for a
+    container to start and register. A background task refills the pool after
+    services are handed out. A service is terminated after `max_uses` uses, or
+    once it is older than `ttl_s`. If the pool is empty, a service is spawned on
+    demand. Retired services are terminated in the background by a reaper, and
+    services orphaned by a previous run are removed when the pool starts.
+    """
+
+    def __init__(
+        self,
+        setup_master: SetupMaster,
+        name_prefix: str,
+        image: str,
+        command: str,
+        network: str,
+        environment: dict,
+        size: int,
+        max_uses: int = 1,
+        ttl_s: float = 300.0,
+        max_parallel: int = 8,
+        retry_delay_s: float = 5.0,
+    ):
+        self._logger = logging.getLogger(__class__.__name__)
+        self._setup_master = setup_master
+        self._name_prefix = name_prefix
+        self._image = image
+        self._command = command
+        self._network = network
+        self._environment = environment
+        self._size = size
+        self._max_uses = max_uses
+        self._ttl_s = ttl_s
+        self._max_parallel = max_parallel
+        self._retry_delay_s = retry_delay_s
+        self._idle: list[_PooledService] = []
+        self._refill_needed = asyncio.Event()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._reaper = ServiceReaper(setup_master, max_parallel=max_parallel)
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    async def start(self):
+        """
+        Removes orphaned services, then starts filling the pool in the background.
+
+        Returns:
+            None
+        """
+        # The trailing dash keeps other pools sharing the prefix untouched
+        await self._setup_master.remove_orphaned_services(
+            f"{self._name_prefix}-", max_parallel=self._max_parallel
+        )
+        await self._reaper.start()
+        if self._size > 0:
+            self._refill_task = asyncio.create_task(self._refill_loop())
+            self._refill_needed.set()
+
+    async def close(self):
+        """
+        Stops refilling and terminates all the services of the pool.
+
+        Returns:
+            None
+        """
+        if self._refill_task:
+            self._refill_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refill_task
+            self._refill_task = None
+        for entry in self._idle:
+            self._retire(entry)
+        self._idle.clear()
+        await self._reaper.close()
+
+    @contextlib.asynccontextmanager
+    async def service(self) -> AsyncIterator[types.ServiceData]:
+        """
+        Borrows a ready service, spawning one if the pool is empty.
+
+        Yields:
+            types.ServiceData: The registered service.
+        """
+        entry = self._take_idle()
+        if entry is None:
+            self._logger.info(f"No warm {self._name_prefix}, spawning one")
+            entry = await self._spawn_one()
+        self._refill_needed.set()
+        try:
+            yield entry.service_data
+        finally:
+            entry.uses += 1
+            if entry.uses >= self._max_uses or self._is_expired(entry):
+                self._retire(entry)
+            else:
+                self._idle.append(entry)
+
+    # Private methods
+    def _take_idle(self) -> Optional[_PooledService]:
+        while self._idle:
+            entry = self._idle.pop(0)
+            if not self._is_expired(entry):
+                return entry
+            self._retire(entry)
+        return None
+
+    def _is_expired(self, entry: _PooledService) -> bool:
+        return time.monotonic() - entry.spawned_at >= self._ttl_s
+
+    def _retire(self, entry: _PooledService):
+        self._logger.info(f"Retiring {entry.service_data.container_name}")
+        self._reaper.reap(entry.service_data)
+
+    def _new_container_name(self) -> str:
+        return f"{self._name_prefix}-{uuid.uuid4().hex[:12]}"
+
+    async def _spawn_one(self) -> _PooledService:
+        service_data = await self._setup_master.spawn_server(
+            image=self._image,
+            container_name=self._new_container_name(),
+            command=self._command,
+            network=self._network,
+            environment=self._environment,
+        )
+        return _PooledService(service_data=service_data, spawned_at=time.monotonic())
+
+    async def _refill_loop(self):
+        while True:
+            # Wake up on demand, and periodically to drop expired services
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._refill_needed.wait(), timeout=self._ttl_s / 2
+                )
+            self._refill_needed.clear()
+            self._idle = [e for e in self._idle if not self._retire_if_expired(e)]
+
+            missing = self._size - len(self._idle)
+            if missing <= 0:
+                continue
+            try:
+                services = await self._setup_master.spawn_servers(
+                    image=self._image,
+                    container_names=[
+                        self._new_container_name() for _ in range(missing)
+                    ],
+                    command=self._command,
+                    network=self._network,
+                    environment=self._environment,
+                    max_parallel=self._max_parallel,
+                )
+            except Exception as e:
+                self._logger.error(f"Failed to refill the pool: {e}")
+                await asyncio.sleep(self._retry_delay_s)
+                self._refill_needed.set()
+                continue
+            now = time.monotonic()
+            self._idle.extend(
+                _PooledService(service_data=service_data, spawned_at=now)
+                for service_data in services
+            )
+            self._logger.info(f"{len(self._idle)} warm {self._name_prefix} ready")
+
+    def _retire_if_expired(self, entry: _PooledService) -> bool:
+        if self._is_expired(entry):
+            self._retire(entry)
+            return True
+        return False
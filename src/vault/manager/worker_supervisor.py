@@ -0,0 +1,149 @@
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import time
+from typing import Callable, Optional
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+
+class WorkerSupervisor:
+    """
+    Runs worker processes of the manager and restarts the ones that exit.
+
+    Each worker calls `target` with its worker id. Workers are started with
+    the spawn method, because gRPC does not support forking a process that
+    already uses it. A worker that exits while the supervisor is running is
+    restarted after `restart_delay_s`, doubled for every crash in a row up to
+    `max_restart_delay_s`, so a worker that cannot start does not spin.
+    """
+
+    def __init__(
+        self,
+        target: Callable[[int], None],
+        num_workers: int,
+        restart_delay_s: float = 1.0,
+        max_restart_delay_s: float = 30.0,
+        min_uptime_s: float = 10.0,
+        stop_timeout_s: float = 30.0,
+        poll_interval_s: float = 0.5,
+    ):
+        self._logger = logging.getLogger(__class__.__name__)
+        self._context = multiprocessing.get_context("spawn")
+        self._target = target
+        self._num_workers = num_workers
+        self._restart_delay_s = restart_delay_s
+        self._max_restart_delay_s = max_restart_delay_s
+        self._min_uptime_s = min_uptime_s
+        self._stop_timeout_s = stop_timeout_s
+        self._poll_interval_s = poll_interval_s
+        self._workers: list[Optional[multiprocessing.Process]] = [None] * num_workers
+        self._started_at = [0.0] * num_workers
+        self._crashes_in_a_row = [0] * num_workers
+        self._restart_count = 0
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    @property
+    def restart_count(self) -> int:
+        """The number of times a worker was restarted."""
+        return self._restart_count
+
+    def pids(self) -> list[Optional[int]]:
+        """
+        Returns the process id of every worker, None while it restarts.
+
+        Returns:
+            list[Optional[int]]: A process id per worker id.
+        """
+        return [
+            worker.pid if worker and worker.is_alive() else None
+            for worker in self._workers
+        ]
+
+    async def start(self):
+        """
+        Starts the workers and a task that restarts them when they exit.
+
+        Returns:
+            None
+        """
+        for worker_id in range(self._num_workers):
+            self._start_worker(worker_id)
+        self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def stop(self):
+        """
+        Asks the workers to stop gracefully, killing the ones that do not stop
+        within `stop_timeout_s`.
+
+        Returns:
+            None
+        """
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._monitor_task
+            self._monitor_task = None
+        workers = [worker for worker in self._workers if worker is not None]
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        deadline = time.monotonic() + self._stop_timeout_s
+        for worker in workers:
+            timeout_s = max(deadline - time.monotonic(), 0.0)
+            await asyncio.to_thread(worker.join, timeout_s)
+            if worker.is_alive():
+                self._logger.error(f"Worker {worker.pid} did not stop, killing it")
+                worker.kill()
+                await asyncio.to_thread(worker.join)
+        self._workers = [None] * self._num_workers
+
+    # Private methods
+    def _start_worker(self, worker_id: int):
+        worker = self._context.Process(
+            target=self._target,
+            args=(worker_id,),
+            name=f"vault-manager-worker-{worker_id}",
+        )
+        worker.start()
+        self._workers[worker_id] = worker
+        self._started_at[worker_id] = time.monotonic()
+        self._logger.info(f"Started worker {worker_id} with pid {worker.pid}")
+
+    async def _monitor(self):
+        restarts: dict[int, asyncio.Task] = {}
+        try:
+            while True:
+                await asyncio.sleep(self._poll_interval_s)
+                for worker_id, worker in enumerate(self._workers):
+                    if worker_id in restarts or worker is None or worker.is_alive():
+                        continue
+                    restarts[worker_id] = asyncio.create_task(
+                        self._restart_worker(worker_id, worker.exitcode)
+                    )
+                    restarts[worker_id].add_done_callback(
+                        lambda _, worker_id=worker_id: restarts.pop(worker_id, None)
+                    )
+        finally:
+            for restart in list(restarts.values()):
+                restart.cancel()
+
+    async def _restart_worker(self, worker_id: int, exitcode: Optional[int]):
+        if time.monotonic() - self._started_at[worker_id] < self._min_uptime_s:
+            self._crashes_in_a_row[worker_id] += 1
+        else:
+            self._crashes_in_a_row[worker_id] = 0
+        delay_s = min(
+            self._restart_delay_s * 2 ** self._crashes_in_a_row[worker_id],
+            self._max_restart_delay_s,
+        )
+        self._logger.error(
+            f"Worker {worker_id} exited with code {exitcode}, "
+            f"restarting it in {delay_s}s"
+        )
+        await asyncio.sleep(delay_s)
+        self._start_worker(worker_id)
+        self._restart_count += 1
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+
+class WriteCoalescer(Generic[Item, Result]):
+    """
+    Groups concurrent writes, so they are committed together.
+
+    A write is flushed at once when no batch is being written. Otherwise it
+    waits with the other pending items until that batch is written, `window_s`
+    passed since the first pending item, or `max_size` items are pending, and
+    they are all handed to `flush` as one batch. `flush` returns a
+    result per item, in order, and an exception in place of a result fails
+    only the caller of that item. If `flush` itself raises, every caller of
+    the batch gets the exception.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[Item]], Awaitable[list[Result | Exception]]],
+        window_s: float,
+        max_size: int = 100,
+    ):
+        self._logger = logging.getLogger(__class__.__name__)
+        self._flush = flush
+        self._window_s = window_s
+        self._max_size = max_size
+        self._pending: list[tuple[Item, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: set[asyncio.Task] = set()
+
+    async def submit(self, item: Item) -> Result:
+        """
+        Adds an item to the next batch and waits for the batch to be written.
+
+        Args:
+            item (Item): The item to write.
+
+        Returns:
+            Result: The result of writing the item.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        # Nothing to wait for when no batch is being written, a lone write
+        # goes out at once
+        if len(self._pending) >= self._max_size or not self._flushing:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window_s, self._start_flush)
+        return await future
+
+    async def close(self):
+        """
+        Writes the pending items and waits for all the batches in flight.
+
+        Returns:
+            None
+        """
+        self._start_flush()
+        await asyncio.gather(*self._flushing, return_exceptions=True)
+
+    # Private methods
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._flush_batch(batch))
+        self._flushing.add(task)
+        task.add_done_callback(self._on_flushed)
+
+    def _on_flushed(self, task: asyncio.Task):
+        self._flushing.discard(task)
+        # Writes that queued up behind the finished batch go out together
+        if not self._flushing:
+            self._start_flush()
+
+    async def _flush_batch(self, batch: list[tuple[Item, asyncio.Future]]):
+        try:
+            results = await self._flush([item for item, _ in batch])
+        except Exception as e:
+            self._logger.error(f"Failed to write a batch of {len(batch)}: {e}")
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():  # The caller was cancelled
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
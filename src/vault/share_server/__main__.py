@@ -10,10 +10,15 @@ async def main(
     setup_master_port: int,
     ca_cert_path: str,
     ca_key_path: str,
+    decrypt_workers: int,
 ):
     name = docker_utils.get_container_name(docker_utils.get_self_container_id())
     share_server = ShareServer(
-        name=name, port=port, ca_cert_path=ca_cert_path, ca_key_path=ca_key_path
+        name=name,
+        port=port,
+        ca_cert_path=ca_cert_path,
+        ca_key_path=ca_key_path,
+        decrypt_workers=decrypt_workers,
     )
     setup_unit = SetupUnit(
         port=setup_unit_port,
@@ -1,10 +1,16 @@
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
 import grpc
 
 from vault.common.generated.vault_pb2 import (
+    DecryptBatchResponse,
     DecryptResponse,
     DeleteShareResponse,
+    Secret,
+    StoreShareBatchResponse,
     StoreShareResponse,
 )
 from vault.common.generated.vault_pb2_grpc import (
@@ -28,6 +34,7 @@ class ShareServer(ShareServerServicer):
         port: int,
         ca_cert_path: str = "certs/ca.crt",
         ca_key_path: str = "certs/ca.key",
+        decrypt_workers: int = 0,
     ):
         self._logger = logging.getLogger(__class__.__name__)
         self._port = port
@@ -53,6 +60,13 @@ class ShareServer(ShareServerServicer):
 
         self._privkey_b64, self._pubkey_b64 = generate_key_pair()
         self._encrypted_shares: dict[bytes] = {}
+        # Partial decryptions of a batch run on this pool when configured, so
+        # big batches do not stall the event loop
+        self._decrypt_executor: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=decrypt_workers)
+            if decrypt_workers > 0
+            else None
+        )
 
     async def start(self):
         await self._server.start()
@@ -61,6 +75,8 @@ class ShareServer(ShareServerServicer):
     async def close(self):
         if self._server:
             await self._server.stop(grace=5.0)
+        if self._decrypt_executor:
+            self._decrypt_executor.shutdown(cancel_futures=True)
         self._logger.info("Share server stopped")
 
     async def StoreShare(self, request, context):
@@ -72,6 +88,16 @@ class ShareServer(ShareServerServicer):
         self._encrypted_shares[request.user_id] = request.encrypted_share
         return StoreShareResponse(success=True)
 
+    async def StoreShareBatch(self, request, context):
+        self._logger.info(f"Share server storing {len(request.shares)} shares")
+        success = []
+        for share in request.shares:
+            stored = share.user_id not in self._encrypted_shares
+            if stored:
+                self._encrypted_shares[share.user_id] = share.encrypted_share
+            success.append(stored)
+        return StoreShareBatchResponse(success=success)
+
     async def DeleteShare(self, request, context):
         self._logger.info(f"Share server deleting share for {request.user_id}")
         if request.user_id not in self._encrypted_shares:
@@ -87,13 +113,55 @@ class ShareServer(ShareServerServicer):
             context.set_code(grpc.StatusCode.NOT_FOUND)
             context.set_details("No share found for this user.")
             return DecryptResponse()
-        share = Key.model_validate_json(
-            decrypt(self._encrypted_shares.get(request.user_id), self._privkey_b64)
+        share = self._unseal_share(request.user_id)
+        return DecryptResponse(
+            encrypted_partial_decryption=self._partial_decrypt_and_seal(
+                request.secret, share, request.user_public_key
+            )
         )
-        partial_decryption = partial_decrypt(request.secret, share)
-        encrypted_partial_decryption = encrypt(
-            partial_decryption.model_dump_json().encode(), request.user_public_key
+
+    async def DecryptBatch(self, request, context):
+        self._logger.info(
+            f"Share server decrypting {len(request.secrets)} secrets "
+            f"using share for {request.user_id}"
         )
-        return DecryptResponse(
-            encrypted_partial_decryption=encrypted_partial_decryption
+        if request.user_id not in self._encrypted_shares:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("No share found for this user.")
+            return DecryptBatchResponse()
+        # Unseal the share once for the whole batch
+        share = self._unseal_share(request.user_id)
+        if self._decrypt_executor:
+            loop = asyncio.get_running_loop()
+            encrypted_partial_decryptions = await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        self._decrypt_executor,
+                        self._partial_decrypt_and_seal,
+                        secret,
+                        share,
+                        request.user_public_key,
+                    )
+                    for secret in request.secrets
+                ]
+            )
+        else:
+            encrypted_partial_decryptions = [
+                self._partial_decrypt_and_seal(secret, share, request.user_public_key)
+                for secret in request.secrets
+            ]
+        return DecryptBatchResponse(
+            encrypted_partial_decryptions=encrypted_partial_decryptions
         )
+
+    # Private methods
+    def _unseal_share(self, user_id: str) -> Key:
+        return Key.model_validate_json(
+            decrypt(self._encrypted_shares[user_id], self._privkey_b64)
+        )
+
+    def _partial_decrypt_and_seal(
+        self, secret: Secret, share: Key, user_public_key: bytes
+    ) -> bytes:
+        partial_decryption = partial_decrypt(secret, share)
+        return encrypt(partial_decryption.model_dump_json().encode(), user_public_key)
@@ -67,3 +67,4 @@ async def main(
         raise RuntimeError(f"Expected {secret2=}, got {retrieved_secret2=}")
 
     print("VICTORYYYYYY", flush=True)
+    await user_obj.close()
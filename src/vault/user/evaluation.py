@@ -182,6 +182,7 @@ async def main(
     # through the stdout of the evaluation-user docker. so we print the results, and
     # catch them in the test script.
     print(json.dumps(to_print))
+    await user_obj.close()
 
     # print("--------------BENCHMARK-SUMMERY--------------")
     # print(f"{storage_latencies=}")
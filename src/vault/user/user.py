@@ -1,21 +1,34 @@
+import asyncio
+import hashlib
+import hmac
 import logging
-from typing import Union
+import time
+from typing import Awaitable, Callable, Optional, TypeVar, Union
 
 import grpc
+from pydantic import BaseModel
 
 from vault.common.generated.vault_pb2 import (
     InnerRequest,
     InnerResponse,
+    RegisterBatchRequest,
+    RegisterBatchResponse,
     RegisterRequest,
     RegisterResponse,
     RetrieveSecretRequest,
     RetrieveSecretResponse,
+    RetrieveSecretsRequest,
+    RetrieveSecretsResponse,
+    SecretEntry,
     SecureReqMsgWrapper,
     SecureRespMsgWrapper,
     SRPFirstStep,
+    SRPResumeStep,
     SRPThirdStep,
     StoreSecretRequest,
     StoreSecretResponse,
+    StoreSecretsRequest,
+    StoreSecretsResponse,
 )
 from vault.common.generated.vault_pb2_grpc import ManagerStub
 from vault.common.types import Key, PartialDecryption
@@ -23,12 +36,22 @@ from vault.crypto import asymmetric, certs, threshold
 from vault.crypto.authentication import (
     srp_authentication_client_step_two,
     srp_registration_client_generate_data,
+    srp_resumption_client_proof,
 )
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
+T = TypeVar("T")
+
+
+class ResumptionTicket(BaseModel):
+    ticket: bytes
+    session_key: bytes
+    expires_at: float
+    password_digest: bytes
+
 
 class User:
     def __init__(
@@ -39,6 +62,8 @@ class User:
         threshold: int,
         num_of_total_shares: int,
         ca_cert_path: str = "certs/ca.crt",
+        keepalive_time_ms: int = 60_000,
+        keepalive_timeout_ms: int = 20_000,
     ):
         self._logger = logging.getLogger(__class__.__name__)
         self._user_id = user_id
@@ -49,36 +74,68 @@ class User:
         self._privkey_b64, self._pubkey_b64 = asymmetric.generate_key_pair()
         self._ca_cert = certs.load_ca_cert(ca_cert_path)
         self._creds = grpc.ssl_channel_credentials(root_certificates=self._ca_cert)
+        self._channel_options = [
+            ("grpc.keepalive_time_ms", keepalive_time_ms),
+            ("grpc.keepalive_timeout_ms", keepalive_timeout_ms),
+            ("grpc.keepalive_permit_without_calls", 1),
+        ]
+        self._channel: Optional[grpc.aio.Channel] = None
+        self._stub: Optional[ManagerStub] = None
+        self._resumption_ticket: Optional[ResumptionTicket] = None
         self._encrypted_share = None
         self._encryption_key = None
         self._secrets_ids = set()
 
+    async def __aenter__(self) -> "User":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the channel to the manager, if open.
+
+        Returns:
+            None
+        """
+        if self._channel is not None:
+            channel = self._channel
+            self._channel = None
+            self._stub = None
+            await channel.close()
+
     async def register(self, password: str):
+        request = self._create_register_request(password)
+        response: RegisterResponse = await self._call_with_reconnect(
+            lambda stub: stub.Register(request), idempotent=False
+        )
+        self._apply_register_response(response)
+
+    def _create_register_request(self, password: str) -> RegisterRequest:
         _, password_verifier, salt = srp_registration_client_generate_data(
             username=self._user_id,
             password=password,
         )
+        return RegisterRequest(
+            user_id=self._user_id,
+            verifier=password_verifier,
+            salt=salt,
+            user_public_key=self._pubkey_b64,
+        )
 
-        async with grpc.aio.secure_channel(
-            f"{self._server_ip}:{self._server_port}", self._creds
-        ) as channel:
-            stub = ManagerStub(channel)
-            response: RegisterResponse = await stub.Register(
-                RegisterRequest(
-                    user_id=self._user_id,
-                    verifier=password_verifier,
-                    salt=salt,
-                    user_public_key=self._pubkey_b64,
-                )
-            )
-
-            self._encrypted_share = response.encrypted_share
-            self._encryption_key = Key.model_validate_json(
-                asymmetric.decrypt(
-                    response.encrypted_key,
-                    self._privkey_b64,
-                )
+    def _apply_register_response(self, response: RegisterResponse):
+        self._encrypted_share = response.encrypted_share
+        # The manager decides the threshold, older managers do not report it
+        if response.threshold:
+            self._threshold = response.threshold
+            self._num_of_total_shares = response.num_of_shares
+        self._encryption_key = Key.model_validate_json(
+            asymmetric.decrypt(
+                response.encrypted_key,
+                self._privkey_b64,
             )
+        )
 
     # --- Client code: secure call ---
     async def do_secure_call(
@@ -90,77 +147,167 @@ class User:
             RetrieveSecretRequest,
         ],
     ) -> bytes:
-        async with grpc.aio.secure_channel(
-            f"{self._server_ip}:{self._server_port}", self._creds
-        ) as channel:
-            stub = ManagerStub(channel)
-            call = stub.SecureCall()
-
-            # send client_init
-            await call.write(
-                SecureReqMsgWrapper(auth_step_1=SRPFirstStep(username=self._user_id))
+        app_req = self._create_inner_request_from_user_request(request_protobuf)
+        # Stores must not run twice, only retrievals are retried
+        return await self._call_with_reconnect(
+            lambda stub: self._secure_call(stub, password, app_req),
+            idempotent=type(request_protobuf)
+            in (RetrieveSecretRequest, RetrieveSecretsRequest),
+        )
+
+    async def open_session(self, password: str) -> "UserSession":
+        """
+        Authenticates once and opens a session for many pipelined requests.
+
+        Args:
+            password (str): The user's password.
+
+        Returns:
+            UserSession: The opened session, to be closed by the caller.
+        """
+        call = await self._call_with_reconnect(
+            lambda stub: self._open_authenticated_call(stub, password, session=True)
+        )
+        return UserSession(self, call)
+
+    async def _secure_call(
+        self, stub: ManagerStub, password: str, app_req: InnerRequest
+    ) -> Union[StoreSecretResponse, RetrieveSecretResponse]:
+        call = await self._open_resumed_call(stub, password)
+        if call is not None:
+            try:
+                return await self._send_app_request(call, app_req)
+            except grpc.aio.AioRpcError as e:
+                if e.code() != grpc.StatusCode.UNAUTHENTICATED:
+                    raise
+                # Ticket expired or unknown to the manager, the app_req was not served
+                self._resumption_ticket = None
+
+        call = await self._open_authenticated_call(stub, password, session=False)
+        return await self._send_app_request(call, app_req)
+
+    async def _send_app_request(
+        self, call, app_req: InnerRequest
+    ) -> Union[StoreSecretResponse, RetrieveSecretResponse]:
+        # send application request
+        await call.write(SecureReqMsgWrapper(app_req=app_req))
+
+        # read app response
+        app_resp_msg = await call.read()
+        await call.done_writing()
+
+        if not app_resp_msg or not app_resp_msg.HasField("app_resp"):
+            raise RuntimeError("expected app_resp")
+        app_res = self._create_user_response_from_inner_response(app_resp_msg.app_resp)
+        return app_res
+
+    async def _open_authenticated_call(
+        self, stub: ManagerStub, password: str, session: bool
+    ):
+        call = stub.SecureCall()
+
+        # send client_init
+        await call.write(
+            SecureReqMsgWrapper(
+                auth_step_1=SRPFirstStep(username=self._user_id, session=session)
             )
+        )
 
-            # read server_resp
-            auth_step_2_msg: SecureRespMsgWrapper = await call.read()
-            if not auth_step_2_msg or not auth_step_2_msg.HasField("auth_step_2"):
-                raise RuntimeError("expected auth_step_2")
+        # read server_resp
+        auth_step_2_msg: SecureRespMsgWrapper = await call.read()
+        if not auth_step_2_msg or not auth_step_2_msg.HasField("auth_step_2"):
+            raise RuntimeError("expected auth_step_2")
 
-            salt: str = auth_step_2_msg.auth_step_2.salt
-            server_public: str = auth_step_2_msg.auth_step_2.server_public_key
+        salt: str = auth_step_2_msg.auth_step_2.salt
+        server_public: str = auth_step_2_msg.auth_step_2.server_public_key
 
-            client_public, _client_session_key, client_session_key_proof = (
-                srp_authentication_client_step_two(
-                    username=self._user_id,
-                    password=password,
-                    server_public_key=server_public,
-                    salt=salt,
-                )
+        client_public, client_session_key, client_session_key_proof = (
+            srp_authentication_client_step_two(
+                username=self._user_id,
+                password=password,
+                server_public_key=server_public,
+                salt=salt,
             )
+        )
 
-            await call.write(
-                SecureReqMsgWrapper(
-                    auth_step_3=SRPThirdStep(
-                        client_public_key=client_public,
-                        client_session_key_proof=client_session_key_proof,
-                    )
+        await call.write(
+            SecureReqMsgWrapper(
+                auth_step_3=SRPThirdStep(
+                    client_public_key=client_public,
+                    client_session_key_proof=client_session_key_proof,
                 )
             )
-            auth_step_3_ack_msg: SecureRespMsgWrapper = await call.read()
-            if not auth_step_3_ack_msg or not auth_step_3_ack_msg.HasField(
-                "auth_step_3_ack"
-            ):
-                raise RuntimeError("expected auth_step_3_ack")
-
-            if not auth_step_3_ack_msg.auth_step_3_ack.ok:
-                raise RuntimeError("expected ok")
-
-            # send application request
-            app_req = self._create_inner_request_from_user_request(request_protobuf)
-            await call.write(SecureReqMsgWrapper(app_req=app_req))
-
-            # read app response
-            app_resp_msg = await call.read()
-            await call.done_writing()
-
-            if not app_resp_msg or not app_resp_msg.HasField("app_resp"):
-                raise RuntimeError("expected app_resp")
-            app_res = self._create_user_response_from_inner_response(
-                app_resp_msg.app_resp
+        )
+        auth_step_3_ack_msg: SecureRespMsgWrapper = await call.read()
+        if not auth_step_3_ack_msg or not auth_step_3_ack_msg.HasField(
+            "auth_step_3_ack"
+        ):
+            raise RuntimeError("expected auth_step_3_ack")
+
+        if not auth_step_3_ack_msg.auth_step_3_ack.ok:
+            raise RuntimeError("expected ok")
+
+        auth_step_3_ack = auth_step_3_ack_msg.auth_step_3_ack
+        if auth_step_3_ack.resumption_ticket:
+            self._resumption_ticket = ResumptionTicket(
+                ticket=auth_step_3_ack.resumption_ticket,
+                session_key=client_session_key,
+                # Leave a margin so the ticket does not expire in flight
+                expires_at=time.monotonic()
+                + auth_step_3_ack.resumption_ticket_lifetime_s
+                - 1,
+                password_digest=self._password_digest(password),
+            )
+        return call
+
+    async def _open_resumed_call(self, stub: ManagerStub, password: str):
+        resumption_ticket = self._resumption_ticket
+        if (
+            resumption_ticket is None
+            or time.monotonic() >= resumption_ticket.expires_at
+            # A ticket only stands in for the password it was earned with
+            or not hmac.compare_digest(
+                resumption_ticket.password_digest, self._password_digest(password)
+            )
+        ):
+            return None
+
+        nonce, proof = srp_resumption_client_proof(
+            resumption_ticket.session_key, resumption_ticket.ticket
+        )
+        call = stub.SecureCall()
+        await call.write(
+            SecureReqMsgWrapper(
+                auth_resume=SRPResumeStep(
+                    username=self._user_id,
+                    ticket=resumption_ticket.ticket,
+                    nonce=nonce,
+                    proof=proof,
+                )
             )
-            return app_res
+        )
+        return call
+
+    def _password_digest(self, password: str) -> bytes:
+        return hashlib.sha256(password.encode()).digest()
 
     def _create_inner_request_from_user_request(
         self,
         request_protobuf: Union[
             StoreSecretRequest,
             RetrieveSecretRequest,
+            StoreSecretsRequest,
+            RetrieveSecretsRequest,
         ],
     ) -> InnerRequest:
         if type(request_protobuf) is StoreSecretRequest:
             return InnerRequest(store=request_protobuf)
         elif type(request_protobuf) is RetrieveSecretRequest:
             return InnerRequest(retrieve=request_protobuf)
+        elif type(request_protobuf) is StoreSecretsRequest:
+            return InnerRequest(store_batch=request_protobuf)
+        elif type(request_protobuf) is RetrieveSecretsRequest:
+            return InnerRequest(retrieve_batch=request_protobuf)
         else:
             raise RuntimeError(
                 f"unknown request_protobuf type: {type(request_protobuf)}"
@@ -172,24 +319,24 @@ class User:
     ) -> Union[
         StoreSecretResponse,
         RetrieveSecretResponse,
+        StoreSecretsResponse,
+        RetrieveSecretsResponse,
     ]:
         if inner_response.HasField("store"):
             return inner_response.store
         elif inner_response.HasField("retrieve"):
             return inner_response.retrieve
+        elif inner_response.HasField("store_batch"):
+            return inner_response.store_batch
+        elif inner_response.HasField("retrieve_batch"):
+            return inner_response.retrieve_batch
         else:
             raise RuntimeError("unknown InnerRequest body type")
 
     async def store_secret(self, password: str, secret: str, secret_id: str) -> bool:
-        self._secrets_ids.add(secret_id)
-        encrypted_secret = threshold.encrypt(secret, self._encryption_key)
         response: StoreSecretResponse = await self.do_secure_call(
             password=password,
-            request_protobuf=StoreSecretRequest(
-                user_id=self._user_id,
-                secret_id=secret_id,
-                secret=encrypted_secret,
-            ),
+            request_protobuf=self._create_store_secret_request(secret, secret_id),
         )
         return response.success
 
@@ -205,7 +352,90 @@ class User:
                 secret_id=secret_id,
             ),
         )
+        return self._decrypt_retrieved_secret(response)
+
+    async def store_secrets(
+        self, password: str, secrets: dict[str, str], batch_size: int = 1000
+    ) -> bool:
+        """
+        Stores many secrets, `batch_size` secrets per request.
 
+        Args:
+            password (str): The user's password.
+            secrets (dict[str, str]): The secrets to store, by secret ID.
+            batch_size (int): Maximum number of secrets in one request, must not
+                exceed the manager's max batch size.
+
+        Returns:
+            bool: True if all secrets were stored.
+        """
+        items = list(secrets.items())
+        for start in range(0, len(items), batch_size):
+            chunk = items[start : start + batch_size]
+            response: StoreSecretsResponse = await self.do_secure_call(
+                password=password,
+                request_protobuf=StoreSecretsRequest(
+                    user_id=self._user_id,
+                    secrets=[
+                        SecretEntry(
+                            secret_id=secret_id,
+                            secret=self._create_store_secret_request(
+                                secret, secret_id
+                            ).secret,
+                        )
+                        for secret_id, secret in chunk
+                    ],
+                ),
+            )
+            if not response.success:
+                return False
+        return True
+
+    async def retrieve_secrets(
+        self, password: str, secret_ids: list[str], batch_size: int = 1000
+    ) -> dict[str, str | None]:
+        """
+        Retrieves many secrets, `batch_size` secrets per request.
+
+        Args:
+            password (str): The user's password.
+            secret_ids (list[str]): The IDs of the secrets to retrieve.
+            batch_size (int): Maximum number of secrets in one request, must not
+                exceed the manager's max batch size.
+
+        Returns:
+            dict[str, str | None]: The secrets by ID, None for unknown IDs.
+        """
+        result: dict[str, str | None] = {i: None for i in secret_ids}
+        known_ids = [i for i in result if i in self._secrets_ids]
+        for start in range(0, len(known_ids), batch_size):
+            chunk = known_ids[start : start + batch_size]
+            response: RetrieveSecretsResponse = await self.do_secure_call(
+                password=password,
+                request_protobuf=RetrieveSecretsRequest(
+                    user_id=self._user_id,
+                    secret_ids=chunk,
+                ),
+            )
+            for secret_id, secret_response in zip(chunk, response.secrets):
+                result[secret_id] = self._decrypt_retrieved_secret(secret_response)
+        return result
+
+    def get_secrets_ids(self) -> set[str]:
+        return self._secrets_ids
+
+    def _create_store_secret_request(
+        self, secret: str, secret_id: str
+    ) -> StoreSecretRequest:
+        self._secrets_ids.add(secret_id)
+        encrypted_secret = threshold.encrypt(secret, self._encryption_key)
+        return StoreSecretRequest(
+            user_id=self._user_id,
+            secret_id=secret_id,
+            secret=encrypted_secret,
+        )
+
+    def _decrypt_retrieved_secret(self, response: RetrieveSecretResponse) -> str:
         share = Key.model_validate_json(
             asymmetric.decrypt(self._encrypted_share, self._privkey_b64)
         )
@@ -227,5 +457,191 @@ class User:
         )
         return decrypted_secret
 
-    def get_secrets_ids(self) -> set[str]:
-        return self._secrets_ids
+    # Private methods
+    def _get_stub(self) -> ManagerStub:
+        if self._stub is None:
+            self._channel = grpc.aio.secure_channel(
+                f"{self._server_ip}:{self._server_port}",
+                self._creds,
+                options=self._channel_options,
+            )
+            self._stub = ManagerStub(self._channel)
+        return self._stub
+
+    async def _call_with_reconnect(
+        self, rpc: Callable[[ManagerStub], Awaitable[T]], idempotent: bool = True
+    ) -> T:
+        """
+        Calls the manager, replacing the channel if the manager is unavailable.
+
+        UNAVAILABLE does not tell whether the manager already served the call,
+        so only an idempotent call is retried on the new channel. Any other
+        call raises, and the next call uses the new channel.
+
+        Args:
+            rpc (Callable[[ManagerStub], Awaitable[T]]): Makes the call on a stub.
+            idempotent (bool): Whether the call can safely run twice.
+
+        Returns:
+            T: The result of the call.
+        """
+        stub = self._get_stub()
+        channel = self._channel
+        try:
+            return await rpc(stub)
+        except grpc.aio.AioRpcError as e:
+            if e.code() != grpc.StatusCode.UNAVAILABLE:
+                raise
+            self._logger.warning(f"Manager unavailable ({e.details()}), reconnecting")
+            # Another caller may have already replaced the broken channel
+            if self._channel is channel:
+                await self.close()
+            if not idempotent:
+                raise
+        return await rpc(self._get_stub())
+
+
+class UserSession:
+    """
+    Authenticated SecureCall stream serving many requests after one SRP handshake.
+
+    Requests are pipelined: each one carries a request id, and responses are
+    matched back by it, so they may arrive out of order. Opened by
+    `User.open_session`.
+    """
+
+    def __init__(self, user: User, call):
+        self._user = user
+        self._call = call
+        self._write_lock = asyncio.Lock()
+        self._next_request_id = 1
+        self._pending: dict[int, asyncio.Future] = {}
+        self._closed = False
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    async def __aenter__(self) -> "UserSession":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        Stops sending requests and waits for the outstanding responses.
+
+        Returns:
+            None
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if not self._reader_task.done():
+            async with self._write_lock:
+                await self._call.done_writing()
+        await self._reader_task
+
+    async def request(
+        self,
+        request_protobuf: Union[
+            StoreSecretRequest,
+            RetrieveSecretRequest,
+        ],
+    ) -> Union[
+        StoreSecretResponse,
+        RetrieveSecretResponse,
+    ]:
+        if self._closed or self._reader_task.done():
+            raise RuntimeError("session is closed")
+
+        app_req = self._user._create_inner_request_from_user_request(request_protobuf)
+        app_req.request_id = self._next_request_id
+        self._next_request_id += 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[app_req.request_id] = future
+        try:
+            async with self._write_lock:
+                await self._call.write(SecureReqMsgWrapper(app_req=app_req))
+            return await future
+        finally:
+            self._pending.pop(app_req.request_id, None)
+
+    async def store_secret(self, secret: str, secret_id: str) -> bool:
+        response: StoreSecretResponse = await self.request(
+            self._user._create_store_secret_request(secret, secret_id)
+        )
+        return response.success
+
+    async def retrieve_secret(self, secret_id: str) -> str | None:
+        if secret_id not in self._user.get_secrets_ids():
+            print(f"Secret ID {secret_id} not found for user {self._user._user_id}")
+            return None
+
+        response: RetrieveSecretResponse = await self.request(
+            RetrieveSecretRequest(user_id=self._user._user_id, secret_id=secret_id)
+        )
+        return self._user._decrypt_retrieved_secret(response)
+
+    # Private methods
+    async def _read_responses(self):
+        error = RuntimeError("session closed")
+        try:
+            while True:
+                msg: SecureRespMsgWrapper = await self._call.read()
+                if msg is grpc.aio.EOF:
+                    break
+                if not msg.HasField("app_resp"):
+                    error = RuntimeError("expected app_resp")
+                    break
+                future = self._pending.get(msg.app_resp.request_id)
+                if future is None or future.done():
+                    continue
+                if msg.app_resp.error:
+                    future.set_exception(RuntimeError(msg.app_resp.error))
+                else:
+                    future.set_result(
+                        self._user._create_user_response_from_inner_response(
+                            msg.app_resp
+                        )
+                    )
+        except grpc.aio.AioRpcError as e:
+            error = e
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+
+async def register_users(users: list[tuple[User, str]]):
+    """
+    Registers many users with a single RegisterBatch call.
+
+    The call goes through the first user's channel to the manager. The users
+    the manager registered are set up even if others failed, so they need not
+    be registered again.
+
+    Args:
+        users (list[tuple[User, str]]): The users to register, with their passwords.
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError: If some of the users were not registered.
+    """
+    if not users:
+        return
+    request = RegisterBatchRequest(
+        users=[user._create_register_request(password) for user, password in users]
+    )
+    response: RegisterBatchResponse = await users[0][0]._call_with_reconnect(
+        lambda stub: stub.RegisterBatch(request), idempotent=False
+    )
+    errors = []
+    for (user, _), user_response in zip(users, response.users):
+        if user_response.error:
+            errors.append(f"{user._user_id}: {user_response.error}")
+        else:
+            user._apply_register_response(user_response)
+    if errors:
+        raise RuntimeError(f"Failed to register {len(errors)} users: {errors}")
@@ -1,3 +1,5 @@
+import asyncio
+
 import grpc
 import grpc_testing
 import pytest
@@ -7,6 +9,7 @@ from grpc_testing._server._server import _Server
 from vault.bootstrap.bootstrap import Bootstrap
 from vault.common.generated.vault_pb2 import (
     DESCRIPTOR,
+    GenerateSharesBatchRequest,
     GenerateSharesRequest,
 )
 from vault.common.generated.vault_pb2_grpc import BootstrapStub
@@ -140,3 +143,59 @@ async def test_generate_shares_raises_invalid_arg_when_different_number_of_share
             )
         )
         assert exc_info.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_pairs", [3], indirect=True)
+async def test_generate_shares_uses_pregenerated_key(key_pairs):
+    # Arrange
+    privs, pubs = key_pairs
+    bootstrap = Bootstrap("bootstrap", 0, threshold=3, num_of_shares=3)
+    await bootstrap.start()
+    while not bootstrap._pregenerated.full():
+        await asyncio.sleep(0.01)
+    pregenerated_key, _ = bootstrap._pregenerated._queue[0]
+
+    # Act
+    response = await bootstrap.GenerateShares(
+        GenerateSharesRequest(threshold=3, num_of_shares=3, public_keys=pubs), None
+    )
+    await bootstrap.close()
+
+    # Assert
+    assert (
+        Key.model_validate_json(decrypt(response.encrypted_key, privs[-1]))
+        == pregenerated_key
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_pairs", [4], indirect=True)
+async def test_generate_shares_batch_generates_a_key_per_user(key_pairs):
+    # Arrange
+    privs, pubs = key_pairs
+    server_pubs, user_pubs = pubs[:2], pubs[2:]
+    bootstrap = Bootstrap("bootstrap", 0)
+
+    # Act
+    response = await bootstrap.GenerateSharesBatch(
+        GenerateSharesBatchRequest(
+            threshold=3,
+            num_of_shares=3,
+            server_public_keys=server_pubs,
+            user_public_keys=user_pubs,
+        ),
+        None,
+    )
+
+    # Assert
+    assert len(response.users) == 2
+    keys = []
+    for user_response, user_priv in zip(response.users, privs[2:]):
+        shares_privs = [*privs[:2], user_priv]
+        for enc_share, priv in zip(user_response.encrypted_shares, shares_privs):
+            Key.model_validate_json(decrypt(enc_share, priv))
+        keys.append(
+            Key.model_validate_json(decrypt(user_response.encrypted_key, user_priv))
+        )
+    assert keys[0] != keys[1]
@@ -0,0 +1,56 @@
+import grpc
+import pytest
+import pytest_asyncio
+
+from vault.common.channel_pool import ChannelPool
+from vault.crypto.certs import load_ca_cert
+
+
+@pytest_asyncio.fixture
+async def pool():
+    creds = grpc.ssl_channel_credentials(root_certificates=load_ca_cert("certs/ca.crt"))
+    pool = ChannelPool(creds, idle_timeout_s=0.1)
+    yield pool
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_channel_is_reused(pool: ChannelPool):
+    async with pool.channel("share-0:5000") as first:
+        pass
+    async with pool.channel("share-0:5000") as second:
+        pass
+    async with pool.channel("share-1:5000") as other:
+        pass
+
+    assert first is second
+    assert other is not first
+
+
+@pytest.mark.asyncio
+async def test_remove_host_drops_all_ports(pool: ChannelPool):
+    async with pool.channel("share-0:5000") as channel:
+        pass
+    async with pool.channel("share-0:4000"):
+        pass
+    async with pool.channel("share-1:5000"):
+        pass
+
+    await pool.remove_host("share-0")
+
+    assert list(pool._channels) == ["share-1:5000"]
+    async with pool.channel("share-0:5000") as new_channel:
+        assert new_channel is not channel
+
+
+@pytest.mark.asyncio
+async def test_evict_idle_skips_borrowed_channels(pool: ChannelPool):
+    async with pool.channel("share-0:5000"):
+        pass
+    async with pool.channel("share-1:5000") as borrowed:
+        pool._channels["share-1:5000"].last_used = 0
+        pool._channels["share-0:5000"].last_used = 0
+        await pool.evict_idle()
+
+        assert list(pool._channels) == ["share-1:5000"]
+        assert pool._channels["share-1:5000"].channel is borrowed
@@ -1,18 +1,22 @@
+import asyncio
+
 import pytest
 import pytest_asyncio
+from sqlalchemy import text
 from testcontainers.postgres import PostgresContainer
 
 from vault.common import types
 from vault.manager.db_manager import DBManager
 
 
-@pytest_asyncio.fixture
-async def db_manager(db: PostgresContainer):
+# Every test runs against the asyncpg fast path and against the ORM
+@pytest_asyncio.fixture(params=[True, False], ids=["fast_path", "orm"])
+async def db_manager(db: PostgresContainer, request):
     db_url = db.get_connection_url().replace(
         "postgresql+psycopg2://", "postgresql+asyncpg://", 1
     )
     print(f"Using database URL: {db_url}")
-    db = DBManager(db_url)
+    db = DBManager(db_url, fast_path=request.param)
     await db.start()
     yield db
     await db.close()
@@ -28,6 +32,15 @@ async def test_add_and_get_secret(db_manager: DBManager):
     assert result == secret
 
 
+@pytest.mark.asyncio
+async def test_add_and_get_secrets(db_manager: DBManager):
+    user_id = "user1"
+    secrets = [("sec1", b"first"), ("sec2", b"second")]
+    await db_manager.add_secrets(user_id, secrets)
+    result = await db_manager.get_secrets(user_id, ["sec1", "sec2", "missing"])
+    assert result == dict(secrets)
+
+
 @pytest.mark.asyncio
 async def test_add_user_and_get_pubkey(db_manager: DBManager):
     user_id = "user2"
@@ -92,6 +105,26 @@ async def test_add_and_get_server(db_manager: DBManager):
     assert result is None
 
 
+@pytest.mark.asyncio
+async def test_servers_keys_and_addresses_skip_bootstraps(db_manager: DBManager):
+    for container_id, service_type in [
+        ("b", types.ServiceType.SHARE_SERVER),
+        ("boot", types.ServiceType.BOOSTRAP_SERVER),
+        ("a", types.ServiceType.SHARE_SERVER),
+    ]:
+        await db_manager.add_server(
+            types.ServiceData(
+                type=service_type,
+                container_id=container_id,
+                container_name=f"name-{container_id}",
+                public_key=f"key-{container_id}".encode(),
+            )
+        )
+
+    assert await db_manager.get_servers_addresses() == ["name-a", "name-b"]
+    assert await db_manager.get_servers_keys() == [b"key-a", b"key-b"]
+
+
 @pytest.mark.asyncio
 async def test_auth_client(db_manager: DBManager):
     username = "user"
@@ -100,9 +133,140 @@ async def test_auth_client(db_manager: DBManager):
     await db_manager.add_auth_client(username, verifier, salt)
     assert verifier == await db_manager.get_auth_client_verifier(username)
     assert salt == await db_manager.get_auth_client_salt(username)
+    assert (verifier, salt) == await db_manager.get_auth_client(username)
     await db_manager.remove_auth_client(username)
     try:
         await db_manager.get_auth_client_verifier(username)
         assert False
     except Exception:
         pass
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_warm_connections(db_manager: DBManager):
+    # Arrange
+    warm = db_manager.pool_stats()
+
+    # Act
+    for i in range(10):
+        await db_manager.user_exists(f"user{i}")
+    after = db_manager.pool_stats()
+
+    # Assert
+    assert warm.size == 5
+    assert warm.checked_in == 5
+    assert after.checked_in == 5
+    assert after.checked_out == 0
+    assert after.overflow == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_can_be_disabled(db: PostgresContainer):
+    # Arrange
+    db_url = db.get_connection_url().replace(
+        "postgresql+psycopg2://", "postgresql+asyncpg://", 1
+    )
+    db_manager = DBManager(db_url, pool_max_size=0)
+
+    # Act
+    await db_manager.start()
+    exists = await db_manager.user_exists("user1")
+    await db_manager.close()
+
+    # Assert
+    assert not exists
+    assert db_manager.pool_stats() is None
+
+
+@pytest.mark.asyncio
+async def test_get_user_and_secrets(db_manager: DBManager):
+    # Arrange
+    await db_manager.add_user("user1", b"pubkey1")
+    await db_manager.add_user("user2", b"pubkey2")
+    await db_manager.add_secrets("user1", [("sec1", b"first"), ("sec2", b"second")])
+    await db_manager.add_secret("user2", "sec1", b"other")
+
+    # Act
+    found = await db_manager.get_user_and_secrets("user1", ["sec1", "missing"])
+    without_secrets = await db_manager.get_user_and_secrets("user2", ["missing"])
+    missing_user = await db_manager.get_user_and_secrets("user3", ["sec1"])
+
+    # Assert
+    assert found == (b"pubkey1", {"sec1": b"first"})
+    assert without_secrets == (b"pubkey2", {})
+    assert missing_user is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fast_path", [True, False], ids=["fast_path", "orm"])
+async def test_group_commit_of_concurrent_secrets(
+    db: PostgresContainer, fast_path: bool
+):
+    # Arrange
+    db_url = db.get_connection_url().replace(
+        "postgresql+psycopg2://", "postgresql+asyncpg://", 1
+    )
+    db_manager = DBManager(db_url, fast_path=fast_path, group_commit_window_s=0.01)
+    await db_manager.start()
+    await db_manager.add_secret("user1", "existing", b"old")
+
+    # Act
+    results = await asyncio.gather(
+        *[db_manager.add_secret("user1", f"sec{i}", f"{i}".encode()) for i in range(5)],
+        db_manager.add_secret("user1", "existing", b"new"),
+        db_manager.add_secret("user1", "twice", b"first"),
+        db_manager.add_secret("user1", "twice", b"second"),
+        return_exceptions=True,
+    )
+    stored = await db_manager.get_secrets(
+        "user1", [f"sec{i}" for i in range(5)] + ["existing", "twice"]
+    )
+    await db_manager.close()
+
+    # Assert
+    assert results[:5] == [None] * 5
+    assert isinstance(results[5], RuntimeError)
+    assert results[6] is None
+    assert isinstance(results[7], RuntimeError)
+    assert stored == {
+        **{f"sec{i}": f"{i}".encode() for i in range(5)},
+        "existing": b"old",
+        "twice": b"first",
+    }
+
+
+async def terminate_backend(db_manager: DBManager, pid: int):
+    async with db_manager._engine.connect() as connection:
+        await connection.execute(text(f"SELECT pg_terminate_backend({pid})"))
+
+
+@pytest.mark.asyncio
+async def test_listen_reconnects_after_losing_connection(db: PostgresContainer):
+    # Arrange
+    db_url = db.get_connection_url().replace(
+        "postgresql+psycopg2://", "postgresql+asyncpg://", 1
+    )
+    db_manager = DBManager(db_url, listen_check_interval_s=0.05)
+    await db_manager.start()
+    payloads = []
+    reconnected = asyncio.Event()
+
+    async def on_reconnected():
+        reconnected.set()
+
+    await db_manager.listen("test_channel", payloads.append, on_reconnected)
+    pid = db_manager._listen_driver_connection.get_server_pid()
+
+    # Act
+    await terminate_backend(db_manager, pid)
+    await asyncio.wait_for(reconnected.wait(), timeout=2)
+    await db_manager.notify("test_channel", "after")
+    async with asyncio.timeout(2):
+        while not payloads:
+            await asyncio.sleep(0.01)
+
+    # Assert
+    assert db_manager._listen_driver_connection.get_server_pid() != pid
+    assert payloads == ["after"]
+    await db_manager.close()
+    assert db_manager._listen_connection is None
@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+import pytest
+
+from vault.manager.event_loop_monitor import EventLoopMonitor
+
+
+@pytest.mark.asyncio
+async def test_measures_blocked_loop():
+    # Arrange
+    monitor = EventLoopMonitor(interval_s=0.01)
+    monitor.start()
+    await asyncio.sleep(0.05)
+
+    # Act
+    time.sleep(0.2)
+    await asyncio.sleep(0.05)
+
+    # Assert
+    assert monitor.max_lag_s >= 0.15
+    assert monitor.lag_s < 0.15
+    await monitor.close()
+
+
+@pytest.mark.asyncio
+async def test_no_lag_before_start():
+    # Arrange
+    monitor = EventLoopMonitor()
+
+    # Act & Assert
+    assert monitor.lag_s == 0.0
+    assert monitor.max_lag_s == 0.0
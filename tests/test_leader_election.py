@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from testcontainers.postgres import PostgresContainer
+
+from vault.manager.db_manager import DBManager
+from vault.manager.leader_election import LeaderElection
+
+
+class Replica:
+    def __init__(self, db: DBManager, interval_s: float = 0.05):
+        self.db = db
+        self.events: list[str] = []
+        self.election = LeaderElection(
+            db,
+            on_elected=self._on_elected,
+            on_deposed=self._on_deposed,
+            interval_s=interval_s,
+        )
+
+    async def _on_elected(self):
+        self.events.append("elected")
+
+    async def _on_deposed(self):
+        self.events.append("deposed")
+
+
+@pytest_asyncio.fixture
+async def db_managers(db: PostgresContainer):
+    db_url = db.get_connection_url().replace(
+        "postgresql+psycopg2://", "postgresql+asyncpg://", 1
+    )
+    db_managers = [DBManager(db_url) for _ in range(2)]
+    for db_manager in db_managers:
+        await db_manager.start()
+    yield db_managers
+    for db_manager in db_managers:
+        await db_manager.close()
+
+
+async def wait_until(condition, timeout_s: float = 2.0):
+    async with asyncio.timeout(timeout_s):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_only_one_replica_is_elected(db_managers: list[DBManager]):
+    # Arrange
+    first, second = (Replica(db_manager) for db_manager in db_managers)
+
+    # Act
+    await first.election.start()
+    await second.election.start()
+    await asyncio.sleep(0.2)
+
+    # Assert
+    assert first.election.is_leader
+    assert not second.election.is_leader
+    assert first.events == ["elected"]
+    assert second.events == []
+    await first.election.close()
+    await second.election.close()
+
+
+@pytest.mark.asyncio
+async def test_replica_takes_over_when_the_leader_steps_down(
+    db_managers: list[DBManager],
+):
+    # Arrange
+    first, second = (Replica(db_manager) for db_manager in db_managers)
+    await first.election.start()
+    await second.election.start()
+
+    # Act
+    await first.election.close()
+    await wait_until(lambda: second.election.is_leader)
+
+    # Assert
+    assert second.events == ["elected"]
+    await second.election.close()
+
+
+@pytest.mark.asyncio
+async def test_leader_is_deposed_when_its_connection_is_lost(
+    db_managers: list[DBManager],
+):
+    # Arrange
+    first, second = (Replica(db_manager) for db_manager in db_managers)
+    await first.election.start()
+    await second.election.start()
+
+    lock_connection = next(iter(first.db._lock_connections.values()))
+    pid = (await lock_connection.execute(text("SELECT pg_backend_pid()"))).scalar()
+    await lock_connection.commit()
+
+    # Act
+    async with second.db._engine.connect() as connection:
+        await connection.execute(text(f"SELECT pg_terminate_backend({pid})"))
+    await wait_until(lambda: second.election.is_leader)
+    await wait_until(lambda: "deposed" in first.events)
+
+    # Assert
+    assert first.events[:2] == ["elected", "deposed"]
+    assert second.events == ["elected"]
+    await first.election.close()
+    await second.election.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_takeover_releases_the_lock(db_managers: list[DBManager]):
+    # Arrange
+    first, second = (Replica(db_manager) for db_manager in db_managers)
+
+    async def fail():
+        raise RuntimeError("Cannot spawn share servers")
+
+    first.election._on_elected = fail
+
+    # Act
+    await first.election.start()
+    await second.election.start()
+
+    # Assert
+    assert not first.election.is_leader
+    assert second.election.is_leader
+    await first.election.close()
+    await second.election.close()
@@ -1,18 +1,35 @@
+import asyncio
+import contextlib
+import time
 import typing
+from unittest.mock import AsyncMock, patch
 
+import grpc
 import grpc_testing
 import pytest
 import pytest_asyncio
 from grpc_testing._server._server import _Server
 from testcontainers.postgres import PostgresContainer
 
+from vault.bootstrap.bootstrap import Bootstrap
+from vault.common import types
 from vault.common.generated.vault_pb2 import (
     DESCRIPTOR,
+    DecryptBatchResponse,
+    InnerRequest,
+    RegisterBatchRequest,
+    RegisterRequest,
     RetrieveSecretRequest,
+    RetrieveSecretsRequest,
     Secret,
+    SecretEntry,
+    SecureReqMsgWrapper,
     StoreSecretRequest,
+    StoreSecretsRequest,
 )
+from vault.crypto.asymmetric import decrypt, generate_key_pair
 from vault.manager.manager import Manager
+from vault.manager.share_server_stats import ShareServerStats
 
 
 @pytest.fixture
@@ -90,6 +107,7 @@ async def test_retrieve_secret_works(
     secret_id: str,
 ):
     # Arrange
+    manager._threshold = 1  # No share servers are registered in this test
     await manager._db.add_user(user_id, b"user_pubkey")
     await manager._db.add_secret(user_id, secret_id, secret.SerializeToString())
     request = RetrieveSecretRequest(user_id=user_id, secret_id=secret_id)
@@ -97,3 +115,758 @@ async def test_retrieve_secret_works(
 
     # Assert
     assert response.secret == secret
+
+
+@pytest.mark.asyncio
+async def test_retrieve_secret_keeps_share_servers_order(
+    manager: Manager,
+    secret: Secret,
+    user_id: str,
+    secret_id: str,
+):
+    # Arrange
+    await manager._db.add_user(user_id, b"user_pubkey")
+    await manager._db.add_secret(user_id, secret_id, secret.SerializeToString())
+    servers_addresses = ["share-0", "share-1", "share-2"]
+
+    async def decrypt_on_share_server(server_address, request):
+        # First server answers last
+        await asyncio.sleep(0.1 * (len(servers_addresses) - int(server_address[-1])))
+        return DecryptBatchResponse(
+            encrypted_partial_decryptions=[server_address.encode()]
+        )
+
+    # Act
+    with (
+        patch.object(
+            manager, "_share_servers_addresses", return_value=servers_addresses
+        ),
+        patch.object(
+            manager, "_decrypt_on_share_server", side_effect=decrypt_on_share_server
+        ),
+    ):
+        response = await manager.retrieve_secret(
+            RetrieveSecretRequest(user_id=user_id, secret_id=secret_id)
+        )
+
+    # Assert
+    assert response.encrypted_partial_decryptions == [
+        address.encode() for address in servers_addresses
+    ]
+
+
+@pytest.mark.asyncio
+async def test_retrieve_secret_completes_on_fastest_share_servers(
+    manager: Manager,
+    secret: Secret,
+    user_id: str,
+    secret_id: str,
+):
+    # Arrange
+    manager._threshold = 2  # The user and the fastest share server
+    manager._share_server_stats = ShareServerStats(default_hedge_delay_s=0.05)
+    await manager._db.add_user(user_id, b"user_pubkey")
+    await manager._db.add_secret(user_id, secret_id, secret.SerializeToString())
+    servers_addresses = ["share-0", "share-1", "share-2"]
+    cancelled = []
+
+    async def decrypt_on_share_server(server_address, request):
+        if server_address == "share-0":
+            raise RuntimeError("Decrypt on share server share-0 failed")
+        if server_address == "share-1":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(server_address)
+                raise
+        return DecryptBatchResponse(
+            encrypted_partial_decryptions=[server_address.encode()]
+        )
+
+    # Act
+    with (
+        patch.object(
+            manager, "_share_servers_addresses", return_value=servers_addresses
+        ),
+        patch.object(
+            manager, "_decrypt_on_share_server", side_effect=decrypt_on_share_server
+        ),
+    ):
+        response = await asyncio.wait_for(
+            manager.retrieve_secret(
+                RetrieveSecretRequest(user_id=user_id, secret_id=secret_id)
+            ),
+            timeout=1,
+        )
+
+    # Assert
+    assert response.encrypted_partial_decryptions == [b"share-2"]
+    assert cancelled == ["share-1"]
+
+
+@pytest.mark.asyncio
+async def test_spare_sent_after_a_failure_is_not_hedged_at_once(
+    manager: Manager,
+    secret: Secret,
+    user_id: str,
+    secret_id: str,
+):
+    # Arrange
+    manager._threshold = 2  # The user and the fastest share server
+    manager._share_server_stats = ShareServerStats(default_hedge_delay_s=0.1)
+    await manager._db.add_user(user_id, b"user_pubkey")
+    await manager._db.add_secret(user_id, secret_id, secret.SerializeToString())
+    servers_addresses = ["share-0", "share-1", "share-2"]
+    asked = []
+
+    async def decrypt_on_share_server(server_address, request):
+        asked.append(server_address)
+        if server_address == "share-0":
+            # Fails only after the hedge delay has passed
+            time.sleep(0.15)
+            raise RuntimeError("Decrypt on share server share-0 failed")
+        if server_address == "share-1":
+            await asyncio.sleep(0.05)
+        return DecryptBatchResponse(
+            encrypted_partial_decryptions=[server_address.encode()]
+        )
+
+    # Act
+    with (
+        patch.object(
+            manager, "_share_servers_addresses", return_value=servers_addresses
+        ),
+        patch.object(
+            manager, "_decrypt_on_share_server", side_effect=decrypt_on_share_server
+        ),
+    ):
+        response = await asyncio.wait_for(
+            manager.retrieve_secret(
+                RetrieveSecretRequest(user_id=user_id, secret_id=secret_id)
+            ),
+            timeout=1,
+        )
+
+    # Assert
+    assert response.encrypted_partial_decryptions == [b"share-1"]
+    assert asked == ["share-0", "share-1"]
+
+
+@pytest.mark.asyncio
+async def test_share_server_that_became_slow_loses_first_place(
+    manager: Manager,
+    secret: Secret,
+    user_id: str,
+    secret_id: str,
+):
+    # Arrange
+    manager._threshold = 2  # The user and the fastest share server
+    manager._share_server_stats = ShareServerStats(default_hedge_delay_s=0.05)
+    servers_addresses = ["share-0", "share-1", "share-2"]
+    for address, latency_s in zip(servers_addresses, [0.001, 0.002, 0.002]):
+        manager._share_server_stats.record_success(address, latency_s)
+    await manager._db.add_user(user_id, b"user_pubkey")
+    await manager._db.add_secret(user_id, secret_id, secret.SerializeToString())
+    asked: list[list[str]] = []
+
+    async def decrypt_on_share_server(server_address, request):
+        asked[-1].append(server_address)
+        if server_address == "share-0":
+            await asyncio.sleep(10)
+        return DecryptBatchResponse(
+            encrypted_partial_decryptions=[server_address.encode()]
+        )
+
+    # Act
+    with (
+        patch.object(
+            manager, "_share_servers_addresses", return_value=servers_addresses
+        ),
+        patch.object(
+            manager, "_decrypt_on_share_server", side_effect=decrypt_on_share_server
+        ),
+    ):
+        for _ in range(5):
+            asked.append([])
+            await asyncio.wait_for(
+                manager.retrieve_secret(
+                    RetrieveSecretRequest(user_id=user_id, secret_id=secret_id)
+                ),
+                timeout=1,
+            )
+
+    # Assert
+    asked_first = [addresses[0] for addresses in asked]
+    assert asked_first[0] == "share-0"
+    assert "share-0" not in asked_first[1:]
+
+
+@pytest.mark.asyncio
+async def test_retrieve_secret_fails_without_enough_share_servers(
+    manager: Manager,
+    secret: Secret,
+    user_id: str,
+    secret_id: str,
+):
+    # Arrange
+    manager._threshold = 3  # The user and 2 of 3 share servers
+    await manager._db.add_user(user_id, b"user_pubkey")
+    await manager._db.add_secret(user_id, secret_id, secret.SerializeToString())
+    servers_addresses = ["share-0", "share-1", "share-2"]
+
+    async def decrypt_on_share_server(server_address, request):
+        if server_address != "share-2":
+            raise RuntimeError(f"Decrypt on share server {server_address} failed")
+        return DecryptBatchResponse(
+            encrypted_partial_decryptions=[server_address.encode()]
+        )
+
+    # Act & Assert
+    with (
+        patch.object(
+            manager, "_share_servers_addresses", return_value=servers_addresses
+        ),
+        patch.object(
+            manager, "_decrypt_on_share_server", side_effect=decrypt_on_share_server
+        ),
+        pytest.raises(RuntimeError, match="of the 2 required share servers"),
+    ):
+        await manager.retrieve_secret(
+            RetrieveSecretRequest(user_id=user_id, secret_id=secret_id)
+        )
+
+
+@pytest.mark.asyncio
+async def test_session_answers_each_request_by_id(
+    manager: Manager,
+    secret: Secret,
+    user_id: str,
+    secret_id: str,
+):
+    # Arrange
+    await manager._db.add_user(user_id, b"user_pubkey")
+
+    async def session_requests():
+        yield SecureReqMsgWrapper(
+            app_req=InnerRequest(
+                request_id=1,
+                store=StoreSecretRequest(
+                    user_id=user_id, secret_id=secret_id, secret=secret
+                ),
+            )
+        )
+        yield SecureReqMsgWrapper(
+            app_req=InnerRequest(
+                request_id=2,
+                retrieve=RetrieveSecretRequest(user_id=user_id, secret_id="missing"),
+            )
+        )
+
+    # Act
+    responses = {
+        msg.app_resp.request_id: msg.app_resp
+        async for msg in manager._serve_session(session_requests())
+    }
+
+    # Assert
+    assert responses[1].store.success
+    assert "Secret not found" in responses[2].error
+
+
+@pytest.mark.asyncio
+async def test_store_and_retrieve_secrets_batch(
+    manager: Manager,
+    secret: Secret,
+    user_id: str,
+):
+    # Arrange
+    manager._threshold = 1  # No share servers are registered in this test
+    await manager._db.add_user(user_id, b"user_pubkey")
+    secret_ids = ["secret1", "secret2", "secret3"]
+
+    # Act
+    store_response = await manager.store_secrets(
+        StoreSecretsRequest(
+            user_id=user_id,
+            secrets=[SecretEntry(secret_id=i, secret=secret) for i in secret_ids],
+        )
+    )
+    retrieve_response = await manager.retrieve_secrets(
+        RetrieveSecretsRequest(user_id=user_id, secret_ids=list(reversed(secret_ids)))
+    )
+
+    # Assert
+    assert store_response.success
+    assert [r.secret for r in retrieve_response.secrets] == [secret] * 3
+
+
+@pytest.mark.asyncio
+async def test_retrieve_secrets_rejects_oversized_batch(
+    manager: Manager,
+    user_id: str,
+):
+    # Arrange
+    await manager._db.add_user(user_id, b"user_pubkey")
+    request = RetrieveSecretsRequest(
+        user_id=user_id, secret_ids=[str(i) for i in range(manager._max_batch_size + 1)]
+    )
+
+    # Act & Assert
+    with pytest.raises(RuntimeError, match="Batch size"):
+        await manager.retrieve_secrets(request)
+
+
+@pytest_asyncio.fixture
+async def share_servers(manager: Manager, key_pairs) -> list[str]:
+    _, server_pubs = key_pairs
+    for i, pub in enumerate(server_pubs):
+        await manager._db.add_server(
+            types.ServiceData(
+                type=types.ServiceType.SHARE_SERVER,
+                container_id=f"id-{i}",
+                container_name=f"share-{i}",
+                public_key=pub,
+            )
+        )
+    await manager._share_servers.load(manager._db)
+    return manager._share_servers.snapshot().addresses
+
+
+@pytest_asyncio.fixture
+async def local_bootstrap(manager: Manager) -> typing.AsyncGenerator[AsyncMock, None]:
+    """Answers the bootstrap calls of the manager with an in-process Bootstrap."""
+    bootstrap = Bootstrap("bootstrap", 0)
+    bootstrap_stub = AsyncMock()
+
+    async def generate_shares(request):
+        return await bootstrap.GenerateShares(request, None)
+
+    async def generate_shares_batch(request):
+        return await bootstrap.GenerateSharesBatch(request, None)
+
+    bootstrap_stub.GenerateShares.side_effect = generate_shares
+    bootstrap_stub.GenerateSharesBatch.side_effect = generate_shares_batch
+
+    @contextlib.asynccontextmanager
+    async def bootstrap_service():
+        yield types.ServiceData(
+            type=types.ServiceType.BOOSTRAP_SERVER,
+            container_id="id-bootstrap",
+            container_name="bootstrap",
+            public_key=b"",
+        )
+
+    with (
+        patch.object(manager._bootstrap_pool, "service", bootstrap_service),
+        patch("vault.manager.manager.BootstrapStub", return_value=bootstrap_stub),
+    ):
+        yield bootstrap_stub
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_pairs", [3], indirect=True)
+async def test_register_batch_uses_one_bootstrap_call(
+    manager: Manager, share_servers: list[str], local_bootstrap: AsyncMock
+):
+    # Arrange
+    users = {f"user-{i}": generate_key_pair() for i in range(2)}
+    request = RegisterBatchRequest(
+        users=[
+            RegisterRequest(
+                user_id=user_id, verifier="v", salt="s", user_public_key=pub
+            )
+            for user_id, (_, pub) in users.items()
+        ]
+    )
+
+    async def store_shares(server_address, request):
+        return [True] * len(request.shares)
+
+    # Act
+    with patch.object(
+        manager, "_store_shares_on_share_server", side_effect=store_shares
+    ) as store_shares_mock:
+        response = await manager._register_batch(request)
+
+    # Assert
+    local_bootstrap.GenerateSharesBatch.assert_awaited_once()
+    assert store_shares_mock.await_count == len(share_servers)
+    for call in store_shares_mock.await_args_list:
+        assert [share.user_id for share in call.args[1].shares] == list(users)
+    for user_response, (priv, _) in zip(response.users, users.values()):
+        types.Key.model_validate_json(decrypt(user_response.encrypted_key, priv))
+    assert await manager._db.get_existing_users(list(users)) == set(users)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_pairs", [3], indirect=True)
+async def test_register_stores_shares_concurrently(
+    manager: Manager,
+    share_servers: list[str],
+    local_bootstrap: AsyncMock,
+    user_id: str,
+):
+    # Arrange
+    _, user_pub = generate_key_pair()
+    # Passes only once every server is storing its share at the same time
+    all_storing = asyncio.Barrier(len(share_servers))
+
+    async def store_share(server_address, user_id, share):
+        async with asyncio.timeout(5):
+            await all_storing.wait()
+
+    # Act
+    with patch.object(
+        manager, "_store_share_on_share_server", side_effect=store_share
+    ) as store_share_mock:
+        response = await manager._register(
+            RegisterRequest(user_id=user_id, user_public_key=user_pub)
+        )
+
+    # Assert
+    stored_on = [call.args[0] for call in store_share_mock.await_args_list]
+    assert sorted(stored_on) == sorted(share_servers)
+    assert response.encrypted_key
+    assert await manager._db.user_exists(user_id)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_pairs", [3], indirect=True)
+async def test_register_rolls_back_shares_on_partial_failure(
+    manager: Manager,
+    share_servers: list[str],
+    local_bootstrap: AsyncMock,
+    user_id: str,
+):
+    # Arrange
+    _, user_pub = generate_key_pair()
+    failing_server = share_servers[1]
+
+    async def store_share(server_address, user_id, share):
+        if server_address == failing_server:
+            raise RuntimeError("Share server is down")
+
+    # Act
+    with (
+        patch.object(manager, "_store_share_on_share_server", side_effect=store_share),
+        patch.object(manager, "_delete_share_on_share_server") as delete_share,
+        pytest.raises(RuntimeError, match="on 1 of 3 share servers"),
+    ):
+        await manager._register(
+            RegisterRequest(user_id=user_id, user_public_key=user_pub)
+        )
+
+    # Assert
+    deleted_on = [call.args for call in delete_share.await_args_list]
+    assert sorted(deleted_on) == sorted((address, user_id) for address in share_servers)
+    assert not await manager._db.user_exists(user_id)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_pairs", [3], indirect=True)
+async def test_register_batch_rolls_back_users_a_share_server_rejects(
+    manager: Manager, share_servers: list[str], local_bootstrap: AsyncMock
+):
+    # Arrange
+    users = {f"user-{i}": generate_key_pair() for i in range(3)}
+    request = RegisterBatchRequest(
+        users=[
+            RegisterRequest(
+                user_id=user_id, verifier="v", salt="s", user_public_key=pub
+            )
+            for user_id, (_, pub) in users.items()
+        ]
+    )
+    rejecting_server = share_servers[1]
+
+    async def store_shares(server_address, request):
+        # The rejecting server already holds a share of user-1
+        return [
+            server_address != rejecting_server or share.user_id != "user-1"
+            for share in request.shares
+        ]
+
+    # Act
+    with (
+        patch.object(
+            manager, "_store_shares_on_share_server", side_effect=store_shares
+        ),
+        patch.object(manager, "_delete_share_on_share_server") as delete_share,
+    ):
+        response = await manager._register_batch(request)
+
+    # Assert
+    assert [bool(user_response.error) for user_response in response.users] == [
+        False,
+        True,
+        False,
+    ]
+    assert not response.users[1].encrypted_key
+    deleted_on = sorted(call.args for call in delete_share.await_args_list)
+    assert deleted_on == sorted(
+        (address, "user-1") for address in share_servers if address != rejecting_server
+    )
+    assert await manager._db.get_existing_users(list(users)) == {"user-0", "user-2"}
+    with pytest.raises(RuntimeError):
+        await manager._db.get_auth_client("user-1")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_pairs", [3], indirect=True)
+async def test_register_batch_rolls_back_all_users_when_a_share_server_fails(
+    manager: Manager, share_servers: list[str], local_bootstrap: AsyncMock
+):
+    # Arrange
+    user_ids = ["user-0", "user-1"]
+    request = RegisterBatchRequest(
+        users=[
+            RegisterRequest(
+                user_id=user_id,
+                verifier="v",
+                salt="s",
+                user_public_key=generate_key_pair()[1],
+            )
+            for user_id in user_ids
+        ]
+    )
+
+    async def store_shares(server_address, request):
+        if server_address == share_servers[0]:
+            raise RuntimeError("Share server is down")
+        return [True] * len(request.shares)
+
+    # Act
+    with (
+        patch.object(
+            manager, "_store_shares_on_share_server", side_effect=store_shares
+        ),
+        patch.object(manager, "_delete_share_on_share_server") as delete_share,
+    ):
+        response = await manager._register_batch(request)
+
+    # Assert
+    assert all(user_response.error for user_response in response.users)
+    assert delete_share.await_count == len(share_servers) * len(user_ids)
+    assert await manager._db.get_existing_users(user_ids) == set()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_pairs", [3], indirect=True)
+async def test_register_batch_removes_users_when_the_bootstrap_fails(
+    manager: Manager, share_servers: list[str], local_bootstrap: AsyncMock
+):
+    # Arrange
+    local_bootstrap.GenerateSharesBatch.side_effect = RuntimeError("Bootstrap died")
+    request = RegisterBatchRequest(
+        users=[RegisterRequest(user_id="user-0", verifier="v", salt="s")]
+    )
+
+    # Act & Assert
+    with pytest.raises(RuntimeError, match="Bootstrap died"):
+        await manager._register_batch(request)
+    assert await manager._db.get_existing_users(["user-0"]) == set()
+    with pytest.raises(RuntimeError):
+        await manager._db.get_auth_client("user-0")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error_type", ["runtime_error", "timeout", "rpc_error"])
+async def test_register_removes_auth_client_on_failure(
+    manager: Manager, user_id: str, error_type: str
+):
+    # Arrange
+    context = AsyncMock()
+    error = {
+        "runtime_error": lambda: RuntimeError("Share server is down"),
+        "timeout": asyncio.TimeoutError,
+        "rpc_error": lambda: grpc.aio.AioRpcError(
+            grpc.StatusCode.UNAVAILABLE, None, None, "down"
+        ),
+    }[error_type]()
+
+    # Act
+    with patch.object(manager, "_register", side_effect=error):
+        await manager.Register(
+            RegisterRequest(user_id=user_id, verifier="v", salt="s"), context
+        )
+
+    # Assert
+    context.abort.assert_awaited_once()
+    assert context.abort.await_args.args[0] == grpc.StatusCode.UNKNOWN
+    with pytest.raises(RuntimeError):
+        await manager._db.get_auth_client(user_id)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_pairs", [3], indirect=True)
+async def test_register_rolls_back_when_cancelled_during_distribution(
+    manager: Manager,
+    share_servers: list[str],
+    local_bootstrap: AsyncMock,
+    user_id: str,
+):
+    # Arrange
+    _, user_pub = generate_key_pair()
+    request = RegisterRequest(
+        user_id=user_id, verifier="v", salt="s", user_public_key=user_pub
+    )
+    stuck = asyncio.Event()
+
+    async def store_share(server_address, user_id, share):
+        # The first server stores its share, the others hang
+        if server_address != share_servers[0]:
+            stuck.set()
+            await asyncio.sleep(60)
+
+    with (
+        patch.object(manager, "_store_share_on_share_server", side_effect=store_share),
+        patch.object(manager, "_delete_share_on_share_server") as delete_share,
+    ):
+        register = asyncio.create_task(manager.Register(request, AsyncMock()))
+        await stuck.wait()
+
+        # Act
+        register.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await register
+
+    # Assert
+    deleted_on = sorted(call.args for call in delete_share.await_args_list)
+    assert deleted_on == sorted((address, user_id) for address in share_servers)
+    assert not await manager._db.user_exists(user_id)
+    with patch.object(manager, "_store_share_on_share_server"):
+        response = await manager.Register(request, AsyncMock())
+    assert response.encrypted_key
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_pairs", [3], indirect=True)
+async def test_register_batch_rolls_back_when_cancelled_during_distribution(
+    manager: Manager, share_servers: list[str], local_bootstrap: AsyncMock
+):
+    # Arrange
+    user_ids = ["user-0", "user-1"]
+    request = RegisterBatchRequest(
+        users=[
+            RegisterRequest(
+                user_id=user_id,
+                verifier="v",
+                salt="s",
+                user_public_key=generate_key_pair()[1],
+            )
+            for user_id in user_ids
+        ]
+    )
+    stuck = asyncio.Event()
+
+    async def store_shares(server_address, request):
+        # The first server stores the shares, the others hang
+        if server_address != share_servers[0]:
+            stuck.set()
+            await asyncio.sleep(60)
+        return [True] * len(request.shares)
+
+    with (
+        patch.object(
+            manager, "_store_shares_on_share_server", side_effect=store_shares
+        ),
+        patch.object(manager, "_delete_share_on_share_server") as delete_share,
+    ):
+        register_batch = asyncio.create_task(
+            manager.RegisterBatch(request, AsyncMock())
+        )
+        await stuck.wait()
+
+        # Act
+        register_batch.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await register_batch
+
+    # Assert
+    assert delete_share.await_count == len(share_servers) * len(user_ids)
+    assert await manager._db.get_existing_users(user_ids) == set()
+
+    async def store_all_shares(server_address, request):
+        return [True] * len(request.shares)
+
+    with patch.object(
+        manager, "_store_shares_on_share_server", side_effect=store_all_shares
+    ):
+        response = await manager.RegisterBatch(request, AsyncMock())
+    assert all(user_response.encrypted_key for user_response in response.users)
+
+
+@pytest.mark.asyncio
+async def test_register_batch_aborts_on_any_error(manager: Manager):
+    # Arrange
+    context = AsyncMock()
+    request = RegisterBatchRequest(
+        users=[RegisterRequest(user_id="user-0", verifier="v", salt="s")]
+    )
+    error = grpc.aio.AioRpcError(grpc.StatusCode.UNAVAILABLE, None, None, "down")
+
+    # Act
+    with patch.object(manager, "_register_batch", side_effect=error):
+        await manager.RegisterBatch(request, context)
+
+    # Assert
+    context.abort.assert_awaited_once()
+    assert context.abort.await_args.args[0] == grpc.StatusCode.UNKNOWN
+
+
+@pytest.mark.asyncio
+async def test_register_batch_rejects_existing_users(manager: Manager, user_id: str):
+    # Arrange
+    await manager._db.add_user(user_id, b"user_pubkey")
+    request = RegisterBatchRequest(
+        users=[RegisterRequest(user_id=user_id, verifier="v", salt="s")]
+    )
+
+    # Act & Assert
+    with pytest.raises(RuntimeError, match="already exist"):
+        await manager._register_batch(request)
+
+
+@pytest.mark.asyncio
+async def test_leader_relaunches_adopted_share_servers_that_do_not_answer(
+    manager: Manager,
+):
+    # Arrange
+    servers = [
+        types.ServiceData(
+            type=types.ServiceType.SHARE_SERVER,
+            container_id=f"id-{i}",
+            container_name=f"vault-share-{i}",
+            public_key=b"share_server_pubkey",
+        )
+        for i in range(3)
+    ]
+    for server in servers:
+        await manager._db.add_server(server)
+    relaunched = servers[1].model_copy(update={"container_id": "id-new"})
+
+    async def share_server_alive(server: types.ServiceData) -> bool:
+        return server.container_id != "id-1"
+
+    spawn_servers = AsyncMock(return_value=[relaunched])
+
+    # Act
+    with (
+        patch.object(manager, "_share_server_alive", side_effect=share_server_alive),
+        patch.object(manager._setup_master_service, "spawn_servers", spawn_servers),
+        patch("vault.common.docker_utils.remove_container") as remove_container,
+    ):
+        await manager.launch_all_share_servers()
+
+    # Assert
+    remove_container.assert_called_once_with("id-1", force=True)
+    assert spawn_servers.await_args.kwargs["container_names"] == ["vault-share-1"]
+    assert await manager._db.get_server("id-1") is None
+    assert "id-1" not in [
+        server.container_id for server in manager._share_servers.snapshot().servers
+    ]
+    assert [server.container_id for server in manager._share_servers_data] == [
+        "id-0",
+        "id-2",
+        "id-new",
+    ]
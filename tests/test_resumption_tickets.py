@@ -0,0 +1,43 @@
+from vault.crypto.authentication import srp_resumption_client_proof
+from vault.manager.resumption_tickets import ResumptionTickets
+
+USERNAME = "alice"
+SESSION_KEY = b"9323b304f3c720adc90a"
+
+
+def test_resume_with_issued_ticket():
+    tickets = ResumptionTickets(lifetime_s=60)
+    ticket = tickets.issue(USERNAME, SESSION_KEY)
+
+    nonce, proof = srp_resumption_client_proof(SESSION_KEY, ticket)
+
+    assert tickets.verify(USERNAME, ticket, nonce, proof)
+
+
+def test_resume_rejects_replayed_nonce():
+    tickets = ResumptionTickets(lifetime_s=60)
+    ticket = tickets.issue(USERNAME, SESSION_KEY)
+    nonce, proof = srp_resumption_client_proof(SESSION_KEY, ticket)
+    assert tickets.verify(USERNAME, ticket, nonce, proof)
+
+    assert not tickets.verify(USERNAME, ticket, nonce, proof)
+
+
+def test_resume_rejects_wrong_key_or_user():
+    tickets = ResumptionTickets(lifetime_s=60)
+    ticket = tickets.issue(USERNAME, SESSION_KEY)
+
+    nonce, proof = srp_resumption_client_proof(b"other session key", ticket)
+    assert not tickets.verify(USERNAME, ticket, nonce, proof)
+
+    nonce, proof = srp_resumption_client_proof(SESSION_KEY, ticket)
+    assert not tickets.verify("bob", ticket, nonce, proof)
+
+
+def test_resume_rejects_expired_ticket():
+    tickets = ResumptionTickets(lifetime_s=-1)
+    ticket = tickets.issue(USERNAME, SESSION_KEY)
+
+    nonce, proof = srp_resumption_client_proof(SESSION_KEY, ticket)
+
+    assert not tickets.verify(USERNAME, ticket, nonce, proof)
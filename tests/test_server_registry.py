@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from testcontainers.postgres import PostgresContainer
+
+from vault.common import types
+from vault.manager.db_manager import DBManager
+from vault.manager.server_registry import ServerRegistry
+
+
+def service_data(
+    container_id: str, service_type=types.ServiceType.SHARE_SERVER
+) -> types.ServiceData:
+    return types.ServiceData(
+        type=service_type,
+        container_id=container_id,
+        container_name=f"name-{container_id}",
+        public_key=f"key-{container_id}".encode(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_load_takes_share_servers_from_db(db: PostgresContainer):
+    # Arrange
+    db_manager = DBManager(
+        db.get_connection_url().replace(
+            "postgresql+psycopg2://", "postgresql+asyncpg://", 1
+        )
+    )
+    await db_manager.start()
+    await db_manager.add_server(service_data("b"))
+    await db_manager.add_server(service_data("a"))
+    await db_manager.add_server(service_data("c", types.ServiceType.BOOSTRAP_SERVER))
+    registry = ServerRegistry()
+
+    # Act
+    await registry.load(db_manager)
+    await db_manager.close()
+
+    # Assert
+    snapshot = registry.snapshot()
+    assert snapshot.version == 1
+    assert snapshot.addresses == ["name-a", "name-b"]
+    assert snapshot.public_keys == [b"key-a", b"key-b"]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_does_not_change_with_registry():
+    # Arrange
+    registry = ServerRegistry()
+    await registry.add(service_data("b"))
+    snapshot = registry.snapshot()
+
+    # Act
+    await registry.add(service_data("a"))
+    await registry.add(service_data("c", types.ServiceType.BOOSTRAP_SERVER))
+    await registry.remove("b")
+
+    # Assert
+    assert snapshot.addresses == ["name-b"]
+    assert registry.snapshot().addresses == ["name-a"]
+    assert registry.snapshot().version == snapshot.version + 2
+
+
+@pytest.mark.asyncio
+async def test_wait_for_change():
+    # Arrange
+    registry = ServerRegistry()
+    version = registry.snapshot().version
+
+    # Act
+    waiter = asyncio.create_task(registry.wait_for_change(version, timeout_s=1))
+    await asyncio.sleep(0)
+    await registry.add(service_data("a"))
+    snapshot = await waiter
+
+    # Assert
+    assert snapshot.addresses == ["name-a"]
+    with pytest.raises(TimeoutError):
+        await registry.wait_for_change(snapshot.version, timeout_s=0.01)
@@ -1,16 +1,26 @@
+import asyncio
 import os
+import threading
+from unittest.mock import MagicMock, patch
 
+import grpc
 import pytest
 import pytest_asyncio
+from sqlalchemy import text
 from testcontainers.postgres import PostgresContainer
 
 from vault.common import types
+from vault.common.channel_pool import ChannelPool
+from vault.common.generated import setup_pb2
 from vault.common.setup_unit import SetupUnit
 from vault.manager.db_manager import DBManager
+from vault.manager.server_registry import ServerRegistry
 from vault.manager.setup_master import SetupMaster
 
 
-@pytest_asyncio.fixture(scope="module")
+# Pooled connections belong to the event loop that opened them, so the tests
+# sharing this fixture run in its loop
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
 async def db_manager():
     with PostgresContainer("postgres:16") as container:
         db_url = container.get_connection_url().replace(
@@ -24,7 +34,7 @@ async def db_manager():
 
 
 @pytest.mark.skip(reason="Fix needed after adding the SetupUnit server")
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 async def test_setup_private_api(db_manager: DBManager):
     local_server_address = "127.0.0.1"
 
@@ -64,7 +74,7 @@ async def test_setup_private_api(db_manager: DBManager):
 
 
 @pytest.mark.skipif(os.geteuid() != 0, reason="Requires root privileges")
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="module")
 async def test_setup_public_api(db_manager: DBManager):
     local_server_address = "127.0.0.1"
 
@@ -83,3 +93,370 @@ async def test_setup_public_api(db_manager: DBManager):
     container.remove()
 
     setup_master._wait_for_container_id_unregistration(service_date.container_id)
+
+
+@pytest_asyncio.fixture
+async def setup_master(db: PostgresContainer):
+    db_url = db.get_connection_url().replace(
+        "postgresql+psycopg2://", "postgresql+asyncpg://", 1
+    )
+    db_manager = DBManager(db_url)
+    await db_manager.start()
+    yield SetupMaster(
+        port=0,
+        setup_unit_port=0,
+        db=db_manager,
+        server_creds=grpc.local_server_credentials(),
+        client_creds=grpc.local_channel_credentials(),
+    )
+    await db_manager.close()
+
+
+@pytest.mark.asyncio
+async def test_spawn_and_terminate_servers_concurrently(setup_master: SetupMaster):
+    # Arrange
+    loop = asyncio.get_running_loop()
+    container_names = [f"vault-share-{i}" for i in range(4)]
+    spawning = 0
+    max_spawning = 0
+    # Containers are spawned two at a time
+    both_spawning = threading.Barrier(2, timeout=5)
+
+    def spawn_container(image, container_name, **kwargs):
+        nonlocal spawning, max_spawning
+        spawning += 1
+        max_spawning = max(max_spawning, spawning)
+        both_spawning.wait()
+        # Registration arrives from the container's SetupUnit, after it started
+        request = setup_pb2.SetupRegisterRequest(
+            container_id=f"id-{container_name}", container_name=container_name
+        )
+        asyncio.run_coroutine_threadsafe(
+            setup_master.SetupRegister(request, None), loop
+        ).result()
+        spawning -= 1
+        return MagicMock(short_id=request.container_id)
+
+    async def terminate_service(service_data, block):
+        await setup_master.SetupUnregister(
+            setup_pb2.SetupUnregisterRequest(container_id=service_data.container_id),
+            None,
+        )
+
+    # Act
+    with (
+        patch(
+            "vault.manager.setup_master.docker_utils.spawn_container",
+            side_effect=spawn_container,
+        ),
+        patch("vault.manager.setup_master.docker_utils.wait_for_container_to_stop"),
+        patch("vault.manager.setup_master.docker_utils.remove_container"),
+        patch.object(setup_master, "terminate_service", side_effect=terminate_service),
+    ):
+        services = await setup_master.spawn_servers(
+            "vault", container_names, max_parallel=2, timeout_s=5
+        )
+        await setup_master.terminate_services(services, max_parallel=2, timeout_s=5)
+
+    # Assert
+    assert [service.container_name for service in services] == container_names
+    assert max_spawning == 2
+    assert await setup_master._db.get_servers([s.container_id for s in services]) == {}
+
+
+@pytest.mark.asyncio
+async def test_spawn_servers_removes_started_containers_on_failure(
+    setup_master: SetupMaster,
+):
+    # Arrange
+    loop = asyncio.get_running_loop()
+    container_names = [f"vault-share-{i}" for i in range(3)]
+
+    def spawn_container(image, container_name, **kwargs):
+        if container_name == "vault-share-1":
+            raise RuntimeError("Image not found")
+        request = setup_pb2.SetupRegisterRequest(
+            container_id=f"id-{container_name}", container_name=container_name
+        )
+        asyncio.run_coroutine_threadsafe(
+            setup_master.SetupRegister(request, None), loop
+        ).result()
+        return MagicMock(short_id=request.container_id)
+
+    # Act
+    with (
+        patch(
+            "vault.manager.setup_master.docker_utils.spawn_container",
+            side_effect=spawn_container,
+        ),
+        patch(
+            "vault.manager.setup_master.docker_utils.remove_container"
+        ) as remove_container,
+        pytest.raises(RuntimeError, match="Image not found"),
+    ):
+        await setup_master.spawn_servers("vault", container_names, timeout_s=5)
+
+    # Assert
+    assert sorted(call.args[0] for call in remove_container.call_args_list) == [
+        "id-vault-share-0",
+        "id-vault-share-2",
+    ]
+    assert (
+        await setup_master._db.get_servers(["id-vault-share-0", "id-vault-share-2"])
+        == {}
+    )
+
+
+@pytest.mark.asyncio
+async def test_remove_orphaned_services(setup_master: SetupMaster):
+    # Arrange
+    for container_name in ["vault-bootstrap-1", "vault-bootstrap-2", "vault-share-0"]:
+        await setup_master._db.add_server(
+            types.ServiceData(
+                type=types.ServiceType.BOOSTRAP_SERVER,
+                container_id=f"id-{container_name}",
+                container_name=container_name,
+                public_key=b"",
+            )
+        )
+
+    # Act
+    with (
+        patch(
+            "vault.manager.setup_master.docker_utils.list_container_ids",
+            return_value=["id-vault-bootstrap-1", "id-vault-bootstrap-2"],
+        ) as list_container_ids,
+        patch(
+            "vault.manager.setup_master.docker_utils.remove_container"
+        ) as remove_container,
+    ):
+        await setup_master.remove_orphaned_services("vault-bootstrap")
+
+    # Assert
+    list_container_ids.assert_called_once_with("vault-bootstrap")
+    assert sorted(call.args[0] for call in remove_container.call_args_list) == [
+        "id-vault-bootstrap-1",
+        "id-vault-bootstrap-2",
+    ]
+    assert all(
+        call.kwargs == {"force": True} for call in remove_container.call_args_list
+    )
+    remaining = await setup_master._db.get_servers(
+        ["id-vault-bootstrap-1", "id-vault-bootstrap-2", "id-vault-share-0"]
+    )
+    assert list(remaining) == ["id-vault-share-0"]
+
+
+@pytest.mark.asyncio
+async def test_remove_dead_service_already_unregistered(setup_master: SetupMaster):
+    # Arrange
+    setup_master._registry = ServerRegistry()
+    service_data = types.ServiceData(
+        type=types.ServiceType.SHARE_SERVER,
+        container_id="id-share-0",
+        container_name="vault-share-0",
+        public_key=b"key",
+    )
+    await setup_master.SetupRegister(
+        types.ServiceData_to_SetupRegisterRequest(service_data), None
+    )
+    # Another manager removed the registration first
+    await setup_master._db.remove_server("id-share-0")
+
+    # Act
+    with patch(
+        "vault.manager.setup_master.docker_utils.remove_container"
+    ) as remove_container:
+        await setup_master.remove_dead_service(service_data)
+
+    # Assert
+    remove_container.assert_called_once_with("id-share-0", force=True)
+    assert setup_master._registry.snapshot().addresses == []
+
+
+@pytest.mark.asyncio
+async def test_registrations_update_registry(setup_master: SetupMaster):
+    # Arrange
+    setup_master._registry = ServerRegistry()
+    request = setup_pb2.SetupRegisterRequest(
+        type=types.ServiceType.SHARE_SERVER,
+        container_id="id-share-0",
+        container_name="vault-share-0",
+        public_key=b"key",
+    )
+
+    # Act
+    await setup_master.SetupRegister(request, None)
+    registered = setup_master._registry.snapshot()
+    with patch.object(setup_master._channel_pool, "remove_host"):
+        await setup_master.SetupUnregister(
+            setup_pb2.SetupUnregisterRequest(container_id="id-share-0"), None
+        )
+
+    # Assert
+    assert registered.addresses == ["vault-share-0"]
+    assert setup_master._registry.snapshot().addresses == []
+
+
+@pytest.mark.asyncio
+async def test_registration_wait_queries_db_once(setup_master: SetupMaster):
+    # Arrange
+    request = setup_pb2.SetupRegisterRequest(
+        container_id="id-share-0", container_name="vault-share-0"
+    )
+
+    # Act
+    with patch.object(
+        setup_master._db, "get_servers", wraps=setup_master._db.get_servers
+    ) as get_servers:
+        wait = asyncio.create_task(
+            setup_master._wait_for_container_id_registration("id-share-0")
+        )
+        await asyncio.sleep(0.05)
+        await setup_master.SetupRegister(request, None)
+        service_data = await asyncio.wait_for(wait, timeout=1)
+
+    # Assert
+    assert service_data.container_name == "vault-share-0"
+    assert get_servers.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_registration_wait_resolved_by_other_manager(db: PostgresContainer):
+    # Arrange
+    db_url = db.get_connection_url().replace(
+        "postgresql+psycopg2://", "postgresql+asyncpg://", 1
+    )
+    setup_masters = []
+    for _ in range(2):
+        db_manager = DBManager(db_url)
+        await db_manager.start()
+        setup_master = SetupMaster(
+            port=0,
+            setup_unit_port=0,
+            db=db_manager,
+            server_creds=grpc.local_server_credentials(),
+            client_creds=grpc.local_channel_credentials(),
+            registry=ServerRegistry(),
+        )
+        await setup_master.start()
+        setup_masters.append(setup_master)
+    receiving, waiting = setup_masters
+    request = setup_pb2.SetupRegisterRequest(
+        type=types.ServiceType.SHARE_SERVER,
+        container_id="id-share-0",
+        container_name="vault-share-0",
+        public_key=b"key",
+    )
+
+    # Act
+    wait = asyncio.create_task(
+        waiting._wait_for_container_id_registration("id-share-0", timeout_s=5)
+    )
+    await asyncio.sleep(0.05)
+    with patch.object(waiting._db, "get_servers") as get_servers:
+        await receiving.SetupRegister(request, None)
+        service_data = await asyncio.wait_for(wait, timeout=1)
+    await asyncio.sleep(0.05)
+
+    # Assert
+    get_servers.assert_not_called()
+    assert service_data.public_key == b"key"
+    assert waiting._registry.snapshot().addresses == ["vault-share-0"]
+    for setup_master in setup_masters:
+        await setup_master.stop()
+        await setup_master._db.close()
+
+
+@pytest.mark.asyncio
+async def test_stop_closes_own_channel_pool(setup_master: SetupMaster):
+    # Arrange
+    await setup_master.start()
+    async with setup_master._channel_pool.channel("localhost:1"):
+        pass
+
+    # Act
+    await setup_master.stop()
+
+    # Assert
+    assert setup_master._channel_pool._channels == {}
+    assert setup_master._channel_pool._eviction_task is None
+
+
+@pytest.mark.asyncio
+async def test_stop_leaves_shared_channel_pool_open(db: PostgresContainer):
+    # Arrange
+    db_url = db.get_connection_url().replace(
+        "postgresql+psycopg2://", "postgresql+asyncpg://", 1
+    )
+    db_manager = DBManager(db_url)
+    await db_manager.start()
+    channel_pool = ChannelPool(grpc.local_channel_credentials())
+    setup_master = SetupMaster(
+        port=0,
+        setup_unit_port=0,
+        db=db_manager,
+        server_creds=grpc.local_server_credentials(),
+        client_creds=grpc.local_channel_credentials(),
+        channel_pool=channel_pool,
+    )
+    await setup_master.start()
+    async with channel_pool.channel("localhost:1"):
+        pass
+
+    # Act
+    await setup_master.stop()
+
+    # Assert
+    assert list(channel_pool._channels) == ["localhost:1"]
+    await channel_pool.close()
+    await db_manager.close()
+
+
+@pytest.mark.asyncio
+async def test_catches_up_after_losing_listen_connection(db: PostgresContainer):
+    # Arrange
+    db_url = db.get_connection_url().replace(
+        "postgresql+psycopg2://", "postgresql+asyncpg://", 1
+    )
+    setup_masters = []
+    for _ in range(2):
+        db_manager = DBManager(db_url, listen_check_interval_s=0.05)
+        await db_manager.start()
+        setup_master = SetupMaster(
+            port=0,
+            setup_unit_port=0,
+            db=db_manager,
+            server_creds=grpc.local_server_credentials(),
+            client_creds=grpc.local_channel_credentials(),
+            registry=ServerRegistry(),
+        )
+        await setup_master.start()
+        setup_masters.append(setup_master)
+    receiving, waiting = setup_masters
+    request = setup_pb2.SetupRegisterRequest(
+        type=types.ServiceType.SHARE_SERVER,
+        container_id="id-share-0",
+        container_name="vault-share-0",
+        public_key=b"key",
+    )
+    wait = asyncio.create_task(
+        waiting._wait_for_container_id_registration("id-share-0", timeout_s=30)
+    )
+    await asyncio.sleep(0.05)
+    # The notification of the registration is lost with the connection
+    with patch.object(receiving, "_notify"):
+        await receiving.SetupRegister(request, None)
+    pid = waiting._db._listen_driver_connection.get_server_pid()
+
+    # Act
+    async with receiving._db._engine.connect() as connection:
+        await connection.execute(text(f"SELECT pg_terminate_backend({pid})"))
+    service_data = await asyncio.wait_for(wait, timeout=2)
+
+    # Assert
+    assert service_data.public_key == b"key"
+    assert waiting._registry.snapshot().addresses == ["vault-share-0"]
+    for setup_master in setup_masters:
+        await setup_master.stop()
+        await setup_master._db.close()
@@ -10,8 +10,10 @@ from vault.common import types
 from vault.common.generated import vault_pb2 as pb2
 from vault.common.generated.vault_pb2 import (
     DESCRIPTOR,
+    DecryptBatchRequest,
     DecryptRequest,
     Secret,
+    StoreShareBatchRequest,
     StoreShareRequest,
 )
 from vault.common.generated.vault_pb2_grpc import ShareServerStub
@@ -172,6 +174,59 @@ async def test_decrypt_success(
     )
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key_pairs", [1], indirect=True)
+@pytest.mark.parametrize("decrypt_workers", [0, 2])
+async def test_decrypt_batch_unseals_share_once(
+    share, decrypt_request, key_pairs, decrypt_workers
+):
+    # Arrange
+    priv = key_pairs[0][0]
+    server = ShareServer("share", 0, decrypt_workers=decrypt_workers)
+    await server.StoreShare(
+        StoreShareRequest(
+            user_id=decrypt_request.user_id,
+            encrypted_share=encrypt(share, server._pubkey_b64),
+        ),
+        None,
+    )
+    secrets = [
+        Secret(
+            c1=pb2.Key(x=str(i), y="456"),
+            c2=pb2.Key(x="123", y="456"),
+            ciphertext=b"ciphertext",
+        )
+        for i in range(5)
+    ]
+    request = DecryptBatchRequest(
+        user_id=decrypt_request.user_id,
+        secrets=secrets,
+        user_public_key=decrypt_request.user_public_key,
+    )
+
+    # Act
+    with (
+        patch(
+            "vault.share_server.share_server.decrypt", side_effect=decrypt
+        ) as mock_decrypt,
+        patch(
+            "vault.share_server.share_server.partial_decrypt",
+            side_effect=lambda secret, share: types.PartialDecryption(
+                x=secret.c1.x, yc1=types.Key(x="456", y="789")
+            ),
+        ),
+    ):
+        response = await server.DecryptBatch(request, None)
+    await server.close()
+
+    # Assert
+    mock_decrypt.assert_called_once()
+    assert [
+        types.PartialDecryption.model_validate_json(decrypt(p, priv)).x
+        for p in response.encrypted_partial_decryptions
+    ] == [secret.c1.x for secret in secrets]
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize("key_pairs", [1], indirect=True)
 async def test_decrypt_not_found(share_server_stub, decrypt_request):
@@ -183,6 +238,25 @@ async def test_decrypt_not_found(share_server_stub, decrypt_request):
         assert exc_info.value.code() == grpc.StatusCode.NOT_FOUND
 
 
+@pytest.mark.asyncio
+async def test_store_share_batch_keeps_existing_shares(
+    share_server_stub, store_request
+):
+    # Act
+    response = await share_server_stub.StoreShareBatch(
+        StoreShareBatchRequest(
+            shares=[
+                store_request,
+                StoreShareRequest(user_id="other", encrypted_share=b"share"),
+                store_request,
+            ]
+        )
+    )
+
+    # Assert
+    assert list(response.success) == [True, True, False]
+
+
 @pytest.mark.asyncio
 async def test_delete_success_with_mocked_share_server(
     share_server: _Server,
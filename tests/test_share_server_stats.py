@@ -0,0 +1,58 @@
+from vault.manager.share_server_stats import ShareServerStats
+
+
+def test_rank_prefers_fast_and_reliable_servers():
+    # Arrange
+    stats = ShareServerStats(default_hedge_delay_s=5.0)
+    for _ in range(5):
+        stats.record_success("slow", 0.5)
+        stats.record_success("fast", 0.01)
+        stats.record_failure("flaky", 0.01)
+
+    # Act
+    ranked = stats.rank(["slow", "flaky", "fast", "new"])
+
+    # Assert
+    assert ranked == ["new", "fast", "slow", "flaky"]
+
+
+def test_hedge_delay_uses_default_until_enough_samples():
+    # Arrange
+    stats = ShareServerStats(default_hedge_delay_s=5.0, min_samples=3)
+    stats.record_success("share-0", 0.1)
+
+    # Act & Assert
+    assert stats.hedge_delay_s() == 5.0
+
+
+def test_hedge_delay_is_latency_percentile():
+    # Arrange
+    stats = ShareServerStats(
+        default_hedge_delay_s=5.0, hedge_percentile=0.9, min_samples=1
+    )
+    for i in range(1, 101):
+        stats.record_success("share-0", i / 100)
+
+    # Act & Assert
+    assert stats.hedge_delay_s() == 0.9
+
+
+def test_hedging_disabled_outside_percentile_range():
+    assert not ShareServerStats(5.0, hedge_percentile=0).hedging_enabled
+    assert ShareServerStats(5.0, hedge_percentile=0.95).hedging_enabled
+
+
+def test_cancelled_requests_slow_a_server_down():
+    # Arrange
+    stats = ShareServerStats(default_hedge_delay_s=5.0)
+    stats.record_success("was-fast", 0.001)
+    stats.record_success("steady", 0.01)
+
+    # Act
+    for _ in range(5):
+        stats.record_cancelled("was-fast", 0.05)
+    stats.record_cancelled("steady", 0.001)
+
+    # Assert
+    assert stats.rank(["was-fast", "steady"]) == ["steady", "was-fast"]
+    assert stats.hedge_delay_s() == 5.0
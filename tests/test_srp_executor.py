@@ -0,0 +1,95 @@
+import asyncio
+import os
+
+import pytest
+
+from vault.crypto.authentication import (
+    srp_authentication_client_step_two,
+    srp_registration_client_generate_data,
+)
+from vault.manager.srp_executor import SRPExecutor, SRPExecutorFull
+
+USERNAME = "alice"
+PASSWORD = "correct horse"
+
+
+async def handshake(srp_executor: SRPExecutor, password: str = PASSWORD) -> str:
+    _, verifier, salt = srp_registration_client_generate_data(USERNAME, PASSWORD)
+    server_public, server_private = await srp_executor.step_one(USERNAME, verifier)
+    client_public, _, client_proof = srp_authentication_client_step_two(
+        USERNAME, password, server_public, salt
+    )
+    return await srp_executor.step_three(
+        USERNAME, verifier, salt, server_private, client_public, client_proof
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "workers, use_processes",
+    [(0, False), (2, False), (2, True)],
+    ids=["inline", "threads", "processes"],
+)
+async def test_handshake(workers: int, use_processes: bool):
+    # Arrange
+    srp_executor = SRPExecutor(workers=workers, use_processes=use_processes)
+    await srp_executor.start()
+
+    # Act
+    session_key = await handshake(srp_executor)
+
+    # Assert
+    assert session_key
+    assert srp_executor.stats().running == 0
+    await srp_executor.close()
+
+
+@pytest.mark.asyncio
+async def test_wrong_password_fails_on_worker():
+    # Arrange
+    srp_executor = SRPExecutor(workers=1, use_processes=True)
+    await srp_executor.start()
+
+    # Act & Assert
+    with pytest.raises(RuntimeError, match="verify_proof failed"):
+        await handshake(srp_executor, password="wrong")
+    await srp_executor.close()
+
+
+@pytest.mark.asyncio
+async def test_rejects_steps_beyond_the_queue():
+    # Arrange
+    srp_executor = SRPExecutor(workers=1, use_processes=False, max_queued=1)
+    await srp_executor.start()
+    _, verifier, _ = srp_registration_client_generate_data(USERNAME, PASSWORD)
+
+    # Act
+    results = await asyncio.gather(
+        *[srp_executor.step_one(USERNAME, verifier) for _ in range(3)],
+        return_exceptions=True,
+    )
+
+    # Assert
+    assert [isinstance(result, SRPExecutorFull) for result in results] == [
+        False,
+        False,
+        True,
+    ]
+    assert srp_executor.stats().rejected == 1
+    await srp_executor.close()
+
+
+@pytest.mark.asyncio
+async def test_replaces_workers_after_one_dies():
+    # Arrange
+    srp_executor = SRPExecutor(workers=1, use_processes=True)
+    await srp_executor.start()
+
+    # Act
+    with pytest.raises(RuntimeError, match="died"):
+        await srp_executor._run(os._exit, 1)
+    session_key = await handshake(srp_executor)
+
+    # Assert
+    assert session_key
+    await srp_executor.close()
@@ -0,0 +1,45 @@
+import time
+
+from vault.manager.srp_record_cache import SRPRecord, SRPRecordCache
+
+RECORD = SRPRecord(verifier="1234", salt="4321")
+
+
+def test_returns_cached_record():
+    cache = SRPRecordCache(ttl_s=60)
+    cache.put("alice", RECORD)
+
+    assert cache.get("alice") == RECORD
+    assert cache.get("bob") is None
+
+
+def test_drops_expired_and_invalidated_records():
+    cache = SRPRecordCache(ttl_s=0.01)
+    cache.put("alice", RECORD)
+    time.sleep(0.02)
+    assert cache.get("alice") is None
+
+    cache = SRPRecordCache(ttl_s=60)
+    cache.put("alice", RECORD)
+    cache.invalidate("alice")
+    assert cache.get("alice") is None
+
+
+def test_evicts_least_recently_used():
+    cache = SRPRecordCache(ttl_s=60, max_records=2)
+    cache.put("alice", RECORD)
+    cache.put("bob", RECORD)
+    cache.get("alice")
+
+    cache.put("carol", RECORD)
+
+    assert cache.get("alice") == RECORD
+    assert cache.get("bob") is None
+    assert cache.get("carol") == RECORD
+
+
+def test_disabled_cache_keeps_nothing():
+    cache = SRPRecordCache(ttl_s=0)
+    cache.put("alice", RECORD)
+
+    assert cache.get("alice") is None
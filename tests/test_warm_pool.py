@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from vault.common import types
+from vault.manager.warm_pool import WarmPool
+
+
+class FakeSetupMaster:
+    def __init__(self):
+        self.spawned: list[str] = []
+        self.terminated: list[str] = []
+        self.orphans_removed: list[str] = []
+
+    def _service_data(self, container_name: str) -> types.ServiceData:
+        self.spawned.append(container_name)
+        return types.ServiceData(
+            type=types.ServiceType.BOOSTRAP_SERVER,
+            container_id=f"id-{container_name}",
+            container_name=container_name,
+            public_key=b"",
+        )
+
+    async def spawn_server(self, image, container_name, **kwargs):
+        return self._service_data(container_name)
+
+    async def spawn_servers(self, image, container_names, **kwargs):
+        return [self._service_data(name) for name in container_names]
+
+    async def terminate_service(self, service_data, block=True):
+        self.terminated.append(service_data.container_name)
+
+    async def remove_orphaned_services(self, name_prefix, max_parallel=8):
+        self.orphans_removed.append(name_prefix)
+
+
+def make_pool(setup_master: FakeSetupMaster, **kwargs) -> WarmPool:
+    return WarmPool(
+        setup_master=setup_master,
+        name_prefix="vault-bootstrap",
+        image="vault",
+        command="vault bootstrap",
+        network="vault-net",
+        environment={},
+        **kwargs,
+    )
+
+
+async def wait_until(predicate, timeout_s: float = 1.0):
+    async with asyncio.timeout(timeout_s):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_hands_out_warm_services_and_refills():
+    # Arrange
+    setup_master = FakeSetupMaster()
+    pool = make_pool(setup_master, size=2)
+    await pool.start()
+    await wait_until(lambda: pool.idle_count == 2)
+    warm = list(setup_master.spawned)
+
+    # Act
+    async with pool.service() as service_data:
+        used = service_data.container_name
+    await wait_until(lambda: pool.idle_count == 2 and setup_master.terminated)
+    await pool.close()
+
+    # Assert
+    assert used in warm
+    assert setup_master.orphans_removed == ["vault-bootstrap-"]
+    assert len(setup_master.spawned) == 3
+    assert setup_master.terminated[0] == used
+    assert sorted(setup_master.terminated) == sorted(setup_master.spawned)
+
+
+@pytest.mark.asyncio
+async def test_recycles_after_max_uses():
+    # Arrange
+    setup_master = FakeSetupMaster()
+    pool = make_pool(setup_master, size=0, max_uses=2)
+
+    # Act
+    used = []
+    for _ in range(3):
+        async with pool.service() as service_data:
+            used.append(service_data.container_name)
+    await pool.close()
+
+    # Assert
+    assert used[0] == used[1] != used[2]
+    assert setup_master.terminated == [used[0], used[2]]
+
+
+@pytest.mark.asyncio
+async def test_does_not_hand_out_expired_services():
+    # Arrange
+    setup_master = FakeSetupMaster()
+    pool = make_pool(setup_master, size=0, max_uses=10, ttl_s=0.05)
+    async with pool.service() as service_data:
+        first = service_data.container_name
+
+    # Act
+    await asyncio.sleep(0.1)
+    async with pool.service() as service_data:
+        second = service_data.container_name
+    await pool.close()
+
+    # Assert
+    assert first != second
+    assert first in setup_master.terminated
+
+
+@pytest.mark.asyncio
+async def test_returns_service_before_it_is_terminated():
+    # Arrange
+    setup_master = FakeSetupMaster()
+    termination_started = asyncio.Event()
+    release_termination = asyncio.Event()
+
+    async def slow_terminate_service(service_data, block=True):
+        termination_started.set()
+        await release_termination.wait()
+        setup_master.terminated.append(service_data.container_name)
+
+    setup_master.terminate_service = slow_terminate_service
+    pool = make_pool(setup_master, size=0)
+
+    # Act
+    async with pool.service() as service_data:
+        used = service_data.container_name
+    await asyncio.wait_for(termination_started.wait(), timeout=1)
+
+    # Assert
+    assert setup_master.terminated == []
+    release_termination.set()
+    await pool.close()
+    assert setup_master.terminated == [used]
@@ -0,0 +1,118 @@
+import asyncio
+import functools
+import os
+import pathlib
+import signal
+import time
+
+import pytest
+
+from vault.manager.__main__ import handle_signals, wait_for_signal
+from vault.manager.worker_supervisor import WorkerSupervisor
+
+
+def serve(worker_id: int):
+    time.sleep(60)
+
+
+def serve_ignoring_sigterm(worker_id: int):
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    time.sleep(60)
+
+
+def serve_until_signal(directory: str, worker_id: int):
+    async def serve():
+        stop_event = handle_signals()
+        pathlib.Path(directory, "ready").touch()
+        await wait_for_signal(stop_event)
+        await asyncio.sleep(1)
+        pathlib.Path(directory, "cleaned_up").touch()
+
+    asyncio.run(serve())
+
+
+async def wait_until(condition, timeout_s: float = 10.0):
+    async with asyncio.timeout(timeout_s):
+        while not condition():
+            await asyncio.sleep(0.05)
+
+
+def make_supervisor(target, **kwargs) -> WorkerSupervisor:
+    return WorkerSupervisor(
+        target, restart_delay_s=0.01, poll_interval_s=0.05, **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_starts_every_worker():
+    # Arrange
+    supervisor = make_supervisor(serve, num_workers=3)
+
+    # Act
+    await supervisor.start()
+
+    # Assert
+    pids = supervisor.pids()
+    assert len(set(pids)) == 3
+    assert None not in pids
+    await supervisor.stop()
+    assert supervisor.pids() == [None, None, None]
+
+
+@pytest.mark.asyncio
+async def test_restarts_crashed_worker():
+    # Arrange
+    supervisor = make_supervisor(serve, num_workers=2)
+    await supervisor.start()
+    crashed_pid, other_pid = supervisor.pids()
+
+    # Act
+    os.kill(crashed_pid, signal.SIGKILL)
+    await wait_until(lambda: supervisor.restart_count == 1)
+    await wait_until(lambda: None not in supervisor.pids())
+
+    # Assert
+    restarted_pid, still_running_pid = supervisor.pids()
+    assert restarted_pid != crashed_pid
+    assert still_running_pid == other_pid
+    await supervisor.stop()
+
+
+@pytest.mark.asyncio
+async def test_kills_worker_that_does_not_stop():
+    # Arrange
+    supervisor = make_supervisor(
+        serve_ignoring_sigterm, num_workers=1, stop_timeout_s=0.5
+    )
+    await supervisor.start()
+    await asyncio.sleep(0.5)
+    (pid,) = supervisor.pids()
+
+    # Act
+    await supervisor.stop()
+
+    # Assert
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+    assert supervisor.restart_count == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_finishes_cleanup_when_signalled_again(tmp_path: pathlib.Path):
+    # Arrange
+    supervisor = make_supervisor(
+        functools.partial(serve_until_signal, str(tmp_path)), num_workers=1
+    )
+    await supervisor.start()
+    await wait_until(lambda: (tmp_path / "ready").exists())
+    (worker,) = supervisor._workers
+
+    # Act
+    # Ctrl-C reaches the worker before the supervisor terminates it
+    os.kill(worker.pid, signal.SIGINT)
+    await asyncio.sleep(0.2)
+    await supervisor.stop()
+
+    # Assert
+    assert worker.exitcode == 0
+    assert (tmp_path / "cleaned_up").exists()
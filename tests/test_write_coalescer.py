@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from vault.manager.write_coalescer import WriteCoalescer
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_are_flushed_together():
+    # Arrange
+    batches = []
+
+    async def flush(items):
+        batches.append(items)
+        return [item * 10 for item in items]
+
+    coalescer = WriteCoalescer(flush, window_s=10)
+
+    # Act
+    results = await asyncio.wait_for(
+        asyncio.gather(*[coalescer.submit(i) for i in range(5)]), timeout=1
+    )
+
+    # Assert
+    assert results == [0, 10, 20, 30, 40]
+    # The first write goes out alone, the rest queue up behind it
+    assert batches == [[0], [1, 2, 3, 4]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_flushed_without_waiting():
+    # Arrange
+    batches = []
+
+    async def flush(items):
+        batches.append(items)
+        return [None] * len(items)
+
+    release = asyncio.Event()
+
+    async def slow_flush(items):
+        await release.wait()
+        return await flush(items)
+
+    coalescer = WriteCoalescer(slow_flush, window_s=10, max_size=2)
+
+    # Act
+    writes = asyncio.gather(*[coalescer.submit(i) for i in range(5)])
+    await asyncio.sleep(0)
+    in_flight = len(coalescer._flushing)
+    release.set()
+    await asyncio.wait_for(writes, timeout=1)
+
+    # Assert
+    assert in_flight == 3
+    assert sorted(batches) == [[0], [1, 2], [3, 4]]
+
+
+@pytest.mark.asyncio
+async def test_failures_reach_their_callers():
+    # Arrange
+    async def flush(items):
+        return [ValueError(item) if item == "bad" else item for item in items]
+
+    async def failing_flush(items):
+        raise ConnectionError("db is down")
+
+    coalescer = WriteCoalescer(flush, window_s=0.01)
+    failing_coalescer = WriteCoalescer(failing_flush, window_s=0.01)
+
+    # Act
+    results = await asyncio.gather(
+        coalescer.submit("good"), coalescer.submit("bad"), return_exceptions=True
+    )
+    failing_results = await asyncio.gather(
+        failing_coalescer.submit(1),
+        failing_coalescer.submit(2),
+        return_exceptions=True,
+    )
+
+    # Assert
+    assert results[0] == "good"
+    assert isinstance(results[1], ValueError)
+    assert all(isinstance(r, ConnectionError) for r in failing_results)
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_writes():
+    # Arrange
+    batches = []
+
+    async def flush(items):
+        batches.append(items)
+        return [None] * len(items)
+
+    coalescer = WriteCoalescer(flush, window_s=10)
+    writes = [asyncio.create_task(coalescer.submit(i)) for i in range(2)]
+    await asyncio.sleep(0)
+
+    # Act
+    await coalescer.close()
+
+    # Assert
+    assert [await write for write in writes] == [None, None]
+    assert batches == [[0], [1]]